@@ -0,0 +1,165 @@
+"""books search vector
+
+Revision ID: 5b7e2c41d9a3
+Revises: 38dc02893ed3
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c41d9a3'
+down_revision: Union[str, Sequence[str], None] = '38dc02893ed3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# сколько книг обновлять за один UPDATE при заполнении колонки
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Документ поиска: title (A) + имена авторов (B) + description (C).
+    # Имена авторов лежат в других таблицах, поэтому GENERATED-колонка невозможна —
+    # колонку поддерживают триггеры ниже.
+    op.execute(
+        """
+        CREATE FUNCTION books_search_document(p_title text, p_description text, p_book_id integer)
+        RETURNS tsvector
+        LANGUAGE sql STABLE
+        AS $$
+            SELECT setweight(to_tsvector('simple', coalesce(p_title, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce((
+                       SELECT string_agg(a.name, ' ')
+                       FROM book_authors ba
+                       JOIN authors a ON a.id = ba.author_id
+                       WHERE ba.book_id = p_book_id
+                   ), '')), 'B')
+                || setweight(to_tsvector('simple', coalesce(p_description, '')), 'C')
+        $$;
+        """
+    )
+
+    # books: title/description меняются -> пересчитываем в той же строке
+    op.execute(
+        """
+        CREATE FUNCTION books_search_vector_row() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            NEW.search_vector := books_search_document(NEW.title, NEW.description, NEW.id);
+            RETURN NEW;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_books_search_vector
+        BEFORE INSERT OR UPDATE OF title, description ON books
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_row();
+        """
+    )
+
+    # book_authors: statement-level с transition table, чтобы массовые вставки
+    # пересчитывали каждую книгу один раз, а не на каждую строку связи
+    op.execute(
+        """
+        CREATE FUNCTION book_authors_refresh_search_vector() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            UPDATE books b
+            SET search_vector = books_search_document(b.title, b.description, b.id)
+            WHERE b.id IN (SELECT DISTINCT book_id FROM changed_rows);
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_book_authors_search_vector_ins
+        AFTER INSERT ON book_authors
+        REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION book_authors_refresh_search_vector();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_book_authors_search_vector_del
+        AFTER DELETE ON book_authors
+        REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION book_authors_refresh_search_vector();
+        """
+    )
+
+    # authors: переименование автора (редко) -> пересчёт его книг
+    op.execute(
+        """
+        CREATE FUNCTION authors_refresh_search_vector() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF NEW.name IS DISTINCT FROM OLD.name THEN
+                UPDATE books b
+                SET search_vector = books_search_document(b.title, b.description, b.id)
+                WHERE b.id IN (SELECT book_id FROM book_authors WHERE author_id = NEW.id);
+            END IF;
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_authors_search_vector
+        AFTER UPDATE OF name ON authors
+        FOR EACH ROW EXECUTE FUNCTION authors_refresh_search_vector();
+        """
+    )
+
+    # Триггеры уже ловят новые записи; существующие строки заполняем батчами
+    # по диапазонам id с коммитом после каждого батча, без долгой блокировки таблицы.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM books")).scalar_one()
+        for lo in range(0, max_id, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    "UPDATE books "
+                    "SET search_vector = books_search_document(title, description, id) "
+                    "WHERE id > :lo AND id <= :hi"
+                ),
+                {"lo": lo, "hi": lo + BACKFILL_BATCH_SIZE},
+            )
+
+        op.create_index(
+            'ix_books_search_vector',
+            'books',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_search_vector', table_name='books', postgresql_using='gin')
+    op.execute("DROP TRIGGER IF EXISTS trg_authors_search_vector ON authors;")
+    op.execute("DROP TRIGGER IF EXISTS trg_book_authors_search_vector_del ON book_authors;")
+    op.execute("DROP TRIGGER IF EXISTS trg_book_authors_search_vector_ins ON book_authors;")
+    op.execute("DROP TRIGGER IF EXISTS trg_books_search_vector ON books;")
+    op.execute("DROP FUNCTION IF EXISTS authors_refresh_search_vector();")
+    op.execute("DROP FUNCTION IF EXISTS book_authors_refresh_search_vector();")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_row();")
+    op.execute("DROP FUNCTION IF EXISTS books_search_document(text, text, integer);")
+    op.drop_column('books', 'search_vector')
@@ -0,0 +1,55 @@
+"""authors name unique
+
+Revision ID: a41f9c7d2e10
+Revises: 5b7e2c41d9a3
+Create Date: 2026-10-18 14:03:21.530771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f9c7d2e10'
+down_revision: Union[str, Sequence[str], None] = '5b7e2c41d9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Дубли имён (гонки get-or-create) сливаем в самого старого автора:
+    # связи переносим, лишние строки удаляем. Всё в одной транзакции с созданием
+    # индекса — новый дубль не успеет появиться между чисткой и индексом.
+    op.execute(
+        """
+        CREATE TEMP TABLE author_dedup ON COMMIT DROP AS
+        SELECT id, keep_id
+        FROM (
+            SELECT id, min(id) OVER (PARTITION BY name) AS keep_id
+            FROM authors
+        ) t
+        WHERE id <> keep_id;
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO book_authors (book_id, author_id)
+        SELECT ba.book_id, d.keep_id
+        FROM book_authors ba
+        JOIN author_dedup d ON d.id = ba.author_id
+        ON CONFLICT DO NOTHING;
+        """
+    )
+    # связи с удаляемыми авторами уходят по ON DELETE CASCADE
+    op.execute("DELETE FROM authors a USING author_dedup d WHERE a.id = d.id;")
+
+    op.create_index(op.f('ix_authors_name'), 'authors', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # слитые дубли не восстанавливаются
+    op.drop_index(op.f('ix_authors_name'), table_name='authors')
@@ -0,0 +1,90 @@
+"""favorites counters lock order
+
+Revision ID: a7c5e1f3d820
+Revises: f4a8d2c6b913
+Create Date: 2026-10-18 22:05:41.730214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c5e1f3d820'
+down_revision: Union[str, Sequence[str], None] = 'f4a8d2c6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Тело favorites_counters_refresh() из c7d3e8f1a254 — для downgrade
+UNORDERED_BODY = """
+        DECLARE
+            delta integer := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+        BEGIN
+            UPDATE books b
+            SET favorites_count = b.favorites_count + delta * d.n
+            FROM (SELECT book_id, count(*) AS n FROM changed_rows GROUP BY book_id) d
+            WHERE b.id = d.book_id;
+
+            UPDATE users u
+            SET favorites_count = u.favorites_count + delta * d.n
+            FROM (SELECT user_id, count(*) AS n FROM changed_rows GROUP BY user_id) d
+            WHERE u.id = d.user_id;
+
+            RETURN NULL;
+        END
+"""
+
+# UPDATE ... FROM блокирует строки в порядке плана: два массовых PUT/PATCH с пересекающимися
+# книгами (или массовый против одиночных добавлений) могли взять их навстречу друг другу.
+# Сначала блокируем строки по возрастанию id, затем обновляем.
+# FOR NO KEY UPDATE — та же сила, что у UPDATE: не мешает FK-проверкам вставок в favorites.
+ORDERED_BODY = """
+        DECLARE
+            delta integer := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+        BEGIN
+            PERFORM 1 FROM books
+            WHERE id IN (SELECT book_id FROM changed_rows)
+            ORDER BY id
+            FOR NO KEY UPDATE;
+
+            UPDATE books b
+            SET favorites_count = b.favorites_count + delta * d.n
+            FROM (SELECT book_id, count(*) AS n FROM changed_rows GROUP BY book_id) d
+            WHERE b.id = d.book_id;
+
+            PERFORM 1 FROM users
+            WHERE id IN (SELECT user_id FROM changed_rows)
+            ORDER BY id
+            FOR NO KEY UPDATE;
+
+            UPDATE users u
+            SET favorites_count = u.favorites_count + delta * d.n
+            FROM (SELECT user_id, count(*) AS n FROM changed_rows GROUP BY user_id) d
+            WHERE u.id = d.user_id;
+
+            RETURN NULL;
+        END
+"""
+
+
+def _replace_function(body: str) -> None:
+    # CREATE OR REPLACE: триггеры trg_favorites_counters_* остаются привязаны к функции
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION favorites_counters_refresh() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $${body}$$;
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_function(ORDERED_BODY)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_function(UNORDERED_BODY)
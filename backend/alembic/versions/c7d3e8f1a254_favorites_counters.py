@@ -0,0 +1,119 @@
+"""favorites counters
+
+Revision ID: c7d3e8f1a254
+Revises: a41f9c7d2e10
+Create Date: 2026-10-18 16:40:09.284611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3e8f1a254'
+down_revision: Union[str, Sequence[str], None] = 'a41f9c7d2e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# сколько строк пересчитывать за один UPDATE при заполнении счётчиков
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOT NULL DEFAULT 0 — без переписывания таблицы (PG 11+)
+    op.add_column('books', sa.Column('favorites_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('users', sa.Column('favorites_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+    # Счётчики ведут statement-level триггеры: один UPDATE на затронутую книгу/пользователя
+    # за оператор, в той же транзакции, что и запись в favorites (включая каскадные удаления
+    # и массовые PUT/PATCH избранного).
+    # Transition table видна только в самой триггерной функции, поэтому одна функция
+    # на оба события: знак берём из TG_OP.
+    op.execute(
+        """
+        CREATE FUNCTION favorites_counters_refresh() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            delta integer := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+        BEGIN
+            UPDATE books b
+            SET favorites_count = b.favorites_count + delta * d.n
+            FROM (SELECT book_id, count(*) AS n FROM changed_rows GROUP BY book_id) d
+            WHERE b.id = d.book_id;
+
+            UPDATE users u
+            SET favorites_count = u.favorites_count + delta * d.n
+            FROM (SELECT user_id, count(*) AS n FROM changed_rows GROUP BY user_id) d
+            WHERE u.id = d.user_id;
+
+            RETURN NULL;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_favorites_counters_ins
+        AFTER INSERT ON favorites
+        REFERENCING NEW TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION favorites_counters_refresh();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_favorites_counters_del
+        AFTER DELETE ON favorites
+        REFERENCING OLD TABLE AS changed_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION favorites_counters_refresh();
+        """
+    )
+
+    # Заполняем существующие строки батчами по id (та же процедура, что и в
+    # `python -m app.cli reconcile-favorites-counts`), затем индекс для sort=popular.
+    # favorites.book_id без индекса: пересчёт по диапазонам книг (и каскад при удалении книги)
+    # сканировал бы всю таблицу — строим его первым.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_favorites_book_id',
+            'favorites',
+            ['book_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+        bind = op.get_bind()
+        for table, fk in (("books", "book_id"), ("users", "user_id")):
+            max_id = bind.execute(sa.text(f"SELECT coalesce(max(id), 0) FROM {table}")).scalar_one()
+            for lo in range(0, max_id, BACKFILL_BATCH_SIZE):
+                bind.execute(
+                    sa.text(
+                        f"UPDATE {table} t SET favorites_count = c.n "
+                        f"FROM (SELECT {fk} AS id, count(*) AS n FROM favorites "
+                        f"      WHERE {fk} > :lo AND {fk} <= :hi GROUP BY {fk}) c "
+                        f"WHERE t.id = c.id"
+                    ),
+                    {"lo": lo, "hi": lo + BACKFILL_BATCH_SIZE},
+                )
+
+        op.create_index(
+            'ix_books_favorites_count_id',
+            'books',
+            [sa.text('favorites_count DESC'), sa.text('id')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_favorites_count_id', table_name='books')
+    op.drop_index('ix_favorites_book_id', table_name='favorites')
+    op.execute("DROP TRIGGER IF EXISTS trg_favorites_counters_del ON favorites;")
+    op.execute("DROP TRIGGER IF EXISTS trg_favorites_counters_ins ON favorites;")
+    op.execute("DROP FUNCTION IF EXISTS favorites_counters_refresh();")
+    op.drop_column('users', 'favorites_count')
+    op.drop_column('books', 'favorites_count')
@@ -0,0 +1,37 @@
+"""favorites user created index
+
+Revision ID: e2b9a6c4f781
+Revises: c7d3e8f1a254
+Create Date: 2026-10-18 18:05:52.907413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b9a6c4f781'
+down_revision: Union[str, Sequence[str], None] = 'c7d3e8f1a254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset-страницы избранного: WHERE user_id = :u AND (created_at, book_id) < (:c, :b)
+    # ORDER BY created_at DESC, book_id DESC — обратный проход по этому индексу.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_favorites_user_created',
+            'favorites',
+            ['user_id', 'created_at', 'book_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_favorites_user_created', table_name='favorites')
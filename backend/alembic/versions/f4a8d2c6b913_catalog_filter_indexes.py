@@ -0,0 +1,41 @@
+"""catalog filter indexes
+
+Revision ID: f4a8d2c6b913
+Revises: e2b9a6c4f781
+Create Date: 2026-10-18 21:14:03.512870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a8d2c6b913'
+down_revision: Union[str, Sequence[str], None] = 'e2b9a6c4f781'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя, таблица, колонки)
+INDEXES = (
+    # PK связей начинаются с book_id — для «книги жанра/автора» нужен обратный порядок
+    ('ix_book_genres_genre_book', 'book_genres', ['genre_id', 'book_id']),
+    ('ix_book_authors_author_book', 'book_authors', ['author_id', 'book_id']),
+    # фильтр по диапазону лет и фасет по годам
+    ('ix_books_year_id', 'books', ['year', 'id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY: каталог остаётся доступен на запись, пока строятся индексы
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,442 @@
+"""Mixed-workload HTTP benchmark: p50/p95/p99 and RPS per endpoint.
+
+Workloads (weights via --mix): catalog browsing (GET /books, a few pages deep,
+sometimes sort=popular), book detail, login, favorites toggling (POST + DELETE)
+and the admin CSV export.
+
+In-process (httpx ASGITransport, no network, DATABASE_URL from the env/.env):
+
+    python bench/api_bench.py run --inproc --seed --books 5000 --output bench/results/now.json
+
+Against a running API (seed through the same DATABASE_URL the API uses):
+
+    uvicorn app.main:app --port 8000 --workers 1
+    python bench/api_bench.py run --base-url http://127.0.0.1:8000 --seed --output now.json
+
+Compare with a baseline (exit code 1 if any endpoint regressed):
+
+    python bench/api_bench.py compare bench/results/baseline.json now.json --threshold 0.10
+    python bench/api_bench.py run --inproc --baseline bench/results/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+from login_contention import percentile
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = BACKEND_DIR / "src"
+
+PASSWORD = "bench_password_123"
+ADMIN_EMAIL = "bench-admin@example.com"
+
+DEFAULT_MIX = "browse=50,detail=30,favorites=10,login=5,export=1"
+
+# метрики, по которым ищем регрессии: (ключ, больше = хуже)
+COMPARED_METRICS = (("p50_ms", True), ("p95_ms", True), ("p99_ms", True), ("rps", False))
+
+
+@dataclass
+class Recorder:
+    """Latency samples and errors per endpoint label."""
+
+    recording: bool = False
+    samples: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    async def timed(self, label: str, call: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        started = time.perf_counter()
+        resp = await call()
+        elapsed = time.perf_counter() - started
+        if self.recording:
+            self.samples.setdefault(label, []).append(elapsed)
+            if resp.status_code >= 400:
+                self.errors[label] = self.errors.get(label, 0) + 1
+        return resp
+
+
+@dataclass
+class Dataset:
+    book_ids: list[int]
+    users: list[tuple[str, dict[str, str]]]  # (email, auth headers)
+    admin_headers: dict[str, str]
+
+
+# --- workloads ---
+
+
+async def browse(client: httpx.AsyncClient, rec: Recorder, data: Dataset, rnd: random.Random) -> None:
+    sort = "popular" if rnd.random() < 0.2 else "id"
+    label = f"GET /books?sort={sort}"
+    params: dict[str, str | int] = {"limit": 20, "sort": sort}
+    # как пользователь: первая страница и иногда ещё пара
+    for _ in range(rnd.choice((1, 1, 2, 3))):
+        resp = await rec.timed(label, lambda: client.get("/api/v1/books", params=params))
+        cursor = resp.json().get("next_cursor") if resp.status_code == 200 else None
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+
+async def detail(client: httpx.AsyncClient, rec: Recorder, data: Dataset, rnd: random.Random) -> None:
+    book_id = rnd.choice(data.book_ids)
+    await rec.timed("GET /books/{id}", lambda: client.get(f"/api/v1/books/{book_id}"))
+
+
+async def login(client: httpx.AsyncClient, rec: Recorder, data: Dataset, rnd: random.Random) -> None:
+    email, _ = rnd.choice(data.users)
+    await rec.timed(
+        "POST /auth/login",
+        lambda: client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD}),
+    )
+
+
+async def favorites(client: httpx.AsyncClient, rec: Recorder, data: Dataset, rnd: random.Random) -> None:
+    _, headers = rnd.choice(data.users)
+    book_id = rnd.choice(data.book_ids)
+    path = f"/api/v1/users/me/favorites/{book_id}"
+    await rec.timed("POST /users/me/favorites/{id}", lambda: client.post(path, headers=headers))
+    await rec.timed("GET /users/me/favorites", lambda: client.get("/api/v1/users/me/favorites", headers=headers))
+    await rec.timed("DELETE /users/me/favorites/{id}", lambda: client.delete(path, headers=headers))
+
+
+async def export(client: httpx.AsyncClient, rec: Recorder, data: Dataset, rnd: random.Random) -> None:
+    async def download() -> httpx.Response:
+        # время до последнего байта, а не до заголовков
+        async with client.stream("GET", "/api/v1/admin/books/export.csv", headers=data.admin_headers) as resp:
+            async for _ in resp.aiter_raw():
+                pass
+        return resp
+
+    await rec.timed("GET /admin/books/export.csv", download)
+
+
+WORKLOADS: dict[str, Callable[..., Awaitable[None]]] = {
+    "browse": browse,
+    "detail": detail,
+    "favorites": favorites,
+    "login": login,
+    "export": export,
+}
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in WORKLOADS:
+            raise SystemExit(f"unknown workload {name!r}; known: {', '.join(WORKLOADS)}")
+        mix[name] = float(weight or 1)
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+# --- dataset ---
+
+
+def _use_app_sources() -> None:
+    # приложение (src-layout) нужно для --inproc и для прямого сидинга через его DATABASE_URL
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+async def seed_catalog(books: int) -> None:
+    """Top the catalog up to `books` rows directly in the DB the app is configured for."""
+    _use_app_sources()
+    from sqlalchemy import text
+
+    from app.core.db import AsyncSessionMaker
+
+    async with AsyncSessionMaker() as session:
+        existing = (await session.execute(text("SELECT count(*) FROM books"))).scalar_one()
+        missing = books - existing
+        if missing <= 0:
+            return
+        # авторы/жанры — небольшие словари, книги ссылаются на них по модулю
+        await session.execute(text(
+            "INSERT INTO authors (name) SELECT 'Bench author ' || g FROM generate_series(1, 500) g "
+            "ON CONFLICT (name) DO NOTHING"
+        ))
+        await session.execute(text(
+            "INSERT INTO genres (name) SELECT 'Bench genre ' || g FROM generate_series(1, 30) g "
+            "ON CONFLICT (name) DO NOTHING"
+        ))
+        await session.execute(
+            text(
+                "INSERT INTO books (title, description, year, isbn) "
+                "SELECT 'Bench book ' || g, 'Generated for benchmarks', 1950 + g % 75, 'BENCH-' || g "
+                "FROM generate_series(:lo, :hi) g ON CONFLICT (isbn) DO NOTHING"
+            ),
+            {"lo": existing + 1, "hi": books},
+        )
+        await session.execute(text(
+            "INSERT INTO book_authors (book_id, author_id) "
+            "SELECT b.id, a.id FROM books b "
+            "JOIN authors a ON a.name = 'Bench author ' || (1 + b.id % 500) "
+            "WHERE b.isbn LIKE 'BENCH-%' ON CONFLICT DO NOTHING"
+        ))
+        await session.execute(text(
+            "INSERT INTO book_genres (book_id, genre_id) "
+            "SELECT b.id, g.id FROM books b "
+            "JOIN genres g ON g.name = 'Bench genre ' || (1 + b.id % 30) "
+            "WHERE b.isbn LIKE 'BENCH-%' ON CONFLICT DO NOTHING"
+        ))
+        await session.commit()
+
+
+async def make_admin() -> None:
+    _use_app_sources()
+    from sqlalchemy import text
+
+    from app.core.db import AsyncSessionMaker
+
+    async with AsyncSessionMaker() as session:
+        await session.execute(text("UPDATE users SET role = 'admin' WHERE email = :email"), {"email": ADMIN_EMAIL})
+        await session.commit()
+
+
+async def login_headers(client: httpx.AsyncClient, email: str) -> dict[str, str]:
+    resp = await client.post("/api/v1/auth/register", json={"email": email, "password": PASSWORD})
+    if resp.status_code not in (201, 409):
+        resp.raise_for_status()
+    resp = await client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+async def load_dataset(client: httpx.AsyncClient, args: argparse.Namespace) -> Dataset:
+    if args.seed:
+        await seed_catalog(args.books)
+
+    users = [
+        (email, await login_headers(client, email))
+        for email in (f"bench-user-{i}@example.com" for i in range(args.users))
+    ]
+    admin_headers = await login_headers(client, ADMIN_EMAIL)
+    if args.seed:
+        await make_admin()
+
+    book_ids: list[int] = []
+    params: dict[str, str | int] = {"limit": 100}
+    while len(book_ids) < args.books:
+        page = (await client.get("/api/v1/books", params=params)).raise_for_status().json()
+        book_ids.extend(b["id"] for b in page["items"])
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    if not book_ids:
+        raise SystemExit("catalog is empty: run with --seed")
+    return Dataset(book_ids=book_ids, users=users, admin_headers=admin_headers)
+
+
+# --- run ---
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    rec: Recorder,
+    data: Dataset,
+    mix: dict[str, float],
+    stop_at: float,
+    rnd: random.Random,
+) -> None:
+    names = list(mix)
+    weights = list(mix.values())
+    while time.perf_counter() < stop_at:
+        name = rnd.choices(names, weights)[0]
+        await WORKLOADS[name](client, rec, data, rnd)
+
+
+def summarize(samples: list[float], errors: int, duration: float) -> dict:
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / duration, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+async def run_bench(args: argparse.Namespace) -> dict:
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+
+    if args.inproc:
+        _use_app_sources()
+        from app.main import create_app
+
+        transport: httpx.AsyncBaseTransport = httpx.ASGITransport(app=create_app())
+        base_url = "http://bench"
+    else:
+        transport = httpx.AsyncHTTPTransport(limits=limits)
+        base_url = args.base_url
+
+    rec = Recorder()
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60.0) as client:
+        data = await load_dataset(client, args)
+
+        async def phase(duration: float) -> float:
+            stop_at = time.perf_counter() + duration
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                worker(client, rec, data, mix, stop_at, random.Random(args.random_seed + i))
+                for i in range(args.concurrency)
+            ))
+            return time.perf_counter() - started
+
+        # прогрев: кэши, пул соединений, JIT планов — в результаты не идёт
+        if args.warmup > 0:
+            await phase(args.warmup)
+        rec.recording = True
+        elapsed = await phase(args.duration)
+
+    if args.inproc:
+        from app.core.db import dispose_engine
+
+        await dispose_engine()
+
+    all_samples = [s for samples in rec.samples.values() for s in samples]
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "target": "inproc" if args.inproc else args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 2),
+            "mix": mix,
+            "books": len(data.book_ids),
+            "users": len(data.users),
+        },
+        "endpoints": {
+            label: summarize(samples, rec.errors.get(label, 0), elapsed)
+            for label, samples in sorted(rec.samples.items())
+        },
+        "total": summarize(all_samples, sum(rec.errors.values()), elapsed),
+    }
+
+
+# --- compare ---
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[dict]:
+    """Per endpoint and metric: relative change; `regression` if worse than threshold."""
+    rows: list[dict] = []
+    for label, cur in sorted(current["endpoints"].items()):
+        base = baseline["endpoints"].get(label)
+        if base is None:
+            continue
+        for metric, higher_is_worse in COMPARED_METRICS:
+            before, after = base[metric], cur[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            worse = change if higher_is_worse else -change
+            rows.append({
+                "endpoint": label,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regression": worse > threshold,
+            })
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> None:
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['endpoint']:<36} {row['metric']:<7} "
+            f"{row['baseline']:>10} -> {row['current']:>10} ({row['change']:+.1%}) {flag}"
+        )
+
+
+def _load(path: str) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    result = asyncio.run(run_bench(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if args.baseline:
+        rows = compare(_load(args.baseline), result, args.threshold)
+        print_comparison(rows)
+        return 1 if any(r["regression"] for r in rows) else 0
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    rows = compare(_load(args.baseline), _load(args.current), args.threshold)
+    print_comparison(rows)
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the mixed workload and report per-endpoint latency")
+    target = run.add_mutually_exclusive_group()
+    target.add_argument("--inproc", action="store_true", help="drive the ASGI app in-process")
+    target.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run.add_argument("--seed", action="store_true", help="top the catalog up to --books rows first")
+    run.add_argument("--books", type=int, default=2000, help="catalog size to seed / sample ids from")
+    run.add_argument("--users", type=int, default=20, help="bench users (registered once, reused)")
+    run.add_argument("--concurrency", type=int, default=16, help="concurrent virtual users")
+    run.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    run.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before the run")
+    run.add_argument("--mix", default=DEFAULT_MIX, help=f"workload weights (default {DEFAULT_MIX})")
+    run.add_argument("--random-seed", type=int, default=42)
+    run.add_argument("--output", help="write results JSON here")
+    run.add_argument("--baseline", help="compare with this results JSON after the run")
+    run.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser("compare", help="compare two results JSON files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    raise SystemExit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
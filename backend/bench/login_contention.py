@@ -0,0 +1,93 @@
+"""p99 of GET /books while the same API worker is busy with logins.
+
+Run the API (one uvicorn worker) twice and compare:
+
+    PASSWORD_HASH_WORKERS=0 uvicorn app.main:app --port 8000   # before: bcrypt on the event loop
+    uvicorn app.main:app --port 8000                            # after: bcrypt in the thread pool
+
+    python bench/login_contention.py --base-url http://127.0.0.1:8000 --logins 16 --duration 15
+
+The script first measures /books alone, then /books with `--logins`
+concurrent login loops, and prints p50/p95/p99 for both phases.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "bench_password_123"
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+async def browse_loop(client: httpx.AsyncClient, stop_at: float, samples: list[float]) -> None:
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        resp = await client.get("/api/v1/books", params={"limit": 20})
+        samples.append(time.perf_counter() - started)
+        resp.raise_for_status()
+
+
+async def login_loop(client: httpx.AsyncClient, stop_at: float, statuses: dict[int, int]) -> None:
+    while time.perf_counter() < stop_at:
+        resp = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+
+async def run_phase(base_url: str, *, browsers: int, logins: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=browsers + logins + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        stop_at = time.perf_counter() + duration
+        samples: list[float] = []
+        statuses: dict[int, int] = {}
+        await asyncio.gather(
+            *(browse_loop(client, stop_at, samples) for _ in range(browsers)),
+            *(login_loop(client, stop_at, statuses) for _ in range(logins)),
+        )
+    return {"books": summarize(samples), "login_statuses": statuses}
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30.0) as client:
+        resp = await client.post("/api/v1/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        if resp.status_code not in (201, 409):
+            resp.raise_for_status()
+
+    idle = await run_phase(args.base_url, browsers=args.browsers, logins=0, duration=args.duration)
+    loaded = await run_phase(args.base_url, browsers=args.browsers, logins=args.logins, duration=args.duration)
+    print(json.dumps({"books_alone": idle, "books_under_login_load": loaded}, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--browsers", type=int, default=8, help="concurrent GET /books loops")
+    parser.add_argument("--logins", type=int, default=16, help="concurrent POST /auth/login loops")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per phase")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
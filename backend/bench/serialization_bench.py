@@ -0,0 +1,121 @@
+"""CPU cost of rendering a large book list: models + response_model vs plain dicts.
+
+No DB or server needed — builds `--items` rows shaped like BooksRepository list
+rows and renders them the way each path does:
+
+    python bench/serialization_bench.py --items 10000 --repeat 20
+
+- response_model: endpoint returns BookPageResponse, FastAPI validates it
+  against response_model again and dumps it (same TypeAdapter calls)
+- model_dump_json: BookPageResponse built once, dumped by pydantic
+- fast path: as_list_items() dicts + app.core.serialization.dumps (orjson)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.api.v1.books import as_list_items  # noqa: E402
+from app.core import serialization  # noqa: E402
+from app.schemas.book import BookListItemResponse, BookPageResponse  # noqa: E402
+
+
+# строка BooksRepository.list_after (LIST_COLUMNS)
+ListRow = namedtuple("ListRow", "id title year authors genres favorites_count")
+
+
+def make_rows(n: int) -> list[ListRow]:
+    authors = [f"Автор {i}" for i in range(1, 201)]
+    genres = [f"Genre {i}" for i in range(1, 31)]
+    return [
+        ListRow(
+            i,
+            f"Book title number {i}",
+            1950 + i % 75,
+            sorted({authors[i % 200], authors[(i * 7) % 200]})[: 1 + i % 2],
+            [genres[i % 30]],
+            i % 97,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def as_models(rows: list[ListRow]) -> BookPageResponse:
+    items = [
+        BookListItemResponse(
+            id=r.id,
+            title=r.title,
+            year=r.year,
+            authors=r.authors,
+            genres=r.genres,
+            favorites_count=r.favorites_count,
+        )
+        for r in rows
+    ]
+    return BookPageResponse(items=items, next_cursor=None)
+
+
+# так FastAPI обрабатывает значение, возвращённое из эндпоинта с response_model
+page_adapter = TypeAdapter(BookPageResponse)
+
+
+def render_response_model(rows: list[ListRow]) -> bytes:
+    return page_adapter.dump_json(page_adapter.validate_python(as_models(rows)))
+
+
+def render_model_dump_json(rows: list[ListRow]) -> bytes:
+    return as_models(rows).model_dump_json().encode("utf-8")
+
+
+def render_fast_path(rows: list[ListRow]) -> bytes:
+    return serialization.dumps({"items": as_list_items(rows), "next_cursor": None})
+
+
+def measure(render, rows: list[ListRow], repeat: int) -> dict:
+    body = render(rows)  # прогрев
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(rows)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "median_ms": round(samples[len(samples) // 2] * 1000, 2),
+        "min_ms": round(samples[0] * 1000, 2),
+        "bytes": len(body),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    rows = make_rows(args.items)
+    assert render_fast_path(rows) == render_model_dump_json(rows), "fast path must render identical JSON"
+
+    return {
+        "items": args.items,
+        "orjson": serialization.orjson is not None,
+        "response_model": measure(render_response_model, rows, args.repeat),
+        "model_dump_json": measure(render_model_dump_json, rows, args.repeat),
+        "fast_path": measure(render_fast_path, rows, args.repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
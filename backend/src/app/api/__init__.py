@@ -1,12 +1,14 @@
 from fastapi import APIRouter
 
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.v1 import v1_router
 
 api_router = APIRouter()
 
 # без префикса
 api_router.include_router(health_router, tags=["health"])
+api_router.include_router(metrics_router)
 
 # версия API
 api_router.include_router(v1_router)
\ No newline at end of file
@@ -6,10 +6,11 @@ from jose import JWTError
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import principal_cache
 from app.core.config import settings
 from app.core.db import get_session
-from app.core.security import decode_access_token
-from app.models.user import User, UserRole
+from app.core.security import Principal, decode_access_token, token_fingerprint
+from app.models.user import UserRole
 from app.repositories.users_repo import UsersRepository
 
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -27,10 +28,12 @@ async def get_current_user(
     session: AsyncSession = Depends(get_session),
     credentials: HTTPAuthorizationCredentials | None = Security(bearer_scheme),
     x_user_id: int | None = Header(default=None, alias="X-User-Id"),
-) -> User:
-    """Get current user.
+) -> Principal:
+    """Get current user as a lightweight Principal (id, email, role).
 
     Primary auth: Authorization: Bearer <jwt>
+    Resolved principals are cached by sha256(token) for a short TTL bounded
+    by the token's exp, so a repeat request costs no DB round trip.
 
     Backward-compatible dev auth (optional): X-User-Id header.
     Allowed only in env in {local,test} to keep local/dev workflows.
@@ -43,44 +46,54 @@ async def get_current_user(
         if not token:
             _raise_unauthorized("Invalid authentication credentials")
 
-        try:
-            payload = decode_access_token(token)
-        except JWTError as exc:
-            # Не раскрываем клиенту детали, но логируем для отладки.
-            logger.warning("JWT decode failed: {}", exc)
+        async def load() -> Principal | None:
+            try:
+                payload = decode_access_token(token)
+            except JWTError as exc:
+                # Не раскрываем клиенту детали, но логируем для отладки.
+                logger.warning("JWT decode failed: {}", exc)
+                _raise_unauthorized("Invalid authentication credentials")
+
+            sub = payload.get("sub")
+            if not isinstance(sub, str) or not sub:
+                _raise_unauthorized("Invalid authentication credentials")
+
+            try:
+                user_id = int(sub)
+            except ValueError:
+                _raise_unauthorized("Invalid authentication credentials")
+
+            user = await users_repo.get_by_id(user_id)
+            if user is None:
+                return None
+
+            exp = payload.get("exp")
+            expires_at = float(exp) if isinstance(exp, (int, float)) else float("inf")
+            return Principal(id=user.id, email=user.email, role=user.role, expires_at=expires_at)
+
+        # попадание в кэш = токен уже проверялся и ещё не истёк (TTL записи <= exp)
+        principal = await principal_cache.get_or_load(("token", token_fingerprint(token)), load)
+        if principal is None:
             _raise_unauthorized("Invalid authentication credentials")
 
-        sub = payload.get("sub")
-        if not isinstance(sub, str) or not sub:
-            _raise_unauthorized("Invalid authentication credentials")
-
-        try:
-            user_id = int(sub)
-        except ValueError:
-            _raise_unauthorized("Invalid authentication credentials")
-
-        user = await users_repo.get_by_id(user_id)
-        if user is None:
-            _raise_unauthorized("Invalid authentication credentials")
-
-        return user
+        return principal
 
     # 2) DEV fallback: X-User-Id
     if x_user_id is not None and settings.env in ("local", "test"):
         user = await users_repo.get_by_id(x_user_id)
         if user is None:
             _raise_unauthorized("User not found")
-        return user
+        return Principal(id=user.id, email=user.email, role=user.role)
 
     _raise_unauthorized("Not authenticated")
 
 
-async def require_auth(current_user: User = Depends(get_current_user)) -> User:
+async def require_auth(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Explicit dependency for endpoints that require any authenticated user."""
     return current_user
 
 
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role != UserRole.admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    # Prometheus scrape: значения этого воркера
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import io
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import StreamingResponse
 
 from app.api.deps import require_admin
-from app.core.db import get_session
+from app.core.cache import catalog_cache, principal_cache
+from app.core.db import get_session, pool_stats, replicas
+from app.core.passwords import password_hasher
+from app.schemas.book import BookImportResponse
 from app.services.export_service import ExportService
+from app.services.import_service import ImportFormatError, ImportService
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -16,10 +23,49 @@ async def export_books_csv(
     session: AsyncSession = Depends(get_session),
     _admin=Depends(require_admin),
 ) -> StreamingResponse:
-    service = ExportService()
-    generator = service.stream_books_csv(session)
-
-    headers = {
-        "Content-Disposition": 'attachment; filename="books.csv"',
-    }
+    # gzip/br по Accept-Encoding — потоково, в CompressionMiddleware
+    generator = ExportService().stream_books_csv(session)
+    headers = {"Content-Disposition": 'attachment; filename="books.csv"'}
     return StreamingResponse(generator, media_type="text/csv", headers=headers)
+
+
+@router.post("/books/import", response_model=BookImportResponse)
+async def import_books_csv(
+    file: UploadFile = File(...),
+    dry_run: bool = Query(default=False),
+    session: AsyncSession = Depends(get_session),
+    _admin=Depends(require_admin),
+) -> BookImportResponse:
+    # multipart уже выгружен на диск (SpooledTemporaryFile) — читаем его построчно
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await ImportService(session).import_books_csv(lines, dry_run=dry_run)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    finally:
+        lines.detach()
+    return BookImportResponse.model_validate(asdict(report))
+
+
+@router.get("/cache/stats")
+async def cache_stats(_admin=Depends(require_admin)) -> dict:
+    # hit/miss/eviction счётчики in-process кэшей (значения этого воркера)
+    return {"catalog": catalog_cache.stats(), "principal": principal_cache.stats()}
+
+
+@router.get("/passwords/stats")
+async def password_hasher_stats(_admin=Depends(require_admin)) -> dict:
+    # очередь и время bcrypt (значения этого воркера)
+    return password_hasher.stats()
+
+
+@router.get("/db/pool/stats")
+async def db_pool_stats(_admin=Depends(require_admin)) -> dict:
+    # занятые/свободные соединения пула (значения этого воркера)
+    return pool_stats()
+
+
+@router.get("/db/replicas")
+async def db_replicas(_admin=Depends(require_admin)) -> list[dict]:
+    # здоровье и отставание реплик по последней проверке (значения этого воркера)
+    return replicas.stats()
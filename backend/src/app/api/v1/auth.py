@@ -5,7 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
 from app.core.db import get_session
-from app.models.user import User
+from app.core.passwords import PasswordHasherBusy
+from app.core.security import Principal
+from app.repositories.users_repo import UsersRepository
 from app.schemas.auth import AuthLoginRequest, AuthRegisterRequest, TokenResponse
 from app.schemas.user import UserMeResponse
 from app.services.auth_service import AuthService
@@ -13,6 +15,14 @@ from app.services.auth_service import AuthService
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _raise_hasher_busy() -> None:
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/register",
     status_code=status.HTTP_201_CREATED,
@@ -23,7 +33,10 @@ async def register(
     session: AsyncSession = Depends(get_session),
 ) -> UserMeResponse:
     service = AuthService(session)
-    user = await service.register(email=payload.email, password=payload.password)
+    try:
+        user = await service.register(email=payload.email, password=payload.password)
+    except PasswordHasherBusy:
+        _raise_hasher_busy()
 
     if user is None:
         raise HTTPException(
@@ -44,7 +57,10 @@ async def login(
     session: AsyncSession = Depends(get_session),
 ) -> TokenResponse:
     service = AuthService(session)
-    token = await service.login(email=payload.email, password=payload.password)
+    try:
+        token = await service.login(email=payload.email, password=payload.password)
+    except PasswordHasherBusy:
+        _raise_hasher_busy()
 
     if token is None:
         # одинаковое сообщение, без утечки что именно неверно
@@ -62,6 +78,14 @@ async def login(
     response_model=UserMeResponse,
 )
 async def me(
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ) -> UserMeResponse:
-    return UserMeResponse.model_validate(current_user)
+    # Principal может быть из кэша; счётчик избранного читаем свежим (одна колонка по PK)
+    favorites_count = await UsersRepository(session).get_favorites_count(current_user.id)
+    return UserMeResponse(
+        id=current_user.id,
+        email=current_user.email,
+        role=current_user.role.value,
+        favorites_count=favorites_count or 0,
+    )
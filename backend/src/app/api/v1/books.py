@@ -1,36 +1,81 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Any, Iterable, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.api.deps import require_admin
-from app.core.db import get_session
+from app.core.cache import catalog_cache, invalidate_catalog_books
+from app.core.config import settings
+from app.core.db import get_catalog_list_session, get_read_session, get_session
+from app.core.http_cache import RenderedPayload, conditional_json_response
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.serialization import json_response
 from app.models.author import Author
 from app.models.book import Book
 from app.models.genre import Genre
-from app.schemas.book import BookCreateRequest, BookDetailResponse, BookListItemResponse
+from app.repositories.books_repo import BookFilters, BooksRepository
+from app.repositories.catalog_repo import CatalogRepository
+from app.services.books_service import BooksService
+from app.schemas.book import (
+    BookBatchCreateRequest,
+    BookBatchCreateResponse,
+    BookBatchItemResult,
+    BookCreateRequest,
+    BookDetailResponse,
+    BookFacetsResponse,
+    BookPageResponse,
+)
 
 
 router = APIRouter(prefix="/books", tags=["books"])
 
 
-def _as_list_items(books: Iterable[Book]) -> list[BookListItemResponse]:
+def as_list_items(rows: Iterable[Row]) -> list[dict[str, Any]]:
+    """BookListItemResponse-shaped dicts from BooksRepository list rows (LIST_COLUMNS)."""
     return [
-        BookListItemResponse(
-            id=b.id,
-            title=b.title,
-            year=b.year,
-            authors=[a.name for a in (b.authors or [])],
-            genres=[g.name for g in (b.genres or [])],
-        )
-        for b in books
+        {
+            "id": r.id,
+            "title": r.title,
+            "year": r.year,
+            "authors": r.authors,
+            "genres": r.genres,
+            "favorites_count": r.favorites_count,
+        }
+        for r in rows
     ]
 
 
+def book_filters(
+    genre_id: int | None = Query(default=None, ge=1),
+    author_id: int | None = Query(default=None, ge=1),
+    year_from: int | None = Query(default=None, ge=0, le=2100),
+    year_to: int | None = Query(default=None, ge=0, le=2100),
+) -> BookFilters:
+    if year_from is not None and year_to is not None and year_from > year_to:
+        raise HTTPException(status_code=422, detail="year_from must not be greater than year_to")
+    return BookFilters(genre_id=genre_id, author_id=author_id, year_from=year_from, year_to=year_to)
+
+
+def _facets_data(rows: Iterable[Row]) -> dict[str, Any]:
+    """BookFacetsResponse-shaped dict from BooksRepository.facets rows."""
+    data: dict[str, Any] = {"total": 0, "genres": [], "authors": [], "years": []}
+    for r in rows:
+        if r.kind == "total":
+            data["total"] = r.count
+        elif r.kind == "year":
+            data["years"].append({"year": r.value, "count": r.count})
+        else:
+            data[f"{r.kind}s"].append({"id": r.value, "name": r.name, "count": r.count})
+    # UNION ALL не сохраняет порядок веток — сортируем здесь
+    for name in ("genres", "authors"):
+        data[name].sort(key=lambda f: (-f["count"], f["name"]))
+    data["years"].sort(key=lambda f: f["year"])
+    return data
+
+
 def _as_detail(book: Book) -> BookDetailResponse:
     return BookDetailResponse(
         id=book.id,
@@ -43,108 +88,250 @@ def _as_detail(book: Book) -> BookDetailResponse:
     )
 
 
+def _clean_names(raw: Iterable) -> list[str]:
+    names: list[str] = []
+    seen: set[str] = set()
+    for item in raw:
+        name = str(item).strip()
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
 async def _load_authors(session: AsyncSession, authors: list[int] | list[str]) -> list[Author]:
     if not authors:
         raise HTTPException(status_code=422, detail="authors must not be empty")
 
+    repo = CatalogRepository(session)
+
     # by ids
     if isinstance(authors[0], int):
         ids = sorted(set(int(x) for x in authors))
-        res = await session.execute(select(Author).where(Author.id.in_(ids)))
-        found = list(res.scalars().all())
+        found = await repo.get_authors_by_ids(ids)
         if len(found) != len(ids):
             raise HTTPException(status_code=422, detail="One or more author ids not found")
         return found
 
-    # by names (create missing)
-    names = []
-    seen = set()
-    for raw in authors:
-        name = str(raw).strip()
-        if not name:
-            continue
-        if name not in seen:
-            seen.add(name)
-            names.append(name)
+    # by names (create missing) — постоянное число запросов на любой список
+    names = _clean_names(authors)
     if not names:
         raise HTTPException(status_code=422, detail="authors must not be empty")
-
-    res = await session.execute(select(Author).where(Author.name.in_(names)))
-    existing = {a.name: a for a in res.scalars().all()}
-    result: list[Author] = []
-    for name in names:
-        author = existing.get(name)
-        if author is None:
-            author = Author(name=name)
-            session.add(author)
-            await session.flush()  # assigns id
-        result.append(author)
-    return result
+    return await repo.upsert_authors(names)
 
 
 async def _load_genres(session: AsyncSession, genres: list[int] | list[str]) -> list[Genre]:
     if not genres:
         raise HTTPException(status_code=422, detail="genres must not be empty")
 
+    repo = CatalogRepository(session)
+
     # by ids
     if isinstance(genres[0], int):
         ids = sorted(set(int(x) for x in genres))
-        res = await session.execute(select(Genre).where(Genre.id.in_(ids)))
-        found = list(res.scalars().all())
+        found = await repo.get_genres_by_ids(ids)
         if len(found) != len(ids):
             raise HTTPException(status_code=422, detail="One or more genre ids not found")
         return found
 
     # by names (create missing)
-    names = []
-    seen = set()
-    for raw in genres:
-        name = str(raw).strip()
-        if not name:
-            continue
-        if name not in seen:
-            seen.add(name)
-            names.append(name)
+    names = _clean_names(genres)
     if not names:
         raise HTTPException(status_code=422, detail="genres must not be empty")
+    return await repo.upsert_genres(names)
+
+
+@router.get("", response_model=BookPageResponse)
+async def list_books(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(
+        default=settings.books_page_size_default,
+        ge=1,
+        le=settings.books_page_size_max,
+    ),
+    sort: Literal["id", "popular"] = Query(default="id"),
+    filters: BookFilters = Depends(book_filters),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    accept_encoding: str | None = Header(default=None, alias="Accept-Encoding"),
+    session: AsyncSession = Depends(get_catalog_list_session),
+) -> Response:
+    if not filters.is_empty:
+        return await _list_books_filtered(cursor, limit, sort, filters, if_none_match, accept_encoding, session)
+    if sort == "popular":
+        return await _list_books_popular(cursor, limit, if_none_match, accept_encoding, session)
 
-    res = await session.execute(select(Genre).where(Genre.name.in_(names)))
-    existing = {g.name: g for g in res.scalars().all()}
-    result: list[Genre] = []
-    for name in names:
-        genre = existing.get(name)
-        if genre is None:
-            genre = Genre(name=name)
-            session.add(genre)
-            await session.flush()
-        result.append(genre)
-    return result
-
-
-@router.get("", response_model=list[BookListItemResponse])
-async def list_books(session: AsyncSession = Depends(get_session)) -> list[BookListItemResponse]:
-    stmt = (
-        select(Book)
-        .options(selectinload(Book.authors), selectinload(Book.genres))
-        .order_by(Book.id)
+    after_id: int | None = None
+    if cursor:
+        try:
+            (after_id,) = decode_cursor(cursor, int)
+        except InvalidCursorError:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    async def load() -> RenderedPayload:
+        # +1 строка: так узнаём, есть ли следующая страница, без COUNT(*)
+        rows = await BooksRepository(session).list_after(after_id=after_id, limit=limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].id)
+        return RenderedPayload.from_data({"items": as_list_items(rows), "next_cursor": next_cursor})
+
+    # на попадании в кэш ни ORM, ни сериализации, ни сжатия: готовые байты или 304
+    payload = await catalog_cache.get_or_load(("books", after_id, limit), load)
+    return conditional_json_response(
+        payload,
+        if_none_match=if_none_match,
+        cache_control=settings.catalog_cache_control,
+        accept_encoding=accept_encoding,
     )
-    res = await session.execute(stmt)
-    books = res.scalars().unique().all()
-    return _as_list_items(books)
 
 
-@router.get("/{book_id}", response_model=BookDetailResponse)
-async def get_book(book_id: int, session: AsyncSession = Depends(get_session)) -> BookDetailResponse:
-    stmt = (
-        select(Book)
-        .where(Book.id == book_id)
-        .options(selectinload(Book.authors), selectinload(Book.genres))
+async def _list_books_popular(
+    cursor: str | None,
+    limit: int,
+    if_none_match: str | None,
+    accept_encoding: str | None,
+    session: AsyncSession,
+) -> Response:
+    after: tuple[int, int] | None = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, int, int)
+        except InvalidCursorError:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    async def load() -> RenderedPayload:
+        rows = await BooksRepository(session).list_popular_after(after=after, limit=limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].favorites_count, rows[-1].id)
+        return RenderedPayload.from_data({"items": as_list_items(rows), "next_cursor": next_cursor})
+
+    # порядок зависит от счётчиков: запись в избранное сбрасывает все такие страницы
+    # (invalidate_catalog_counters)
+    payload = await catalog_cache.get_or_load(("books_popular", after, limit), load)
+    return conditional_json_response(
+        payload,
+        if_none_match=if_none_match,
+        cache_control=settings.catalog_cache_control,
+        accept_encoding=accept_encoding,
     )
-    res = await session.execute(stmt)
-    book = res.scalar_one_or_none()
-    if book is None:
+
+
+async def _list_books_filtered(
+    cursor: str | None,
+    limit: int,
+    sort: Literal["id", "popular"],
+    filters: BookFilters,
+    if_none_match: str | None,
+    accept_encoding: str | None,
+    session: AsyncSession,
+) -> Response:
+    # те же keyset-курсоры, что и без фильтров: id или (favorites_count, id)
+    key_types = (int,) if sort == "id" else (int, int)
+    after: tuple | None = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, *key_types)
+        except InvalidCursorError:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    async def load() -> RenderedPayload:
+        repo = BooksRepository(session)
+        if sort == "id":
+            rows = await repo.list_after(after_id=after[0] if after else None, limit=limit + 1, filters=filters)
+        else:
+            rows = await repo.list_popular_after(after=after, limit=limit + 1, filters=filters)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last.id) if sort == "id" else encode_cursor(last.favorites_count, last.id)
+        return RenderedPayload.from_data({"items": as_list_items(rows), "next_cursor": next_cursor})
+
+    payload = await catalog_cache.get_or_load(("books_filtered", filters, sort, after, limit), load)
+    return conditional_json_response(
+        payload,
+        if_none_match=if_none_match,
+        cache_control=settings.catalog_cache_control,
+        accept_encoding=accept_encoding,
+    )
+
+
+@router.get("/facets", response_model=BookFacetsResponse)
+async def book_facets(
+    filters: BookFilters = Depends(book_filters),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    accept_encoding: str | None = Header(default=None, alias="Accept-Encoding"),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    async def load() -> RenderedPayload:
+        rows = await BooksRepository(session).facets(filters, limit=settings.books_facet_limit)
+        return RenderedPayload.from_data(_facets_data(rows))
+
+    # ключ — сигнатура фильтра: все страницы одной выборки делят одни счётчики
+    payload = await catalog_cache.get_or_load(("book_facets", filters), load)
+    return conditional_json_response(
+        payload,
+        if_none_match=if_none_match,
+        cache_control=settings.catalog_cache_control,
+        accept_encoding=accept_encoding,
+    )
+
+
+@router.get("/search", response_model=BookPageResponse)
+async def search_books(
+    q: str = Query(min_length=1, max_length=200),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(
+        default=settings.books_page_size_default,
+        ge=1,
+        le=settings.books_page_size_max,
+    ),
+    session: AsyncSession = Depends(get_catalog_list_session),
+) -> Response:
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=422, detail="q must not be empty")
+
+    after: tuple[float, int] | None = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, float, int)
+        except InvalidCursorError:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    rows = await BooksRepository(session).search(q=q, after=after, limit=limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(float(rows[-1].rank), rows[-1].id)
+
+    return json_response({"items": as_list_items(rows), "next_cursor": next_cursor})
+
+
+@router.get("/{book_id}", response_model=BookDetailResponse)
+async def get_book(
+    book_id: int,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    accept_encoding: str | None = Header(default=None, alias="Accept-Encoding"),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    async def load() -> RenderedPayload | None:
+        book = await BooksRepository(session).get_by_id(book_id, profile="book_detail")
+        return RenderedPayload.from_model(_as_detail(book)) if book is not None else None
+
+    # None тоже кэшируется (коротко): частые запросы к несуществующим id не бьют в БД
+    payload = await catalog_cache.get_or_load(("book", book_id), load)
+    if payload is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
-    return _as_detail(book)
+    return conditional_json_response(
+        payload,
+        if_none_match=if_none_match,
+        cache_control=settings.catalog_cache_control,
+        accept_encoding=accept_encoding,
+    )
 
 
 @router.post("", response_model=BookDetailResponse, status_code=status.HTTP_201_CREATED)
@@ -166,23 +353,58 @@ async def create_book(
     book.genres = genres
     session.add(book)
     await session.commit()
-    await session.refresh(book)
-    await session.refresh(book, attribute_names=["authors", "genres"])
+    invalidate_catalog_books([book.id])
 
+    # expire_on_commit=False: id и связи уже в памяти, refresh не нужен
     return _as_detail(book)
 
 
+@router.post(":batch", response_model=BookBatchCreateResponse)
+async def create_books_batch(
+    payload: BookBatchCreateRequest,
+    session: AsyncSession = Depends(get_session),
+    _admin=Depends(require_admin),
+) -> BookBatchCreateResponse:
+    outcomes = await BooksService(session).create_many(payload.items, mode=payload.mode)
+    failed = [o for o in outcomes if o.error is not None]
+
+    if payload.mode == "all_or_nothing" and failed:
+        await session.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail=[{"index": o.index, "error": o.error} for o in failed],
+        )
+
+    created_ids = [o.book.id for o in outcomes if o.book is not None]
+    await session.commit()
+    invalidate_catalog_books(created_ids)
+
+    return BookBatchCreateResponse(
+        mode=payload.mode,
+        created=len(created_ids),
+        failed=len(failed),
+        items=[
+            BookBatchItemResult(
+                index=o.index,
+                status="created" if o.book is not None else "failed",
+                book=o.book,
+                error=o.error,
+            )
+            for o in outcomes
+        ],
+    )
+
+
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(
     book_id: int,
     session: AsyncSession = Depends(get_session),
     _admin=Depends(require_admin),
 ) -> Response:
-    res = await session.execute(select(Book).where(Book.id == book_id))
-    book = res.scalar_one_or_none()
-    if book is None:
+    deleted = await BooksRepository(session).delete_by_id(book_id)
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
-    await session.delete(book)
     await session.commit()
+    invalidate_catalog_books([book_id])
     return Response(status_code=status.HTTP_204_NO_CONTENT)
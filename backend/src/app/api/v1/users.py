@@ -1,59 +1,154 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import select
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_current_user
-from app.core.db import get_session
-from app.models.book import Book
-from app.models.favorite import Favorite
-from app.models.user import User
-from app.schemas.book import BookListItemResponse
-from app.services.favorites_service import FavoritesService
+from app.api.v1.books import as_list_items
+from app.core.cache import invalidate_catalog_counters
+from app.core.config import settings
+from app.core.db import get_read_session, get_session
+from app.core.security import Principal
+from app.core.http_cache import etag_matches, make_etag, not_modified
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.serialization import dumps
+from app.repositories.books_repo import BooksRepository
+from app.repositories.favorites_repo import FavoritesRepository
+from app.schemas.book import BookPageResponse
+from app.schemas.favorite import FavoritesChangeResponse, FavoritesPatchRequest, FavoritesReplaceRequest
+from app.services.favorites_service import FavoritesChange, FavoritesService
 
 router = APIRouter(prefix="/users/me", tags=["users"])
 
+_book_ids_adapter = TypeAdapter(list[int])
+
+
+def _json_with_etag(body: bytes, etag: str, cache_control: str) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
 
-@router.get("/favorites", response_model=list[BookListItemResponse])
+@router.get("/favorites", response_model=BookPageResponse)
 async def list_favorites(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
-) -> list[BookListItemResponse]:
-    stmt = (
-        select(Book)
-        .join(Favorite, Favorite.book_id == Book.id)
-        .where(Favorite.user_id == current_user.id)
-        .options(selectinload(Book.authors), selectinload(Book.genres))
-        .order_by(Book.id)
+    cursor: str | None = Query(default=None),
+    limit: int = Query(
+        default=settings.books_page_size_default,
+        ge=1,
+        le=settings.books_page_size_max,
+    ),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+) -> Response:
+    """Favorites, newest first, keyset-paginated by (added_at, book_id)."""
+    after: tuple[datetime, int] | None = None
+    if cursor:
+        try:
+            added_at, book_id = decode_cursor(cursor, str, int)
+            after = (datetime.fromisoformat(added_at), book_id)
+        except (InvalidCursorError, ValueError):
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    rows = await BooksRepository(session).list_favorited_page(
+        user_id=current_user.id,
+        after=after,
+        limit=limit + 1,
     )
-    res = await session.execute(stmt)
-    books = res.scalars().unique().all()
-
-    return [
-        BookListItemResponse(
-            id=b.id,
-            title=b.title,
-            year=b.year,
-            authors=[a.name for a in (b.authors or [])],
-            genres=[g.name for g in (b.genres or [])],
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].added_at.isoformat(), rows[-1].id)
+
+    # ETag — от тела страницы (её книги, их favorites_count, next_cursor): O(limit),
+    # а не O(всего избранного); совпал -> 304 без передачи тела
+    body = dumps({"items": as_list_items(rows), "next_cursor": next_cursor})
+    etag = make_etag("favorites", str(current_user.id), body)
+    cache_control = settings.private_cache_control
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    return _json_with_etag(body, etag, cache_control)
+
+
+@router.get("/favorites/ids", response_model=list[int])
+async def list_favorite_ids(
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+) -> Response:
+    """All favorited book ids as a flat sorted array — enough to mark hearts on any catalog page."""
+    repo = FavoritesRepository(session)
+    version = await repo.fingerprint(user_id=current_user.id)
+    etag = make_etag("favorite-ids", str(current_user.id), version)
+    cache_control = settings.private_cache_control
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+
+    ids = await repo.list_book_ids(user_id=current_user.id)
+    return _json_with_etag(_book_ids_adapter.dump_json(ids), etag, cache_control)
+
+
+def _check_bulk_size(count: int) -> None:
+    if count > settings.favorites_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many book ids (max {settings.favorites_bulk_max_items})",
         )
-        for b in books
-    ]
+
+
+def _as_change_response(change: FavoritesChange) -> FavoritesChangeResponse:
+    return FavoritesChangeResponse(added=change.added, removed=change.removed, not_found=change.not_found)
+
+
+@router.put("/favorites", response_model=FavoritesChangeResponse)
+async def replace_favorites(
+    payload: FavoritesReplaceRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+) -> FavoritesChangeResponse:
+    """Set favorites to exactly `book_ids` (unknown books are skipped); returns the applied diff."""
+    _check_bulk_size(len(payload.book_ids))
+    change = await FavoritesService(session).replace(user_id=current_user.id, book_ids=payload.book_ids)
+    # счётчики книг изменил триггер — кэшированные страницы каталога их уже не отражают
+    invalidate_catalog_counters(change.added + change.removed)
+    return _as_change_response(change)
+
+
+@router.patch("/favorites", response_model=FavoritesChangeResponse)
+async def patch_favorites(
+    payload: FavoritesPatchRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+) -> FavoritesChangeResponse:
+    """Add and remove lists of books in one transaction; returns what actually changed."""
+    _check_bulk_size(len(payload.add) + len(payload.remove))
+    change = await FavoritesService(session).apply_changes(
+        user_id=current_user.id,
+        add=payload.add,
+        remove=payload.remove,
+    )
+    invalidate_catalog_counters(change.added + change.removed)
+    return _as_change_response(change)
 
 
 @router.post("/favorites/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def add_favorite(
     book_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Response:
     service = FavoritesService(session)
     result = await service.add_favorite(user_id=current_user.id, book_id=book_id)
 
     if result == "book_not_found":
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
+    if result == "created":
+        invalidate_catalog_counters([book_id])
 
     # created/exists -> 204 (идемпотентно)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -63,7 +158,7 @@ async def add_favorite(
 async def remove_favorite(
     book_id: int,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Response:
     """
     Поведение зафиксировано:
@@ -76,6 +171,8 @@ async def remove_favorite(
 
     if result == "book_not_found":
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
+    if result == "deleted":
+        invalidate_catalog_counters([book_id])
 
     # deleted/missing -> 204
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -5,17 +5,25 @@ import asyncio
 import sys
 
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from app.core.config import settings
-from app.core.db import AsyncSessionMaker
+from app.core.db import AsyncSessionMaker, engine_options
+from app.core.cache_events import notify_catalog_changed, notify_principal_changed
 from app.models.user import User, UserRole
+from app.services.counters_service import FavoritesCountersService
+from app.services.import_service import ImportFormatError, ImportService
+from app.services.seed_service import SeedPlan, SeedService
 
 
 EXIT_OK = 0
 EXIT_ERROR = 1
 EXIT_USAGE = 2        # argparse обычно использует 2
 EXIT_NOT_FOUND = 3    # пользователя нет
+EXIT_ROW_ERRORS = 4   # импорт прошёл, но часть строк отклонена
+
+# сколько ошибок импорта печатать в stderr
+IMPORT_ERRORS_SHOWN = 50
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -42,6 +50,79 @@ def build_parser() -> argparse.ArgumentParser:
         help="Role to set: admin|client",
     )
 
+    import_books = subparsers.add_parser(
+        "import-books",
+        help="Import books from CSV (same format as /admin/books/export.csv); "
+        "running API workers drop their catalog cache on commit (LISTEN/NOTIFY)",
+    )
+    import_books.add_argument(
+        "--file",
+        required=True,
+        help="Path to CSV file (columns: title, year, isbn, authors, genres[, description])",
+    )
+    import_books.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate and merge inside a transaction, then roll back",
+    )
+
+    reconcile = subparsers.add_parser(
+        "reconcile-favorites-counts",
+        help="Recompute books/users favorites_count from the favorites table",
+    )
+    reconcile.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="Rows per UPDATE/commit (default: 10000)",
+    )
+
+    defaults = SeedPlan()
+    seed = subparsers.add_parser(
+        "seed",
+        help="Generate a reproducible synthetic catalog (books, authors, genres, users, favorites)",
+    )
+    seed.add_argument("--books", type=int, default=defaults.books, help=f"default: {defaults.books}")
+    seed.add_argument("--authors", type=int, default=defaults.authors, help=f"default: {defaults.authors}")
+    seed.add_argument("--genres", type=int, default=defaults.genres, help=f"default: {defaults.genres}")
+    seed.add_argument("--users", type=int, default=defaults.users, help=f"default: {defaults.users}")
+    seed.add_argument(
+        "--favorites",
+        type=int,
+        default=defaults.favorites,
+        help=f"Total favorites, spread over users (default: {defaults.favorites})",
+    )
+    seed.add_argument(
+        "--seed",
+        dest="random_seed",
+        type=int,
+        default=defaults.random_seed,
+        help=f"Random seed; same seed on an empty DB gives the same data (default: {defaults.random_seed})",
+    )
+    seed.add_argument(
+        "--workers",
+        type=int,
+        default=defaults.workers,
+        help=f"Parallel DB connections for COPY (default: {defaults.workers})",
+    )
+    seed.add_argument(
+        "--chunk-size",
+        type=int,
+        default=defaults.chunk_size,
+        help=f"Rows per COPY/transaction (default: {defaults.chunk_size})",
+    )
+    seed.add_argument(
+        "--zipf-s",
+        type=float,
+        default=defaults.zipf_s,
+        help=f"Zipf exponent of book/author/genre popularity (default: {defaults.zipf_s})",
+    )
+    seed.add_argument(
+        "--password",
+        default=defaults.password,
+        help="Password of all synthetic users (seed-user-<id>@example.com)",
+    )
+
     return parser
 
 
@@ -67,6 +148,8 @@ async def cmd_set_role(email: str, role: str) -> int:
             return EXIT_OK
 
         user.role = role_enum
+        # воркеры API сбросят закэшированный principal пользователя после commit
+        await notify_principal_changed(session, user.id)
         await session.commit()
         await session.refresh(user)
 
@@ -74,6 +157,95 @@ async def cmd_set_role(email: str, role: str) -> int:
         return EXIT_OK
 
 
+async def cmd_import_books(path: str, dry_run: bool) -> int:
+    if not settings.database_url:
+        print("ERROR: DATABASE_URL is not set", file=sys.stderr)
+        return EXIT_ERROR
+
+    try:
+        f = open(path, encoding="utf-8-sig", newline="")
+    except OSError as e:
+        print(f"ERROR: cannot open {path}: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    with f:
+        async with AsyncSessionMaker() as session:  # type: AsyncSession
+            try:
+                report = await ImportService(session).import_books_csv(f, dry_run=dry_run)
+            except ImportFormatError as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                return EXIT_ERROR
+
+    for err in report.errors[:IMPORT_ERRORS_SHOWN]:
+        print(f"line {err.line}: {err.error}", file=sys.stderr)
+    if report.errors_total > IMPORT_ERRORS_SHOWN:
+        print(f"... and {report.errors_total - IMPORT_ERRORS_SHOWN} more errors", file=sys.stderr)
+
+    mode = " (dry run, rolled back)" if dry_run else ""
+    print(
+        f"Rows: {report.rows_total}, inserted: {report.inserted}, "
+        f"rejected: {report.errors_total}{mode}"
+    )
+    return EXIT_ROW_ERRORS if report.errors_total else EXIT_OK
+
+
+async def cmd_reconcile_favorites_counts(batch_size: int) -> int:
+    if not settings.database_url:
+        print("ERROR: DATABASE_URL is not set", file=sys.stderr)
+        return EXIT_ERROR
+    if batch_size <= 0:
+        print("ERROR: --batch-size must be positive", file=sys.stderr)
+        return EXIT_USAGE
+
+    async with AsyncSessionMaker() as session:  # type: AsyncSession
+        fixed = await FavoritesCountersService(session).reconcile(batch_size=batch_size)
+        if any(fixed.values()):
+            # исправленные счётчики видны в кэшированных страницах каталога воркеров API
+            await notify_catalog_changed(session)
+            await session.commit()
+
+    for table, count in fixed.items():
+        print(f"{table}: corrected {count} rows")
+    return EXIT_OK
+
+
+async def cmd_seed(plan: SeedPlan) -> int:
+    if not settings.database_url:
+        print("ERROR: DATABASE_URL is not set", file=sys.stderr)
+        return EXIT_ERROR
+    counts = (plan.books, plan.authors, plan.genres, plan.users, plan.favorites)
+    if min(counts) < 0 or plan.workers <= 0 or plan.chunk_size <= 0:
+        print("ERROR: counts must be >= 0, --workers and --chunk-size positive", file=sys.stderr)
+        return EXIT_USAGE
+    if plan.books and not (plan.authors and plan.genres):
+        print("ERROR: books need at least one author and one genre", file=sys.stderr)
+        return EXIT_USAGE
+    if plan.favorites > plan.users * plan.books:
+        print("ERROR: --favorites exceeds users * books", file=sys.stderr)
+        return EXIT_USAGE
+    if not 8 <= len(plan.password.encode("utf-8")) <= 72:
+        print("ERROR: --password must be 8..72 bytes (bcrypt)", file=sys.stderr)
+        return EXIT_USAGE
+
+    # свой engine: пул ровно на --workers соединений, без ожидания DB_POOL_TIMEOUT_S
+    options = engine_options(settings) | {"pool_size": plan.workers, "max_overflow": 0}
+    seed_engine = create_async_engine(settings.database_url, **options)
+    try:
+        report = await SeedService(seed_engine).seed(plan)
+        async with seed_engine.begin() as conn:
+            await notify_catalog_changed(conn)
+    finally:
+        await seed_engine.dispose()
+
+    for phase, elapsed in report.phases.items():
+        print(f"{phase}: {elapsed:.2f}s")
+    print(
+        f"Genres: {report.genres}, authors: {report.authors}, books: {report.books}, "
+        f"users: {report.users}, favorites: {report.favorites} in {report.elapsed_s:.1f}s"
+    )
+    return EXIT_OK
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -81,6 +253,24 @@ def main(argv: list[str] | None = None) -> int:
     try:
         if args.command == "set-role":
             return asyncio.run(cmd_set_role(email=args.email, role=args.role))
+        if args.command == "import-books":
+            return asyncio.run(cmd_import_books(path=args.file, dry_run=args.dry_run))
+        if args.command == "reconcile-favorites-counts":
+            return asyncio.run(cmd_reconcile_favorites_counts(batch_size=args.batch_size))
+        if args.command == "seed":
+            plan = SeedPlan(
+                books=args.books,
+                authors=args.authors,
+                genres=args.genres,
+                users=args.users,
+                favorites=args.favorites,
+                random_seed=args.random_seed,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                zipf_s=args.zipf_s,
+                password=args.password,
+            )
+            return asyncio.run(cmd_seed(plan))
 
         print(f"Unknown command: {args.command}", file=sys.stderr)
         return EXIT_USAGE
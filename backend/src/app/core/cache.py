@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+from app.core.config import settings
+
+V = TypeVar("V")
+
+
+class _LoadAbandoned(Exception):
+    """The leader's load was cancelled; coalesced waiters retry on their own."""
+
+
+class AsyncTTLCache(Generic[V]):
+    """In-process LRU + TTL cache for async loaders.
+
+    - size-bounded: least recently used entries are evicted first;
+    - every entry lives `ttl` seconds, `None` results (404) — `negative_ttl`;
+    - single-flight: concurrent misses for one key share a single loader call;
+      if the caller running it is cancelled, the waiters retry with their own loader;
+    - invalidation during a load wins: the stale result is not stored.
+
+    The cache is per process: with several workers each one has its own copy,
+    staleness between them is bounded by ttl.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: float,
+        enabled: bool = True,
+        ttl_for: Callable[[V], float] | None = None,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        # опционально: верхняя граница жизни конкретного значения (например, до exp токена)
+        self.ttl_for = ttl_for
+
+        # key -> (expires_at, value)
+        self._data: OrderedDict[Hashable, tuple[float, V | None]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[V | None]]) -> V | None:
+        if not self.enabled:
+            return await loader()
+
+        while True:
+            now = time.monotonic()
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self._load(key, loader)
+
+            self.coalesced += 1
+            try:
+                # shield: отмена этого ожидающего запроса не отменяет загрузку для остальных
+                return await asyncio.shield(inflight)
+            except _LoadAbandoned:
+                # отменили запрос-лидер (клиент отключился): загружаем сами своим loader
+                continue
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[V | None]]) -> V | None:
+        # loader работает на ресурсах запроса-лидера (его сессии БД), поэтому выполняется
+        # в его задаче, а не в отдельной: при отмене лидера ожидающие повторяют загрузку
+        self.misses += 1
+        generation = self._generation
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.set_exception(_LoadAbandoned())
+            future.exception()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # исключение получат только ожидающие; если их нет — не шумим в лог
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            # не сохраняем, если за время загрузки сбросили весь кэш/выборку
+            # или именно этот ключ (invalidate/invalidate_keys сняли его из _inflight)
+            if generation == self._generation and self._inflight.get(key) is future:
+                self._store(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _store(self, key: Hashable, value: V | None) -> None:
+        if value is None:
+            ttl = self.negative_ttl
+        elif self.ttl_for is not None:
+            ttl = min(self.ttl, self.ttl_for(value))
+        else:
+            ttl = self.ttl
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        # идущая загрузка этого ключа снимается с _inflight и не сохранится; другие ключи не трогаем
+        self._inflight.pop(key, None)
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_keys(self, predicate: Callable[[Hashable, V | None], bool]) -> None:
+        """Drop entries for which predicate(key, value) is true, keyed only.
+
+        Unlike invalidate_where, loads of other keys in flight are kept: for
+        frequent, narrow invalidations. A load in flight is judged by its key
+        alone (value None), so the predicate must be conservative for None.
+        """
+        stale = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+        for key in stale:
+            del self._data[key]
+        self.invalidations += len(stale)
+        for key in [key for key in self._inflight if predicate(key, None)]:
+            del self._inflight[key]
+
+    def invalidate_where(self, predicate: Callable[[Hashable, V | None], bool]) -> None:
+        """Drop every entry for which predicate(key, value) is true."""
+        self._generation += 1
+        stale = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+        for key in stale:
+            del self._data[key]
+        self.invalidations += len(stale)
+        # идущие загрузки не знают своего значения — сбрасываем все, следующий запрос начнёт новую
+        self._inflight.clear()
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+        self._inflight.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Кэш публичного каталога: карточки книг и страницы списка.
+# Ключи: ("book", book_id), ("books", after_id, limit), ("books_popular", after, limit),
+# ("books_filtered", filters, sort, after, limit) и ("book_facets", filters);
+# значения — app.core.http_cache.RenderedPayload (готовый JSON + ETag) или None.
+catalog_cache: AsyncTTLCache[Any] = AsyncTTLCache(
+    name="catalog",
+    maxsize=settings.catalog_cache_maxsize,
+    ttl=settings.catalog_cache_ttl_s,
+    negative_ttl=settings.catalog_cache_negative_ttl_s,
+    enabled=settings.catalog_cache_enabled,
+)
+
+
+# Кэш аутентификации: sha256(токена) -> app.core.security.Principal.
+# Живёт не дольше exp токена; смена роли в этом процессе сбрасывает записи пользователя
+# (invalidate_principals), из других процессов (CLI) — через NOTIFY principal_changed,
+# который слушает cache_events.listen_cache_events. principal_cache_ttl_s — лишь запасная
+# граница для db_pgbouncer, где LISTEN не работает и чужие изменения доходят по истечении TTL.
+principal_cache: AsyncTTLCache[Any] = AsyncTTLCache(
+    name="principal",
+    maxsize=settings.principal_cache_maxsize,
+    ttl=settings.principal_cache_ttl_s,
+    negative_ttl=settings.principal_cache_negative_ttl_s,
+    enabled=settings.principal_cache_enabled,
+    ttl_for=lambda principal: principal.expires_at - time.time(),
+)
+
+
+def invalidate_principals(user_id: int) -> None:
+    principal_cache.invalidate_where(lambda key, value: value is not None and value.id == user_id)
+
+
+# страницы, которые по диапазону id не сопоставить: порядок по популярности не связан с id,
+# отфильтрованная выборка — подмножество каталога
+_COUNTER_KEYS = {("books_popular",), ("books_filtered",)}
+_UNRANGED_KEYS = _COUNTER_KEYS | {("book_facets",)}
+
+
+def _page_covers(key: Hashable, value: Any, book_ids: list[int]) -> bool:
+    # страница ("books", after_id, limit) содержит id из (after_id, id последнего элемента];
+    # последняя страница (next_cursor=None) открыта справа — туда попадают новые книги.
+    # book_ids отсортированы: достаточно первого id правее after_id
+    if not (isinstance(key, tuple) and key and key[0] == "books"):
+        return False
+    after_id = key[1]
+    pos = 0 if after_id is None else bisect_right(book_ids, after_id)
+    if pos == len(book_ids):
+        return False
+    # страницы каталога кэшируются как plain dict (RenderedPayload.from_data)
+    page = value.data if value is not None else None
+    if page is None or page["next_cursor"] is None:
+        return True
+    return bool(page["items"]) and book_ids[pos] <= page["items"][-1]["id"]
+
+
+def invalidate_catalog_books(book_ids: Iterable[int]) -> None:
+    """Drop cached detail and exactly those list pages whose id range contains the books."""
+    ids = sorted(set(book_ids))
+    if not ids:
+        return
+    for book_id in ids:
+        catalog_cache.invalidate(("book", book_id))
+    # порядок по популярности не связан с id: новая/удалённая книга может сдвинуть любую страницу;
+    # отфильтрованные страницы и счётчики фасетов по id не сопоставить — сбрасываются целиком
+    catalog_cache.invalidate_where(
+        lambda key, value: _page_covers(key, value, ids) or (isinstance(key, tuple) and key[:1] in _UNRANGED_KEYS)
+    )
+
+
+def invalidate_catalog_counters(book_ids: Iterable[int]) -> None:
+    """Drop list pages that show favorites_count of the books (after a favorites write).
+
+    Range pages holding the books, every sort=popular page (the order itself
+    changed) and every filtered page. Detail and facets carry no counters.
+    Like the cache itself, this is per process: other workers catch up within the TTL.
+    """
+    ids = sorted(set(book_ids))
+    if not ids:
+        return
+    # запись в избранное частая: сбрасываем только эти ключи, загрузки остальных
+    # (карточки, фасеты) продолжаются и сохраняются
+    catalog_cache.invalidate_keys(
+        lambda key, value: _page_covers(key, value, ids) or (isinstance(key, tuple) and key[:1] in _COUNTER_KEYS)
+    )
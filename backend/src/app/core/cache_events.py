@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.cache import catalog_cache, invalidate_principals, principal_cache
+
+# LISTEN/NOTIFY между процессами (CLI -> воркеры API):
+# principal_changed — payload: id пользователя, у которого сменилась роль;
+# catalog_changed — каталог изменён мимо API (импорт, пересчёт счётчиков, seed)
+PRINCIPAL_CHANNEL = "principal_changed"
+CATALOG_CHANNEL = "catalog_changed"
+
+
+async def notify_principal_changed(session: AsyncSession, user_id: int) -> None:
+    """Tell every API worker to drop the user's cached principals.
+
+    Transactional: Postgres delivers the notification on commit and drops it on rollback.
+    """
+    await session.execute(select(func.pg_notify(PRINCIPAL_CHANNEL, str(user_id))))
+
+
+async def notify_catalog_changed(session: AsyncSession | AsyncConnection) -> None:
+    """Tell every API worker to clear its catalog cache; delivered on commit."""
+    await session.execute(select(func.pg_notify(CATALOG_CHANNEL, "")))
+
+
+def _on_principal_changed(connection: Any, pid: int, channel: str, payload: str) -> None:
+    try:
+        user_id = int(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed {} payload: {!r}", channel, payload)
+        return
+    invalidate_principals(user_id)
+
+
+def _on_catalog_changed(connection: Any, pid: int, channel: str, payload: str) -> None:
+    catalog_cache.clear()
+
+
+LISTENERS = {
+    PRINCIPAL_CHANNEL: _on_principal_changed,
+    CATALOG_CHANNEL: _on_catalog_changed,
+}
+
+
+def _clear_all() -> None:
+    principal_cache.clear()
+    catalog_cache.clear()
+
+
+async def listen_cache_events(engine: AsyncEngine, *, interval: float) -> None:
+    """Keep the in-process caches in sync with changes made by other processes (CLI).
+
+    Holds one connection of the pool with LISTEN for the life of the worker and
+    pings it every `interval` seconds. Notifications sent while the listener is
+    down are lost, so both caches are cleared on every (re)connect.
+    """
+    while True:
+        try:
+            async with engine.connect() as conn:
+                raw = (await conn.get_raw_connection()).driver_connection
+                for channel, callback in LISTENERS.items():
+                    await raw.add_listener(channel, callback)
+                _clear_all()
+                try:
+                    while True:
+                        await asyncio.sleep(interval)
+                        # молча оборванное соединение иначе не заметить
+                        await raw.execute("SELECT 1")
+                finally:
+                    if not raw.is_closed():
+                        for channel, callback in LISTENERS.items():
+                            await raw.remove_listener(channel, callback)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Cache events listener lost its connection: {}", exc)
+        _clear_all()
+        await asyncio.sleep(interval)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import zlib
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # br включается установкой пакета brotli
+    brotli = None
+
+# что имеет смысл сжимать; картинки, архивы и т.п. уже сжаты
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def accepts_encoding(accept_encoding: str | None, coding: str) -> bool:
+    """True if Accept-Encoding allows `coding`.
+
+    An explicit entry wins over "*"; q=0 forbids the coding.
+    """
+    if not accept_encoding:
+        return False
+    explicit: float | None = None
+    wildcard: float | None = None
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name == coding:
+            explicit = q
+        elif name == "*":
+            wildcard = q
+    q = explicit if explicit is not None else wildcard
+    return q is not None and q > 0
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Coding to answer with: br (if brotli is installed), then gzip; None — as is."""
+    if not settings.compression_enabled:
+        return None
+    if brotli is not None and accepts_encoding(accept_encoding, "br"):
+        return "br"
+    if accepts_encoding(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+class StreamCompressor(Protocol):
+    def compress(self, data: bytes, *, flush: bool) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _Gzip:
+    def __init__(self) -> None:
+        # wbits=31: gzip-заголовок; mtime в нём 0 — одинаковые байты на одинаковый вход
+        self._z = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, *, flush: bool) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self) -> None:
+        self._c = brotli.Compressor(quality=settings.compression_brotli_quality)
+
+    def compress(self, data: bytes, *, flush: bool) -> bytes:
+        out = self._c.process(data)
+        return out + self._c.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+def compressor(coding: str) -> StreamCompressor:
+    return _Brotli() if coding == "br" else _Gzip()
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    c = compressor(coding)
+    return c.compress(body, flush=False) + c.finish()
+
+
+def weak_etag(etag: str) -> str:
+    # сжатое представление не побайтно равно исходному: сильный ETag становится слабым
+    # (как в nginx); If-None-Match сравнивается слабо, так что 304 продолжают работать
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Compress responses by Accept-Encoding (pure ASGI).
+
+    Skips responses that already have Content-Encoding (pre-compressed cache
+    entries), non-compressible types, 204/304 and bodies shorter than
+    COMPRESSION_MIN_SIZE. Streaming bodies are buffered only up to that
+    threshold, then compressed chunk by chunk with a flush after each one,
+    so the client keeps receiving data as it is produced.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        await self.app(scope, receive, _CompressingSend(send, coding, settings.compression_min_size))
+
+
+class _CompressingSend:
+    def __init__(self, send: Send, coding: str | None, minimum_size: int) -> None:
+        self.send = send
+        self.coding = coding
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.passthrough = False
+        self.pending = bytearray()
+        self.stream: StreamCompressor | None = None
+
+    async def __call__(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            self._on_start(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if kind != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        assert self.start is not None
+
+        if self.stream is not None:
+            if more_body:
+                data = self.stream.compress(body, flush=True)
+            else:
+                data = self.stream.compress(body, flush=False) + self.stream.finish()
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        self.pending += body
+        if not more_body:
+            await self._send_whole()
+        elif len(self.pending) >= self.minimum_size:
+            await self._start_stream()
+
+    def _on_start(self, message: Message) -> None:
+        headers = Headers(raw=message["headers"])
+        content_type = headers.get("content-type", "")
+        if (
+            message["status"] < 200
+            or message["status"] in (204, 304)
+            or "content-encoding" in headers
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            self.passthrough = True
+            return
+        # ответ зависит от Accept-Encoding, даже если именно этот не сжат
+        MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+        if self.coding is None:
+            self.passthrough = True
+            return
+        self.start = message
+
+    def _mark_encoded(self, *, length: int | None) -> MutableHeaders:
+        headers = MutableHeaders(scope=self.start)
+        headers["Content-Encoding"] = self.coding
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        if "etag" in headers:
+            headers["ETag"] = weak_etag(headers["etag"])
+        return headers
+
+    async def _send_whole(self) -> None:
+        body = bytes(self.pending)
+        if len(body) >= self.minimum_size:
+            body = compress(body, self.coding)
+            self._mark_encoded(length=len(body))
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": body, "more_body": False})
+
+    async def _start_stream(self) -> None:
+        self._mark_encoded(length=None)
+        self.stream = compressor(self.coding)
+        data = self.stream.compress(bytes(self.pending), flush=True)
+        self.pending.clear()
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": data, "more_body": True})
@@ -22,10 +22,94 @@ class Settings(BaseSettings):
         validation_alias="DATABASE_URL",
     )
 
+    # Пул соединений (app.core.db.engine): постоянные соединения + временные сверх них,
+    # ожидание свободного соединения (сверх — TimeoutError), пересоздание старых соединений
+    db_pool_size: int = Field(default=10, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_s: float = Field(default=10.0, validation_alias="DB_POOL_TIMEOUT_S")
+    db_pool_recycle_s: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE_S")
+    db_pool_pre_ping: bool = Field(default=True, validation_alias="DB_POOL_PRE_PING")
+    db_echo: bool = Field(default=False, validation_alias="DB_ECHO")
+
+    # asyncpg: кэш подготовленных запросов на соединение и параметры сессии Postgres.
+    # DB_APPLICATION_NAME пустой — берём APP_NAME; DB_STATEMENT_TIMEOUT_MS=0 — без лимита
+    db_statement_cache_size: int = Field(default=100, validation_alias="DB_STATEMENT_CACHE_SIZE")
+    db_application_name: str = Field(default="", validation_alias="DB_APPLICATION_NAME")
+    db_statement_timeout_ms: int = Field(default=30_000, validation_alias="DB_STATEMENT_TIMEOUT_MS")
+
+    # Подключение через pgbouncer в режиме pool_mode=transaction: без кэша prepared statements
+    # (соседняя транзакция может попасть на другой backend) и без statement_timeout
+    # в параметрах старта (pgbouncer их отклоняет — задайте через ALTER ROLE ... SET)
+    db_pgbouncer: bool = Field(default=False, validation_alias="DB_PGBOUNCER")
+
+    # Реплики для чтения (get_read_session): CSV или JSON-массив URL, пусто — всё на primary.
+    # Реплика выводится из ротации, если не отвечает или отстаёт больше replica_max_lag_s;
+    # клиент после своей записи читает с primary ещё replica_sticky_s секунд
+    database_replica_urls: str = Field(default="", validation_alias="DATABASE_REPLICA_URLS")
+    replica_health_interval_s: float = Field(default=5.0, validation_alias="REPLICA_HEALTH_INTERVAL_S")
+    replica_health_timeout_s: float = Field(default=2.0, validation_alias="REPLICA_HEALTH_TIMEOUT_S")
+    replica_max_lag_s: float = Field(default=10.0, validation_alias="REPLICA_MAX_LAG_S")
+    replica_sticky_s: float = Field(default=5.0, validation_alias="REPLICA_STICKY_S")
+
+    # SQL-инструментация (app.core.sql_stats): число запросов и время БД на HTTP-запрос
+    # (Server-Timing + лог), предупреждение об N+1 — одинаковый запрос >= порога раз
+    # за один HTTP-запрос, лог медленных запросов (параметры не пишутся)
+    sql_instrumentation_enabled: bool = Field(default=True, validation_alias="SQL_INSTRUMENTATION_ENABLED")
+    sql_slow_query_ms: float = Field(default=200.0, validation_alias="SQL_SLOW_QUERY_MS")
+    sql_n_plus_one_threshold: int = Field(default=5, validation_alias="SQL_N_PLUS_ONE_THRESHOLD")
+
     jwt_secret: str = Field(default="CHANGE_ME_SUPER_SECRET", validation_alias="JWT_SECRET")
     jwt_alg: str = Field(default="HS256", validation_alias="JWT_ALG")
     jwt_expires_min: int = Field(default=60, validation_alias="JWT_EXPIRES_MIN")
 
+    # bcrypt в отдельном пуле потоков: размер пула и лимит очереди (сверх него — 503).
+    # PASSWORD_HASH_WORKERS=0 — считать прямо в event loop (как раньше, для сравнения в бенчмарке)
+    password_hash_workers: int = Field(default=4, validation_alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(default=64, validation_alias="PASSWORD_HASH_MAX_PENDING")
+
+    # Кэш principal (id, email, role) по хэшу токена в get_current_user
+    principal_cache_enabled: bool = Field(default=True, validation_alias="PRINCIPAL_CACHE_ENABLED")
+    principal_cache_maxsize: int = Field(default=10_000, validation_alias="PRINCIPAL_CACHE_MAXSIZE")
+    principal_cache_ttl_s: float = Field(default=30.0, validation_alias="PRINCIPAL_CACHE_TTL_S")
+    principal_cache_negative_ttl_s: float = Field(default=5.0, validation_alias="PRINCIPAL_CACHE_NEGATIVE_TTL_S")
+    # Смена роли и изменения каталога из CLI доходят до воркеров через LISTEN/NOTIFY
+    # (app.core.cache_events); с этим интервалом слушатель проверяет соединение и переподключается
+    cache_listen_interval_s: float = Field(default=5.0, validation_alias="CACHE_LISTEN_INTERVAL_S")
+
+    # Keyset-пагинация каталога: размер страницы по умолчанию и жёсткий максимум
+    books_page_size_default: int = Field(default=20, validation_alias="BOOKS_PAGE_SIZE_DEFAULT")
+    books_page_size_max: int = Field(default=100, validation_alias="BOOKS_PAGE_SIZE_MAX")
+
+    # GET /books/facets — сколько жанров и авторов (самых частых) отдавать
+    books_facet_limit: int = Field(default=20, validation_alias="BOOKS_FACET_LIMIT")
+
+    # POST /books:batch — максимум книг в одном запросе
+    books_batch_max_items: int = Field(default=1000, validation_alias="BOOKS_BATCH_MAX_ITEMS")
+
+    # PUT/PATCH /users/me/favorites — максимум id в одном запросе
+    favorites_bulk_max_items: int = Field(default=1000, validation_alias="FAVORITES_BULK_MAX_ITEMS")
+
+    # In-process кэш каталога (app.core.cache.catalog_cache)
+    catalog_cache_enabled: bool = Field(default=True, validation_alias="CATALOG_CACHE_ENABLED")
+    catalog_cache_maxsize: int = Field(default=2048, validation_alias="CATALOG_CACHE_MAXSIZE")
+    catalog_cache_ttl_s: float = Field(default=60.0, validation_alias="CATALOG_CACHE_TTL_S")
+    catalog_cache_negative_ttl_s: float = Field(default=5.0, validation_alias="CATALOG_CACHE_NEGATIVE_TTL_S")
+
+    # Cache-Control для GET-ответов: публичный каталог может кэшировать reverse proxy,
+    # персональные данные — только клиент, и с обязательной ревалидацией по ETag
+    catalog_cache_control: str = Field(
+        default="public, max-age=30, stale-while-revalidate=30",
+        validation_alias="CATALOG_CACHE_CONTROL",
+    )
+    private_cache_control: str = Field(default="private, no-cache", validation_alias="PRIVATE_CACHE_CONTROL")
+
+    # Сжатие ответов (app.core.compression): gzip, br — если установлен пакет brotli.
+    # Ответы короче COMPRESSION_MIN_SIZE байт идут как есть (заголовки gzip дороже выигрыша)
+    compression_enabled: bool = Field(default=True, validation_alias="COMPRESSION_ENABLED")
+    compression_min_size: int = Field(default=1024, validation_alias="COMPRESSION_MIN_SIZE")
+    compression_gzip_level: int = Field(default=6, validation_alias="COMPRESSION_GZIP_LEVEL")
+    compression_brotli_quality: int = Field(default=5, validation_alias="COMPRESSION_BROTLI_QUALITY")
+
     # ⚠️ Важно: тип = str, чтобы env не пытался парсить JSON в list и не падал
     # Принимаем:
     # 1) CSV-строку: "http://localhost:5173,http://127.0.0.1:5173"
@@ -36,18 +120,10 @@ class Settings(BaseSettings):
     )
 
     def cors_origins_list(self) -> list[str]:
-        v = (self.cors_origins or "").strip()
-        if not v:
-            return []
-        if v.startswith("[") and v.endswith("]"):
-            try:
-                data = json.loads(v)
-                if isinstance(data, list):
-                    return [str(x).strip() for x in data if str(x).strip()]
-            except Exception:
-                # если JSON кривой — упадём в CSV-разбор
-                pass
-        return [x.strip() for x in v.split(",") if x.strip()]
+        return _split_list(self.cors_origins)
+
+    def database_replica_urls_list(self) -> list[str]:
+        return _split_list(self.database_replica_urls)
 
     model_config = SettingsConfigDict(
         env_file=BACKEND_DIR / ".env",
@@ -56,4 +132,20 @@ class Settings(BaseSettings):
     )
 
 
+def _split_list(raw: str) -> list[str]:
+    # Принимаем CSV-строку или JSON-массив (см. cors_origins)
+    v = (raw or "").strip()
+    if not v:
+        return []
+    if v.startswith("[") and v.endswith("]"):
+        try:
+            data = json.loads(v)
+            if isinstance(data, list):
+                return [str(x).strip() for x in data if str(x).strip()]
+        except Exception:
+            # если JSON кривой — упадём в CSV-разбор
+            pass
+    return [x.strip() for x in v.split(",") if x.strip()]
+
+
 settings = Settings()
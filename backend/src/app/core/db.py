@@ -1,18 +1,54 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Hashable
+from uuid import uuid4
+from weakref import WeakKeyDictionary
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends, Request
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.replicas import CATALOG_KEY, COUNTERS_KEY, PrimaryStickiness, ReplicaSet, client_key
+from app.core.sql_stats import instrument_engine
 from app.models.base import Base  # единый Base для всего проекта
 
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    future=True,
-)
+def _prepared_statement_name() -> str:
+    # уникальное имя: за pgbouncer имена с разных клиентов встречаются на одном backend
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(cfg: Settings) -> dict[str, Any]:
+    """Keyword arguments for create_async_engine built from settings."""
+    server_settings = {"application_name": cfg.db_application_name or cfg.app_name}
+    connect_args: dict[str, Any] = {"server_settings": server_settings}
+
+    if cfg.db_pgbouncer:
+        # кэши asyncpg (statement_cache_size) и диалекта SQLAlchemy
+        # (prepared_statement_cache_size) — оба выключены
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = _prepared_statement_name
+    else:
+        connect_args["statement_cache_size"] = cfg.db_statement_cache_size
+        connect_args["prepared_statement_cache_size"] = cfg.db_statement_cache_size
+        if cfg.db_statement_timeout_ms > 0:
+            server_settings["statement_timeout"] = str(cfg.db_statement_timeout_ms)
+
+    return {
+        "echo": cfg.db_echo,
+        "pool_size": cfg.db_pool_size,
+        "max_overflow": cfg.db_max_overflow,
+        "pool_timeout": cfg.db_pool_timeout_s,
+        "pool_recycle": cfg.db_pool_recycle_s,
+        "pool_pre_ping": cfg.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_async_engine(settings.database_url, **engine_options(settings))
 
 AsyncSessionMaker = async_sessionmaker(
     bind=engine,
@@ -24,3 +60,103 @@ AsyncSessionMaker = async_sessionmaker(
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionMaker() as session:
         yield session
+
+
+replicas = ReplicaSet(
+    [create_async_engine(url, **engine_options(settings)) for url in settings.database_replica_urls_list()],
+    max_lag=settings.replica_max_lag_s,
+    timeout=settings.replica_health_timeout_s,
+)
+primary_stickiness = PrimaryStickiness(window=settings.replica_sticky_s)
+
+if settings.sql_instrumentation_enabled:
+    for _engine in (engine, *replicas.engines()):
+        instrument_engine(_engine)
+
+# engine -> тот же пул, но транзакции BEGIN READ ONLY (без лишнего запроса SET TRANSACTION)
+_read_only_engines: WeakKeyDictionary[AsyncEngine, AsyncEngine] = WeakKeyDictionary()
+
+
+def _read_only(bind: AsyncEngine) -> AsyncEngine:
+    read_only = _read_only_engines.get(bind)
+    if read_only is None:
+        read_only = _read_only_engines[bind] = bind.execution_options(postgresql_readonly=True)
+    return read_only
+
+
+@asynccontextmanager
+async def _read_session(session: AsyncSession, sticky_keys: tuple[Hashable | None, ...]) -> AsyncIterator[AsyncSession]:
+    replica = None
+    if replicas and not any(primary_stickiness.active(key) for key in sticky_keys):
+        replica = replicas.pick()
+
+    # session от get_session соединение не брал — ленивый, ничего не стоит
+    async with AsyncSession(bind=_read_only(replica or session.bind), expire_on_commit=False) as read_session:
+        try:
+            yield read_session
+        except (OSError, DBAPIError) as exc:
+            # потеря соединения с репликой: выводим её из ротации до следующей проверки
+            if replica is not None and (isinstance(exc, OSError) or exc.connection_invalidated):
+                replicas.mark_down(replica)
+            raise
+
+
+async def get_read_session(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for GET handlers: a READ ONLY transaction on a healthy replica.
+
+    Falls back to the primary (the engine behind get_session) when there are no
+    healthy replicas or the caller / the catalog was written to within the
+    stickiness window, so a client always reads its own writes.
+    """
+    async with _read_session(session, (client_key(request.scope["headers"]), CATALOG_KEY)) as read_session:
+        yield read_session
+
+
+async def get_catalog_list_session(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+) -> AsyncGenerator[AsyncSession, None]:
+    """get_read_session for catalog lists, which show favorites_count.
+
+    Also stays on the primary for the stickiness window after anyone's
+    favorites write, so freshly invalidated pages are not refilled with
+    counters from a lagging replica.
+    """
+    sticky_keys = (client_key(request.scope["headers"]), CATALOG_KEY, COUNTERS_KEY)
+    async with _read_session(session, sticky_keys) as read_session:
+        yield read_session
+
+
+def violated_constraint(exc: IntegrityError) -> str | None:
+    """Name of the constraint behind an IntegrityError raised through asyncpg."""
+    # exc.orig — DBAPI-обёртка диалекта asyncpg, исключение asyncpg (с именем ограничения)
+    # под ней: в __cause__ (raise ... from error, SQLAlchemy 2.0 и 2.1), в 2.1 ещё и в .orig
+    driver_error = exc.orig.__cause__ or getattr(exc.orig, "orig", None)
+    return getattr(driver_error, "constraint_name", None)
+
+
+def pool_stats(target: AsyncEngine | None = None) -> dict[str, Any]:
+    """Snapshot of the connection pool of this worker."""
+    pool = (target or engine).pool
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+    # NullPool/StaticPool счётчиков не ведут — отдаём только то, что есть
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    if "overflow" in stats:
+        # QueuePool считает overflow от -pool_size; наружу — только открытые сверх пула
+        stats["overflow"] = max(stats["overflow"], 0)
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        stats["timeout_s"] = timeout()
+    return stats
+
+
+async def dispose_engine() -> None:
+    # закрываем соединения пула при остановке, а не по таймауту на стороне Postgres/pgbouncer
+    await engine.dispose()
+    await replicas.dispose()
@@ -4,6 +4,9 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
+# тип ошибки валидации, которую отдаём как 413 (например, слишком длинная пачка)
+PAYLOAD_TOO_LARGE = "payload_too_large"
+
 
 def add_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(RequestValidationError)
@@ -12,6 +15,12 @@ def add_exception_handlers(app: FastAPI) -> None:
     ) -> JSONResponse:
         # exc.errors() -> список ошибок вида:
         # [{"loc": [...], "msg": "...", "type": "...", ...}, ...]
+        too_large = next((e for e in exc.errors() if e["type"] == PAYLOAD_TOO_LARGE), None)
+        if too_large is not None:
+            return JSONResponse(
+                status_code=413,
+                content={"error": "http_error", "details": too_large["msg"]},
+            )
         return JSONResponse(
             status_code=422,
             content={
@@ -31,4 +40,6 @@ def add_exception_handlers(app: FastAPI) -> None:
                 "error": "http_error",
                 "details": exc.detail,
             },
+            # Retry-After, WWW-Authenticate и т.п. не должны теряться
+            headers=getattr(exc, "headers", None),
         )
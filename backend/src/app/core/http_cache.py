@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Response, status
+from pydantic import BaseModel
+
+from app.core.compression import compress, negotiate_encoding, weak_etag
+from app.core.config import settings
+from app.core.serialization import dumps
+
+
+@dataclass(frozen=True)
+class RenderedPayload:
+    """JSON body rendered once, together with its strong ETag.
+
+    `data` keeps the source model or plain dict (used by cache invalidation
+    predicates), `body`/`etag` are what goes on the wire. Compressed variants
+    are made on first request for each coding and kept with the entry, so
+    cache hits don't recompress the same bytes.
+    """
+
+    data: Any
+    body: bytes
+    etag: str
+    _encoded: dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    def encoded(self, coding: str) -> bytes:
+        body = self._encoded.get(coding)
+        if body is None:
+            body = self._encoded[coding] = compress(self.body, coding)
+        return body
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> RenderedPayload:
+        body = model.model_dump_json().encode("utf-8")
+        return cls(data=model, body=body, etag=make_etag(body))
+
+    @classmethod
+    def from_data(cls, data: Any) -> RenderedPayload:
+        """Plain data rendered with the fast serializer (see app.core.serialization)."""
+        body = dumps(data)
+        return cls(data=data, body=body, etag=make_etag(body))
+
+
+def make_etag(*parts: bytes | str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8") if isinstance(part, str) else part)
+        h.update(b"\x00")
+    return f'"{h.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110, 13.1.2): W/ prefix is ignored."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def conditional_json_response(
+    payload: RenderedPayload,
+    *,
+    if_none_match: str | None,
+    cache_control: str,
+    accept_encoding: str | None = None,
+) -> Response:
+    """200 with pre-rendered (and possibly pre-compressed) JSON, or 304 if the client already has this version."""
+    coding = negotiate_encoding(accept_encoding) if len(payload.body) >= settings.compression_min_size else None
+    etag = payload.etag if coding is None else weak_etag(payload.etag)
+    if etag_matches(if_none_match, payload.etag):
+        return not_modified(etag, cache_control)
+
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    body = payload.body
+    if coding is not None:
+        # с Content-Encoding CompressionMiddleware ответ не трогает
+        headers["Content-Encoding"] = coding
+        body = payload.encoded(coding)
+    return Response(content=body, media_type="application/json", headers=headers)
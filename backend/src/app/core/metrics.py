@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import catalog_cache, principal_cache
+from app.core.db import pool_stats, replicas
+from app.core.passwords import password_hasher
+
+# Prometheus text exposition format 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# запросы мимо всех роутов: путь в метку не пишем, иначе кардинальность неограниченна
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonic counter per label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    type = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Labels, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram:
+    """Fixed-bucket histogram: one bisect and two additions per observation."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Labels, buckets: Iterable[float]) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count в каждом бакете (не накопительно) + бакет +Inf, sum]
+        self._values: dict[Labels, list[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 2)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, labels: Labels) -> int:
+        state = self._values.get(labels)
+        return int(sum(state[:-1])) if state is not None else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        bounds = [*self.buckets, float("inf")]
+        for labels, state in self._values.items():
+            cumulative = 0
+            for bound, n in zip(bounds, state):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+Metric = Counter | Histogram
+M = TypeVar("M", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    """Metrics of this worker process.
+
+    Request metrics are updated inline; collectors are called at scrape time
+    for values that already live elsewhere (pool, caches, password hasher).
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(
+    Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+)
+http_requests_in_progress = registry.register(
+    Gauge("http_requests_in_progress", "HTTP requests currently being served.", ("method",))
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency until the last body chunk is sent.",
+        ("method", "route"),
+        LATENCY_BUCKETS,
+    )
+)
+http_response_size_bytes = registry.register(
+    Histogram("http_response_size_bytes", "HTTP response body size.", ("method", "route"), SIZE_BUCKETS)
+)
+
+
+class MetricsMiddleware:
+    """Records per-route latency, response size, status and in-flight requests.
+
+    Pure ASGI (no BaseHTTPMiddleware task/stream overhead); the route label is
+    the matched path template, e.g. /api/v1/books/{book_id}.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = (method,)
+        http_requests_in_progress.inc(in_progress)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec(in_progress)
+            labels = (method, _route_template(scope))
+            http_requests_total.inc((*labels, str(status)))
+            http_request_duration_seconds.observe(labels, elapsed)
+            http_response_size_bytes.observe(labels, size)
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    # FastAPI с вложенными роутерами кладёт полный шаблон (с префиксами) в effective
+    # route context, а route.path — относительно своего роутера; старые версии — сразу в route
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(context, "path_format", None) or route.path_format
+
+
+def _runtime_metrics() -> Iterator[Metric]:
+    # значения, которые уже считают другие модули: снимаем на момент scrape
+    pool = pool_stats()
+    db_pool = Gauge("db_pool_connections", "Primary DB pool connections by state.", ("state",))
+    for state in ("size", "checkedout", "checkedin", "overflow"):
+        if state in pool:
+            db_pool.set((state,), pool[state])
+    yield db_pool
+
+    replica_up = Gauge("db_replica_up", "Read replica passed the last health check.", ("replica",))
+    replica_lag = Gauge("db_replica_lag_seconds", "Read replica lag at the last health check.", ("replica",))
+    for r in replicas.stats():
+        replica_up.set((r["url"],), 1 if r["healthy"] else 0)
+        replica_lag.set((r["url"],), r["lag_s"])
+    yield replica_up
+    yield replica_lag
+
+    cache_events = Counter("cache_events_total", "In-process cache events.", ("cache", "event"))
+    cache_size = Gauge("cache_entries", "In-process cache entries.", ("cache",))
+    for cache in (catalog_cache, principal_cache):
+        stats = cache.stats()
+        for event in ("hits", "misses", "coalesced", "evictions", "expirations", "invalidations"):
+            cache_events.inc((stats["name"], event), stats[event])
+        cache_size.set((stats["name"],), stats["size"])
+    yield cache_events
+    yield cache_size
+
+    hasher = password_hasher.stats()
+    hasher_pending = Gauge("password_hash_pending", "bcrypt jobs queued or running.")
+    hasher_pending.set((), hasher["pending"])
+    hasher_calls = Counter("password_hash_calls_total", "bcrypt hash/verify calls.")
+    hasher_calls.inc((), hasher["calls"])
+    hasher_rejected = Counter("password_hash_rejected_total", "bcrypt calls rejected by the queue limit.")
+    hasher_rejected.inc((), hasher["rejected"])
+    hasher_seconds = Counter("password_hash_seconds_total", "Time spent in bcrypt.")
+    hasher_seconds.inc((), hasher["hash_time_sum_s"])
+    yield from (hasher_pending, hasher_calls, hasher_rejected, hasher_seconds)
+
+
+registry.add_collector(_runtime_metrics)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+class InvalidCursorError(ValueError):
+    """Cursor is malformed or does not match the expected shape."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack keyset values of the last row into an opaque url-safe token."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple[Any, ...]:
+    """Unpack a token produced by encode_cursor.
+
+    `types` describes the expected keyset shape, e.g. decode_cursor(c, int).
+    Raises InvalidCursorError if the token is broken or has another shape.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursorError("Invalid cursor")
+
+    result = []
+    for value, expected in zip(values, types):
+        # bool — подкласс int, но в курсоре ему не место
+        if isinstance(value, bool) or not isinstance(value, expected):
+            if expected is float and isinstance(value, int) and not isinstance(value, bool):
+                value = float(value)
+            else:
+                raise InvalidCursorError("Invalid cursor")
+        result.append(value)
+    return tuple(result)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Too many password operations are already queued; caller should answer 503."""
+
+
+class PasswordHasher:
+    """bcrypt hash/verify off the event loop.
+
+    Work runs in a dedicated thread pool (bcrypt releases the GIL), so a burst
+    of logins no longer stalls other requests of the worker. At most
+    `max_pending` operations may be running or queued; beyond that calls fail
+    fast with PasswordHasherBusy instead of growing an unbounded queue.
+
+    workers=0 keeps the old inline behaviour (used as a benchmark baseline).
+    """
+
+    def __init__(self, *, workers: int, max_pending: int) -> None:
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        # уменьшается в done-callback, который выполняется в потоке пула
+        self._pending_lock = threading.Lock()
+
+        self.calls = 0
+        self.rejected = 0
+        self.queue_wait_sum_s = 0.0
+        self.queue_wait_max_s = 0.0
+        self.hash_time_sum_s = 0.0
+        self.hash_time_max_s = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(self.context.verify, password, password_hash)
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.workers <= 0:
+            started = time.perf_counter()
+            result = fn(*args)
+            self._record(0.0, time.perf_counter() - started)
+            return result
+
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += 1
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+
+        submitted = time.perf_counter()
+
+        def job() -> tuple[T, float, float]:
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        try:
+            future = self._executor.submit(job)
+        except BaseException:
+            self._release(None)
+            raise
+        # слот освобождает сама задача, а не ожидающий её запрос: если клиент отключился,
+        # задача из очереди снимается (cancel), а уже запущенная держит слот до конца
+        future.add_done_callback(self._release)
+        result, queue_wait, hash_time = await asyncio.wrap_future(future)
+        self._record(queue_wait, hash_time)
+        return result
+
+    def _release(self, _future: Future | None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _record(self, queue_wait: float, hash_time: float) -> None:
+        self.calls += 1
+        self.queue_wait_sum_s += queue_wait
+        self.queue_wait_max_s = max(self.queue_wait_max_s, queue_wait)
+        self.hash_time_sum_s += hash_time
+        self.hash_time_max_s = max(self.hash_time_max_s, hash_time)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "queue_wait_sum_s": self.queue_wait_sum_s,
+            "queue_wait_max_s": self.queue_wait_max_s,
+            "hash_time_sum_s": self.hash_time_sum_s,
+            "hash_time_max_s": self.hash_time_max_s,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.security import token_fingerprint
+
+# Отставание реплики в секундах: 0, если всё полученное WAL уже применено
+# (на простаивающем primary pg_last_xact_replay_timestamp() сколь угодно старый)
+_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+# записи в каталог видят все клиенты — после них чтения каталога тоже идут на primary
+CATALOG_WRITE_PREFIXES = ("/api/v1/books", "/api/v1/admin/books")
+CATALOG_KEY = ("catalog",)
+# запись в избранное меняет favorites_count (и порядок sort=popular), который видят все в списках
+# каталога: после неё списки читаются с primary, иначе сброшенный кэш заполнится со старыми
+# счётчиками отстающей реплики. Остальные чтения (избранное, карточки) на реплике остаются
+COUNTERS_WRITE_PREFIXES = ("/api/v1/users/me/favorites",)
+COUNTERS_KEY = ("catalog_counters",)
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass
+class _Replica:
+    engine: AsyncEngine
+    healthy: bool = True
+    lag_s: float = 0.0
+    failures: int = 0
+
+
+class ReplicaSet:
+    """Round-robin over read replicas that passed the last health check.
+
+    A replica is taken out of rotation when it does not answer within
+    `timeout`, lags more than `max_lag` seconds, or a request on it lost its
+    connection; the background check puts it back once it recovers.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], *, max_lag: float, timeout: float) -> None:
+        self._replicas = [_Replica(engine=e) for e in engines]
+        self.max_lag = max_lag
+        self.timeout = timeout
+        self._next = 0
+
+    def __bool__(self) -> bool:
+        return bool(self._replicas)
+
+    def engines(self) -> list[AsyncEngine]:
+        return [r.engine for r in self._replicas]
+
+    def pick(self) -> AsyncEngine | None:
+        # None — здоровых реплик нет, читаем с primary
+        n = len(self._replicas)
+        for i in range(n):
+            replica = self._replicas[(self._next + i) % n]
+            if replica.healthy:
+                self._next = (self._next + i + 1) % n
+                return replica.engine
+        return None
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        for replica in self._replicas:
+            if replica.engine is engine and replica.healthy:
+                replica.healthy = False
+                replica.failures += 1
+                logger.warning("Read replica {} taken out of rotation", _safe_url(engine))
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._check_one(r) for r in self._replicas))
+
+    async def _check_one(self, replica: _Replica) -> None:
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with replica.engine.connect() as conn:
+                    replica.lag_s = float((await conn.execute(_LAG_SQL)).scalar_one())
+        except Exception as exc:
+            if replica.healthy:
+                logger.warning("Read replica {} health check failed: {!r}", _safe_url(replica.engine), exc)
+            replica.healthy = False
+            replica.failures += 1
+            return
+
+        healthy = replica.lag_s <= self.max_lag
+        if healthy != replica.healthy:
+            logger.info(
+                "Read replica {} {} (lag {:.1f}s)",
+                _safe_url(replica.engine),
+                "back in rotation" if healthy else "lagging, taken out of rotation",
+                replica.lag_s,
+            )
+        replica.healthy = healthy
+
+    async def run_health_checks(self, interval: float) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self._replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "url": _safe_url(r.engine),
+                "healthy": r.healthy,
+                "lag_s": r.lag_s,
+                "failures": r.failures,
+            }
+            for r in self._replicas
+        ]
+
+
+class PrimaryStickiness:
+    """Keys (clients, the public catalog) that must read from the primary for a while.
+
+    Per process: with several workers a client may hit another worker after
+    its write, so the window should cover typical replication lag anyway.
+    """
+
+    def __init__(self, *, window: float, maxsize: int = 10_000) -> None:
+        self.window = window
+        self.maxsize = maxsize
+        # key -> monotonic deadline, в порядке последнего касания
+        self._until: OrderedDict[Hashable, float] = OrderedDict()
+
+    def touch(self, key: Hashable) -> None:
+        if self.window <= 0:
+            return
+        self._until[key] = time.monotonic() + self.window
+        self._until.move_to_end(key)
+        while len(self._until) > self.maxsize:
+            self._until.popitem(last=False)
+
+    def active(self, key: Hashable | None) -> bool:
+        if key is None:
+            return False
+        deadline = self._until.get(key)
+        if deadline is None:
+            return False
+        if deadline <= time.monotonic():
+            del self._until[key]
+            return False
+        return True
+
+    def clear(self) -> None:
+        self._until.clear()
+
+
+def client_key(headers: list[tuple[bytes, bytes]]) -> Hashable | None:
+    """Stickiness key of the caller: bearer token hash or the dev X-User-Id."""
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return ("token", token_fingerprint(token.strip()))
+        elif name == b"x-user-id":
+            return ("user", value.decode("latin-1"))
+    return None
+
+
+class ReadYourWritesMiddleware:
+    """After a successful write pins the caller (and, for catalog writes, the
+    catalog) to the primary for `PrimaryStickiness.window` seconds."""
+
+    def __init__(self, app: ASGIApp, stickiness: PrimaryStickiness) -> None:
+        self.app = app
+        self.stickiness = stickiness
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            # отмечаем до отправки ответа: следующий запрос клиента уже увидит метку
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                key = client_key(scope["headers"])
+                if key is not None:
+                    self.stickiness.touch(key)
+                if scope["path"].startswith(CATALOG_WRITE_PREFIXES):
+                    self.stickiness.touch(CATALOG_KEY)
+                if scope["path"].startswith(COUNTERS_WRITE_PREFIXES):
+                    self.stickiness.touch(COUNTERS_KEY)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _safe_url(engine: AsyncEngine) -> str:
+    return engine.url.render_as_string(hide_password=True)
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
+import hashlib
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 from jose import jwt
 
 from app.core.config import settings
+from app.models.user import UserRole
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Authenticated caller: just what authorization needs, no ORM state.
+
+    expires_at — unix time after which the principal must not be reused
+    (the access token's exp).
+    """
+
+    id: int
+    email: str
+    role: UserRole
+    expires_at: float = float("inf")
 
 
 def create_access_token(*, sub: str, role: str) -> str:
@@ -30,3 +47,8 @@ def decode_access_token(token: str) -> dict:
     Raises jose.exceptions.JWTError (or subclasses) on invalid/expired token.
     """
     return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_alg])
+
+
+def token_fingerprint(token: str) -> bytes:
+    """Cache key for a bearer token: the token itself is never stored."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson есть в requirements, но не обязателен
+    orjson = None
+
+
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON of plain data (dict/list/str/int/float/bool/None).
+
+    The fast path for large responses: no pydantic models are built and nothing
+    is re-validated, so the caller is responsible for the shape matching the
+    endpoint's response_model. Uses orjson when installed, stdlib json otherwise;
+    both give the same bytes as pydantic's model_dump_json for such data.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(data: Any, *, headers: dict[str, str] | None = None) -> Response:
+    """200 with `data` rendered by dumps(); bypasses response_model serialization."""
+    return Response(content=dumps(data), media_type="application/json", headers=headers)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# длинные запросы в логе обрезаем: нужна форма запроса, а не весь IN (...) на 1000 id
+MAX_LOGGED_STATEMENT = 2000
+
+
+@dataclass
+class SqlStats:
+    """Statements executed within one scope (HTTP request or test block)."""
+
+    count: int = 0
+    time_s: float = 0.0
+    statements: list[str] = field(default_factory=list)
+    shapes: Counter[str] = field(default_factory=Counter)
+    parent: SqlStats | None = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        stats: SqlStats | None = self
+        # вложенные области (тест вокруг HTTP-запроса) видят запросы внутренних
+        while stats is not None:
+            stats.count += 1
+            stats.time_s += elapsed
+            stats.statements.append(statement)
+            stats.shapes[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times (N+1 suspects)."""
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.time_s * 1000:.2f};desc="{self.count} queries"'
+
+
+_current: ContextVar[SqlStats | None] = ContextVar("sql_stats", default=None)
+
+
+@contextmanager
+def capture_sql() -> Iterator[SqlStats]:
+    """Collect statements of instrumented engines executed inside the block."""
+    stats = SqlStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _redact(parameters: Any) -> str:
+    # значения параметров (email, хэши, токены) в лог не попадают — только их типы
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._sql_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._sql_stats_start
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= settings.sql_slow_query_ms:
+        params = _redact(parameters)
+        logger.bind(sql_ms=round(elapsed_ms, 2), sql_params=params).warning(
+            "Slow query ({:.1f} ms, params {}): {}",
+            elapsed_ms,
+            params,
+            statement[:MAX_LOGGED_STATEMENT],
+        )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach statement counting / timing / slow-query logging to an engine (idempotent)."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SqlStatsMiddleware:
+    """Per-request SQL stats: Server-Timing header, a log line, N+1 warnings.
+
+    Statements run after the response headers went out (streaming export)
+    are not in the header, but are in the log line.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stats.count:
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        with capture_sql() as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if stats.count:
+                    _log_request(scope, status, stats)
+
+
+def _log_request(scope: Scope, status: int, stats: SqlStats) -> None:
+    log = logger.bind(
+        method=scope["method"],
+        path=scope["path"],
+        status=status,
+        sql_queries=stats.count,
+        sql_ms=round(stats.time_s * 1000, 2),
+    )
+    log.debug(
+        "{} {} -> {}: {} queries, {:.1f} ms in DB",
+        scope["method"],
+        scope["path"],
+        status,
+        stats.count,
+        stats.time_s * 1000,
+    )
+    for statement, n in stats.repeated(settings.sql_n_plus_one_threshold):
+        log.warning(
+            "Possible N+1 in {} {}: same statement executed {} times: {}",
+            scope["method"],
+            scope["path"],
+            n,
+            statement[:MAX_LOGGED_STATEMENT],
+        )
@@ -1,21 +1,43 @@
 from __future__ import annotations
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from app.api import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.db import dispose_engine, engine, primary_stickiness, replicas
 from app.core.errors import add_exception_handlers
 from app.core.logging import setup_logging
+from app.core.metrics import MetricsMiddleware
+from app.core.passwords import password_hasher
+from app.core.cache_events import listen_cache_events
+from app.core.replicas import ReadYourWritesMiddleware
+from app.core.sql_stats import SqlStatsMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting application. env={} db_url_set={}", settings.env, bool(settings.database_url))
+    background: list[asyncio.Task] = []
+    if replicas:
+        background.append(asyncio.create_task(replicas.run_health_checks(settings.replica_health_interval_s)))
+    # pgbouncer в режиме transaction не держит LISTEN: там изменения из CLI доходят за TTL кэшей
+    if (settings.principal_cache_enabled or settings.catalog_cache_enabled) and not settings.db_pgbouncer:
+        background.append(
+            asyncio.create_task(listen_cache_events(engine, interval=settings.cache_listen_interval_s))
+        )
     yield
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    password_hasher.shutdown()
+    await dispose_engine()
 
 
 def create_app() -> FastAPI:
@@ -36,6 +58,20 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # чтение своих записей: после записи клиент читает с primary (см. get_read_session)
+    app.add_middleware(ReadYourWritesMiddleware, stickiness=primary_stickiness)
+
+    # число запросов и время БД на запрос: Server-Timing, лог, предупреждения об N+1
+    if settings.sql_instrumentation_enabled:
+        app.add_middleware(SqlStatsMiddleware)
+
+    # gzip/br по Accept-Encoding; снаружи остальных, чтобы сжимать итоговый ответ,
+    # но внутри метрик: http_response_size_bytes — байты на проводе
+    app.add_middleware(CompressionMiddleware)
+
+    # последним = самым внешним: латентность включает CORS и остальные middleware
+    app.add_middleware(MetricsMiddleware)
+
     add_exception_handlers(app)
     app.include_router(api_router)
     return app
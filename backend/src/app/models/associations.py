@@ -10,6 +10,8 @@ book_authors = sa.Table(
     Base.metadata,
     sa.Column("book_id", sa.ForeignKey("books.id", ondelete="CASCADE"), primary_key=True),
     sa.Column("author_id", sa.ForeignKey("authors.id", ondelete="CASCADE"), primary_key=True),
+    # обратный индекс: книги автора (фильтр GET /books?author_id=, фасеты) в порядке id
+    sa.Index("ix_book_authors_author_book", "author_id", "book_id"),
 )
 
 # M2M: books <-> genres
@@ -18,4 +20,6 @@ book_genres = sa.Table(
     Base.metadata,
     sa.Column("book_id", sa.ForeignKey("books.id", ondelete="CASCADE"), primary_key=True),
     sa.Column("genre_id", sa.ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True),
+    # обратный индекс: книги жанра (фильтр GET /books?genre_id=, фасеты) в порядке id
+    sa.Index("ix_book_genres_genre_book", "genre_id", "book_id"),
 )
@@ -10,13 +10,14 @@ class Author(Base):
     __tablename__ = "authors"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
 
     # back_populates defined in Book
     books: Mapped[list["Book"]] = relationship(
         secondary="book_authors",
         back_populates="authors",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
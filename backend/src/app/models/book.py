@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text, func
+from sqlalchemy import DateTime, Index, Integer, String, Text, desc, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -10,6 +11,13 @@ from app.models.base import Base
 
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+        # GET /books?sort=popular: keyset по (favorites_count DESC, id)
+        Index("ix_books_favorites_count_id", desc("favorites_count"), "id"),
+        # GET /books?year_from=&year_to=: диапазон лет, внутри года — по id
+        Index("ix_books_year_id", "year", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -21,29 +29,51 @@ class Book(Base):
     # optional unique (Postgres допускает несколько NULL в UNIQUE)
     isbn: Mapped[str | None] = mapped_column(String(32), unique=True, nullable=True)
 
+    # Число пользователей, добавивших книгу в избранное.
+    # Ведётся триггерами на favorites (миграция c7d3e8f1a254), из ORM не пишется.
+    favorites_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
         server_default=func.now(),
     )
 
+    # title + авторы + description для полнотекстового поиска.
+    # Заполняется триггерами в БД (см. миграцию 5b7e2c41d9a3), из ORM не пишется и не читается.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
+    )
+
+    # Все связи моделей — lazy="raise": ничего не грузится неявно.
+    # Что подгружать, решает репозиторий через app.repositories.loading_profiles.
     authors: Mapped[list["Author"]] = relationship(
         secondary="book_authors",
         back_populates="books",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
     )
 
     genres: Mapped[list["Genre"]] = relationship(
         secondary="book_genres",
         back_populates="books",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
     )
 
     favorites: Mapped[list["Favorite"]] = relationship(
         back_populates="book",
         cascade="all, delete-orphan",
         passive_deletes=True,
-        lazy="selectin",
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
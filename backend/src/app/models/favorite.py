@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy import DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -10,15 +10,22 @@ from app.models.base import Base
 
 class Favorite(Base):
     __tablename__ = "favorites"
+    __table_args__ = (
+        # keyset-пагинация избранного пользователя по (created_at, book_id)
+        Index("ix_favorites_user_created", "user_id", "created_at", "book_id"),
+    )
 
     # Уникальность пары (user_id, book_id) обеспечивается композитным PRIMARY KEY
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         primary_key=True,
     )
+    # отдельный индекс: PK начинается с user_id, а каскад при удалении книги
+    # и пересчёт favorites_count ищут по book_id
     book_id: Mapped[int] = mapped_column(
         ForeignKey("books.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -29,11 +36,11 @@ class Favorite(Base):
 
     user: Mapped["User"] = relationship(
         back_populates="favorites",
-        lazy="selectin",
+        lazy="raise",
     )
     book: Mapped["Book"] = relationship(
         back_populates="favorites",
-        lazy="selectin",
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
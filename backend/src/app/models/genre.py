@@ -15,7 +15,8 @@ class Genre(Base):
     books: Mapped[list["Book"]] = relationship(
         secondary="book_genres",
         back_populates="genres",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
     )
 
     def __repr__(self) -> str:
@@ -1,15 +1,283 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    Row,
+    String,
+    Table,
+    and_,
+    delete,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.associations import book_authors, book_genres
+from app.models.author import Author
 from app.models.book import Book
+from app.models.favorite import Favorite
+from app.models.genre import Genre
+from app.repositories.loading_profiles import loading_profile
+
+# Должна совпадать с конфигурацией в books_search_document() (миграция 5b7e2c41d9a3)
+SEARCH_TS_CONFIG = "simple"
+
+
+def names_array(
+    link: Table,
+    link_fk: ColumnElement[int],
+    entity: type[Author] | type[Genre],
+) -> ColumnElement[list[str]]:
+    """Names of the book's authors/genres, sorted, as text[] ('{}' if none)."""
+    # коррелированный подзапрос по PK связи: считается только для строк страницы (после LIMIT)
+    names = (
+        select(func.array_agg(aggregate_order_by(entity.name, entity.name)))
+        .select_from(link.join(entity, entity.id == link_fk))
+        .where(link.c.book_id == Book.id)
+        .scalar_subquery()
+    )
+    return func.coalesce(names, literal_column("'{}'"))
+
+
+# Read-model элемента списка: ровно поля BookListItemResponse и в том же порядке.
+# Один запрос вместо books + двух selectin, без ORM-объектов и description
+LIST_COLUMNS = (
+    Book.id,
+    Book.title,
+    Book.year,
+    names_array(book_authors, book_authors.c.author_id, Author).label("authors"),
+    names_array(book_genres, book_genres.c.genre_id, Genre).label("genres"),
+    Book.favorites_count,
+)
+
+
+@dataclass(frozen=True)
+class BookFilters:
+    """Catalog filters of GET /books; hashable, so it doubles as the cache signature."""
+
+    genre_id: int | None = None
+    author_id: int | None = None
+    year_from: int | None = None
+    year_to: int | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self == NO_FILTERS
+
+    def conditions(self, *, skip: str | None = None) -> list[ColumnElement[bool]]:
+        """WHERE conditions on Book; `skip` — dimension left out (for its own facet)."""
+        conds: list[ColumnElement[bool]] = []
+        # полусоединение по обратным индексам ix_book_genres_genre_book / ix_book_authors_author_book
+        if self.genre_id is not None and skip != "genre":
+            conds.append(Book.id.in_(select(book_genres.c.book_id).where(book_genres.c.genre_id == self.genre_id)))
+        if self.author_id is not None and skip != "author":
+            conds.append(Book.id.in_(select(book_authors.c.book_id).where(book_authors.c.author_id == self.author_id)))
+        if skip != "year":
+            if self.year_from is not None:
+                conds.append(Book.year >= self.year_from)
+            if self.year_to is not None:
+                conds.append(Book.year <= self.year_to)
+        return conds
+
+
+NO_FILTERS = BookFilters()
+
+
+def _link_facet(
+    kind: str,
+    link: Table,
+    link_fk: ColumnElement[int],
+    entity: type[Author] | type[Genre],
+    filters: BookFilters,
+    limit: int,
+):
+    conds = filters.conditions(skip=kind)
+    stmt = select(
+        literal(kind, String).label("kind"),
+        entity.id.label("value"),
+        entity.name.label("name"),
+        func.count().label("count"),
+    ).select_from(link.join(entity, entity.id == link_fk))
+    if conds:
+        stmt = stmt.join(Book, Book.id == link.c.book_id).where(*conds)
+    return stmt.group_by(entity.id, entity.name).order_by(func.count().desc(), entity.id).limit(limit)
 
 
 class BooksRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
-    async def get_by_id(self, book_id: int) -> Book | None:
-        res = await self.session.execute(select(Book).where(Book.id == book_id))
+    async def get_by_id(self, book_id: int, *, profile: str = "book_ref") -> Book | None:
+        stmt = select(Book).where(Book.id == book_id).options(*loading_profile(profile))
+        res = await self.session.execute(stmt)
         return res.scalar_one_or_none()
+
+    async def exists(self, book_id: int) -> bool:
+        """Cheap probe by primary key, no relationships loaded."""
+        res = await self.session.execute(select(Book.id).where(Book.id == book_id))
+        return res.scalar_one_or_none() is not None
+
+    async def existing_ids(self, book_ids: list[int]) -> set[int]:
+        if not book_ids:
+            return set()
+        res = await self.session.execute(select(Book.id).where(Book.id.in_(book_ids)))
+        return set(res.scalars().all())
+
+    async def list_after(
+        self,
+        *,
+        after_id: int | None,
+        limit: int,
+        filters: BookFilters = NO_FILTERS,
+    ) -> list[Row]:
+        """
+        Keyset-страница каталога по возрастанию id: WHERE id > :after_id LIMIT :limit.
+        Стоимость не зависит от номера страницы (в отличие от OFFSET). Строки — LIST_COLUMNS.
+        """
+        stmt = (
+            select(*LIST_COLUMNS)
+            .where(*filters.conditions())
+            .order_by(Book.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Book.id > after_id)
+        res = await self.session.execute(stmt)
+        return list(res.all())
+
+    async def list_popular_after(
+        self,
+        *,
+        after: tuple[int, int] | None,
+        limit: int,
+        filters: BookFilters = NO_FILTERS,
+    ) -> list[Row]:
+        """
+        Keyset-страница по популярности: favorites_count DESC, id ASC
+        (индекс ix_books_favorites_count_id); `after` — (favorites_count, id) последней строки.
+        """
+        stmt = (
+            select(*LIST_COLUMNS)
+            .where(*filters.conditions())
+            .order_by(Book.favorites_count.desc(), Book.id)
+            .limit(limit)
+        )
+        if after is not None:
+            after_count, after_id = after
+            # count <= X даёт индексу границу диапазона, OR лишь отсекает хвост группы X
+            stmt = stmt.where(
+                Book.favorites_count <= after_count,
+                or_(Book.favorites_count < after_count, Book.id > after_id),
+            )
+        res = await self.session.execute(stmt)
+        return list(res.all())
+
+    async def facets(self, filters: BookFilters, *, limit: int) -> list[Row]:
+        """
+        Счётчики фасетов одним запросом (UNION ALL): строки (kind, value, name, count),
+        kind — total / genre / author / year. Каждый фасет считается по остальным фильтрам,
+        без своего измерения: видно, сколько книг даст выбор другого значения.
+        Жанры и авторы — топ `limit` по числу книг, годы — все.
+        """
+        total = (
+            select(
+                literal("total", String).label("kind"),
+                null().cast(Integer).label("value"),
+                null().cast(String).label("name"),
+                func.count().label("count"),
+            )
+            .select_from(Book)
+            .where(*filters.conditions())
+        )
+        years = (
+            select(
+                literal("year", String).label("kind"),
+                Book.year.label("value"),
+                null().cast(String).label("name"),
+                func.count().label("count"),
+            )
+            .where(*filters.conditions(skip="year"))
+            .group_by(Book.year)
+        )
+        stmt = union_all(
+            total,
+            _link_facet("genre", book_genres, book_genres.c.genre_id, Genre, filters, limit),
+            _link_facet("author", book_authors, book_authors.c.author_id, Author, filters, limit),
+            years,
+        )
+        res = await self.session.execute(stmt)
+        return list(res.all())
+
+    async def search(
+        self,
+        *,
+        q: str,
+        after: tuple[float, int] | None,
+        limit: int,
+    ) -> list[Row]:
+        """
+        Полнотекстовый поиск по books.search_vector (GIN-индекс).
+        Порядок: ts_rank DESC, id ASC; `after` — (rank, id) последней строки прошлой страницы.
+        Строки — LIST_COLUMNS + rank.
+        """
+        query = func.websearch_to_tsquery(SEARCH_TS_CONFIG, q)
+        rank = func.ts_rank(Book.search_vector, query, type_=Float)
+
+        stmt = (
+            select(*LIST_COLUMNS, rank.label("rank"))
+            .where(Book.search_vector.op("@@")(query))
+            .order_by(rank.desc(), Book.id)
+            .limit(limit)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(
+                or_(rank < after_rank, and_(rank == after_rank, Book.id > after_id))
+            )
+        res = await self.session.execute(stmt)
+        return list(res.all())
+
+    async def list_favorited_page(
+        self,
+        *,
+        user_id: int,
+        after: tuple[datetime, int] | None,
+        limit: int,
+    ) -> list[Row]:
+        """
+        Избранное пользователя, новые сначала: (favorites.created_at, book_id) DESC
+        по индексу ix_favorites_user_created. `after` — ключ последней строки прошлой страницы.
+        Строки — LIST_COLUMNS + added_at.
+        """
+        stmt = (
+            select(*LIST_COLUMNS, Favorite.created_at.label("added_at"))
+            .join(Favorite, Favorite.book_id == Book.id)
+            .where(Favorite.user_id == user_id)
+            .order_by(Favorite.created_at.desc(), Favorite.book_id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Favorite.created_at, Favorite.book_id) < tuple_(*after))
+        res = await self.session.execute(stmt)
+        return list(res.all())
+
+    async def delete_by_id(self, book_id: int) -> bool:
+        """
+        Удаляет книгу одним DELETE; связи и избранное чистит ON DELETE CASCADE в БД.
+        Возвращает False, если книги не было.
+        """
+        stmt = delete(Book).where(Book.id == book_id).returning(Book.id)
+        res = await self.session.execute(stmt)
+        return res.scalar_one_or_none() is not None
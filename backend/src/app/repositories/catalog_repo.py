@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import Sequence, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.author import Author
+from app.models.genre import Genre
+
+E = TypeVar("E", Author, Genre)
+
+
+class CatalogRepository:
+    """Authors and genres: lookups by id and set-based get-or-create by name."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_authors_by_ids(self, ids: Sequence[int]) -> list[Author]:
+        res = await self.session.execute(select(Author).where(Author.id.in_(ids)))
+        return list(res.scalars().all())
+
+    async def get_genres_by_ids(self, ids: Sequence[int]) -> list[Genre]:
+        res = await self.session.execute(select(Genre).where(Genre.id.in_(ids)))
+        return list(res.scalars().all())
+
+    async def upsert_authors(self, names: Sequence[str]) -> list[Author]:
+        return await self._upsert_by_name(Author, names)
+
+    async def upsert_genres(self, names: Sequence[str]) -> list[Genre]:
+        return await self._upsert_by_name(Genre, names)
+
+    async def _upsert_by_name(self, entity: type[E], names: Sequence[str]) -> list[E]:
+        """
+        Get-or-create по уникальному name за два запроса независимо от числа имён:
+        INSERT ... ON CONFLICT (name) DO NOTHING RETURNING отдаёт только созданные строки,
+        остальные (существовавшие или вставленные параллельной транзакцией) добираются SELECT.
+        Результат — в порядке `names`.
+        """
+        unique = list(dict.fromkeys(names))
+        if not unique:
+            return []
+
+        # сортировка: параллельные вставки берут блокировки индекса в одном порядке -> без дедлоков
+        stmt = (
+            pg_insert(entity)
+            .values([{"name": name} for name in sorted(unique)])
+            .on_conflict_do_nothing(index_elements=[entity.name])
+            .returning(entity)
+        )
+        res = await self.session.execute(stmt)
+        by_name: dict[str, E] = {row.name: row for row in res.scalars().all()}
+
+        missing = [name for name in unique if name not in by_name]
+        if missing:
+            res = await self.session.execute(select(entity).where(entity.name.in_(missing)))
+            by_name.update((row.name, row) for row in res.scalars().all())
+
+        return [by_name[name] for name in unique]
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from app.models.book import Book
 from app.models.favorite import Favorite
 
 
@@ -17,20 +19,96 @@ class FavoritesRepository:
         )
         return res.scalar_one_or_none() is not None
 
-    async def add(self, *, user_id: int, book_id: int) -> None:
-        fav = Favorite(user_id=user_id, book_id=book_id)
-        self.session.add(fav)
+    async def fingerprint(self, *, user_id: int) -> str:
+        """
+        "Версия" избранного пользователя для ETag: md5 от списка (book_id, created_at)
+        по PK-индексу — меняется при любом добавлении/удалении, в том числе каскадном
+        и при удалении+добавлении с той же суммой id.
+        Один агрегат на всё избранное: O(размера избранного), без загрузки книг.
+        """
+        entry = func.concat_ws(":", Favorite.book_id, Favorite.created_at)
+        stmt = select(
+            func.count(),
+            func.coalesce(func.md5(func.string_agg(entry, aggregate_order_by(literal(","), Favorite.book_id))), "-"),
+        ).where(Favorite.user_id == user_id)
+        count, digest = (await self.session.execute(stmt)).one()
+        return f"{count}:{digest}"
+
+    async def list_book_ids(self, *, user_id: int) -> list[int]:
+        # index-only scan по PK (user_id, book_id)
+        res = await self.session.execute(
+            select(Favorite.book_id).where(Favorite.user_id == user_id).order_by(Favorite.book_id)
+        )
+        return list(res.scalars().all())
+
+    async def add(self, *, user_id: int, book_id: int) -> bool:
+        """
+        Один INSERT ... ON CONFLICT DO NOTHING без предварительных проверок.
+        True — строка создана, False — уже была в избранном.
+        Книги нет -> IntegrityError (нарушение FK, sqlstate 23503); транзакция откатывается.
+        """
+        stmt = (
+            pg_insert(Favorite)
+            .values(user_id=user_id, book_id=book_id)
+            .on_conflict_do_nothing(index_elements=[Favorite.user_id, Favorite.book_id])
+            .returning(Favorite.book_id)
+        )
         try:
+            res = await self.session.execute(stmt)
+            created = res.scalar_one_or_none() is not None
             await self.session.commit()
         except IntegrityError:
             await self.session.rollback()
             raise
+        return created
 
-    async def delete(self, *, user_id: int, book_id: int) -> int:
+    async def delete(self, *, user_id: int, book_id: int) -> bool:
         """
-        Возвращает число удалённых строк (0 или 1).
+        DELETE ... RETURNING: True — строка была и удалена.
         """
-        stmt = delete(Favorite).where(Favorite.user_id == user_id, Favorite.book_id == book_id)
+        stmt = (
+            delete(Favorite)
+            .where(Favorite.user_id == user_id, Favorite.book_id == book_id)
+            .returning(Favorite.book_id)
+        )
         res = await self.session.execute(stmt)
+        deleted = res.scalar_one_or_none() is not None
         await self.session.commit()
-        return int(res.rowcount or 0)
+        return deleted
+
+    # --- массовые операции: без commit, транзакцией управляет сервис ---
+
+    async def add_many(self, *, user_id: int, book_ids: list[int]) -> list[int]:
+        """
+        INSERT ... SELECT из books: несуществующие книги просто не попадают в выборку
+        (без нарушения FK), дубли гасит ON CONFLICT. Возвращает реально добавленные id.
+        """
+        if not book_ids:
+            return []
+        found = select(literal(user_id), Book.id).where(Book.id.in_(book_ids)).order_by(Book.id)
+        stmt = (
+            pg_insert(Favorite)
+            .from_select([Favorite.user_id, Favorite.book_id], found)
+            .on_conflict_do_nothing(index_elements=[Favorite.user_id, Favorite.book_id])
+            .returning(Favorite.book_id)
+        )
+        res = await self.session.execute(stmt)
+        return sorted(res.scalars().all())
+
+    async def remove_many(self, *, user_id: int, book_ids: list[int]) -> list[int]:
+        if not book_ids:
+            return []
+        stmt = (
+            delete(Favorite)
+            .where(Favorite.user_id == user_id, Favorite.book_id.in_(book_ids))
+            .returning(Favorite.book_id)
+        )
+        res = await self.session.execute(stmt)
+        return sorted(res.scalars().all())
+
+    async def remove_all_except(self, *, user_id: int, keep_book_ids: list[int]) -> list[int]:
+        stmt = delete(Favorite).where(Favorite.user_id == user_id)
+        if keep_book_ids:
+            stmt = stmt.where(Favorite.book_id.not_in(keep_book_ids))
+        res = await self.session.execute(stmt.returning(Favorite.book_id))
+        return sorted(res.scalars().all())
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.base import ExecutableOption
+
+from app.models.book import Book
+
+# Именованные профили загрузки связей.
+# Модели объявляют все relationship как lazy="raise", поэтому каждый запрос
+# репозитория явно говорит, какие связи ему нужны. Всё, что не перечислено
+# в профиле, при обращении бросает InvalidRequestError вместо тихого SELECT.
+LOADING_PROFILES: dict[str, tuple[ExecutableOption, ...]] = {
+    # только строка books — проверки существования, удаление
+    "book_ref": (),
+    # карточка книги
+    "book_detail": (selectinload(Book.authors), selectinload(Book.genres)),
+    # пользователь для аутентификации: только колонки users, без избранного
+    "auth_user": (),
+}
+
+
+def loading_profile(name: str) -> tuple[ExecutableOption, ...]:
+    try:
+        return LOADING_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown loading profile: {name}") from None
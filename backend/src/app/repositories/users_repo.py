@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.models.user import User
+from app.repositories.loading_profiles import loading_profile
 
 
 class UsersRepository:
@@ -12,15 +13,19 @@ class UsersRepository:
         self.session = session
 
     async def get_by_email(self, email: str) -> User | None:
-        stmt = select(User).where(User.email == email)
+        stmt = select(User).where(User.email == email).options(*loading_profile("auth_user"))
         res = await self.session.execute(stmt)
         return res.scalar_one_or_none()
 
     async def get_by_id(self, user_id: int) -> User | None:
-        stmt = select(User).where(User.id == user_id)
+        stmt = select(User).where(User.id == user_id).options(*loading_profile("auth_user"))
         res = await self.session.execute(stmt)
         return res.scalar_one_or_none()
 
+    async def get_favorites_count(self, user_id: int) -> int | None:
+        res = await self.session.execute(select(User.favorites_count).where(User.id == user_id))
+        return res.scalar_one_or_none()
+
     async def create(self, *, email: str, password_hash: str) -> User:
         user = User(email=email, password_hash=password_hash)  # роль по умолчанию: client
         self.session.add(user)
@@ -1,9 +1,20 @@
 from app.schemas.auth import AuthRegisterRequest, AuthLoginRequest, TokenResponse
 from app.schemas.user import UserMeResponse
+from app.schemas.favorite import (
+    FavoritesReplaceRequest,
+    FavoritesPatchRequest,
+    FavoritesChangeResponse,
+)
 from app.schemas.book import (
     BookCreateRequest,
     BookListItemResponse,
+    BookPageResponse,
     BookDetailResponse,
+    BookBatchCreateRequest,
+    BookBatchItemResult,
+    BookBatchCreateResponse,
+    BookImportRowError,
+    BookImportResponse,
 )
 
 __all__ = [
@@ -11,7 +22,16 @@ __all__ = [
     "AuthLoginRequest",
     "TokenResponse",
     "UserMeResponse",
+    "FavoritesReplaceRequest",
+    "FavoritesPatchRequest",
+    "FavoritesChangeResponse",
     "BookCreateRequest",
     "BookListItemResponse",
+    "BookPageResponse",
     "BookDetailResponse",
+    "BookBatchCreateRequest",
+    "BookBatchItemResult",
+    "BookBatchCreateResponse",
+    "BookImportRowError",
+    "BookImportResponse",
 ]
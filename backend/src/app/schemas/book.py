@@ -1,5 +1,10 @@
-from pydantic import Field, field_validator
+from typing import Any, Literal
 
+from pydantic import Field, field_validator, model_validator
+from pydantic_core import PydanticCustomError
+
+from app.core.config import settings
+from app.core.errors import PAYLOAD_TOO_LARGE
 from app.schemas.base import BaseSchema
 
 
@@ -9,6 +14,33 @@ class BookListItemResponse(BaseSchema):
     year: int
     authors: list[str]
     genres: list[str]
+    favorites_count: int = 0
+
+
+class BookPageResponse(BaseSchema):
+    items: list[BookListItemResponse]
+    # None -> это последняя страница
+    next_cursor: str | None = None
+
+
+class FacetValue(BaseSchema):
+    id: int
+    name: str
+    count: int
+
+
+class YearFacet(BaseSchema):
+    year: int
+    count: int
+
+
+class BookFacetsResponse(BaseSchema):
+    # книг под текущим фильтром
+    total: int
+    # каждый фасет посчитан без своего измерения фильтра
+    genres: list[FacetValue]
+    authors: list[FacetValue]
+    years: list[YearFacet]
 
 
 class BookDetailResponse(BaseSchema):
@@ -67,3 +99,50 @@ class BookCreateRequest(BaseSchema):
         if not cleaned:
             raise ValueError("list must contain at least one non-empty value")
         return cleaned
+
+
+class BookBatchCreateRequest(BaseSchema):
+    # all_or_nothing: любая ошибка -> 422, ничего не создано;
+    # best_effort: создаются валидные книги, ошибки — в результатах по индексу
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+    items: list[BookCreateRequest] = Field(min_length=1)
+
+    @model_validator(mode="before")
+    @classmethod
+    def check_items_count(cls, data: Any) -> Any:
+        # до разбора элементов: слишком длинный список отклоняется (413), не валидируясь целиком;
+        # граница читается из settings при каждом запросе, а не при импорте
+        items = data.get("items") if isinstance(data, dict) else None
+        limit = settings.books_batch_max_items
+        if isinstance(items, list) and len(items) > limit:
+            raise PydanticCustomError(PAYLOAD_TOO_LARGE, "Too many items (max {max_items})", {"max_items": limit})
+        return data
+
+
+class BookBatchItemResult(BaseSchema):
+    index: int
+    status: Literal["created", "failed"]
+    book: BookDetailResponse | None = None
+    error: str | None = None
+
+
+class BookBatchCreateResponse(BaseSchema):
+    mode: Literal["all_or_nothing", "best_effort"]
+    created: int
+    failed: int
+    items: list[BookBatchItemResult]
+
+
+class BookImportRowError(BaseSchema):
+    # номер строки файла (заголовок — строка 1)
+    line: int
+    error: str
+
+
+class BookImportResponse(BaseSchema):
+    dry_run: bool
+    rows_total: int
+    inserted: int
+    errors_total: int
+    # не больше MAX_REPORTED_ERRORS, полное число — errors_total
+    errors: list[BookImportRowError]
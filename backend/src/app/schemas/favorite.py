@@ -0,0 +1,37 @@
+from pydantic import Field, field_validator, model_validator
+
+from app.schemas.base import BaseSchema
+
+
+class FavoritesReplaceRequest(BaseSchema):
+    # итоговое множество избранного; [] — очистить
+    book_ids: list[int]
+
+    @field_validator("book_ids")
+    @classmethod
+    def normalize_ids(cls, v: list[int]) -> list[int]:
+        return sorted(set(v))
+
+
+class FavoritesPatchRequest(BaseSchema):
+    add: list[int] = Field(default_factory=list)
+    remove: list[int] = Field(default_factory=list)
+
+    @field_validator("add", "remove")
+    @classmethod
+    def normalize_ids(cls, v: list[int]) -> list[int]:
+        return sorted(set(v))
+
+    @model_validator(mode="after")
+    def check_disjoint(self) -> "FavoritesPatchRequest":
+        both = set(self.add) & set(self.remove)
+        if both:
+            raise ValueError(f"book ids both in add and remove: {sorted(both)}")
+        return self
+
+
+class FavoritesChangeResponse(BaseSchema):
+    added: list[int]
+    removed: list[int]
+    # книги из add/book_ids, которых нет в каталоге (пропущены)
+    not_found: list[int]
@@ -7,3 +7,4 @@ class UserMeResponse(BaseSchema):
     id: int
     email: EmailStr
     role: str  # "admin" | "client"
+    favorites_count: int = 0
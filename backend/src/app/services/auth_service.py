@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from app.core.passwords import password_hasher
 from app.core.security import create_access_token
 from app.repositories.users_repo import UsersRepository
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class AuthService:
     def __init__(self, session: AsyncSession) -> None:
@@ -22,7 +20,8 @@ class AuthService:
         if existing:
             return None  # сигнал "занято"
 
-        password_hash = pwd_context.hash(password)
+        # bcrypt — в пуле потоков; при переполнении очереди -> PasswordHasherBusy
+        password_hash = await password_hasher.hash(password)
 
         try:
             user = await self.users_repo.create(email=email_norm, password_hash=password_hash)
@@ -43,7 +42,7 @@ class AuthService:
         if user is None:
             return None
 
-        if not pwd_context.verify(password, user.password_hash):
+        if not await password_hasher.verify(password, user.password_hash):
             return None
 
         # JWT: sub=user_id (string), role, exp
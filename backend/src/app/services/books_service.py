@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Literal, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import violated_constraint
+from app.models.associations import book_authors, book_genres
+from app.models.book import Book
+from app.repositories.catalog_repo import CatalogRepository
+from app.schemas.book import BookCreateRequest, BookDetailResponse
+
+BatchMode = Literal["all_or_nothing", "best_effort"]
+
+# имя UNIQUE(isbn) по умолчанию Postgres (<таблица>_<колонка>_key)
+ISBN_KEY = "books_isbn_key"
+
+
+@dataclass
+class BatchItemOutcome:
+    index: int
+    book: BookDetailResponse | None = None
+    error: str | None = None
+
+
+class BooksService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.catalog = CatalogRepository(session)
+
+    async def create_many(
+        self,
+        items: Sequence[BookCreateRequest],
+        *,
+        mode: BatchMode,
+    ) -> list[BatchItemOutcome]:
+        """
+        Создание пачки книг за постоянное число запросов:
+        проверка id авторов/жанров и isbn — по одному SELECT на всю пачку,
+        get-or-create имён — CatalogRepository, книги — один INSERT ... RETURNING,
+        связи — один executemany на таблицу.
+
+        Ничего не коммитит. all_or_nothing: при любой ошибке книги не вставляются
+        (вызывающий откатывает транзакцию); best_effort: ошибочные элементы пропускаются.
+        isbn, занятые параллельным запросом между проверкой и INSERT, — такие же
+        ошибки элементов ("isbn already exists"), а не исключение.
+        """
+        outcomes = [BatchItemOutcome(index=i) for i in range(len(items))]
+
+        author_names_by_id = await self._names_by_id(
+            self.catalog.get_authors_by_ids, [item.authors for item in items]
+        )
+        genre_names_by_id = await self._names_by_id(
+            self.catalog.get_genres_by_ids, [item.genres for item in items]
+        )
+        existing_isbns = await self._existing_isbns(items)
+
+        seen_isbns: set[str] = set()
+        for item, outcome in zip(items, outcomes):
+            if _ids(item.authors) and not all(i in author_names_by_id for i in item.authors):
+                outcome.error = "One or more author ids not found"
+            elif _ids(item.genres) and not all(i in genre_names_by_id for i in item.genres):
+                outcome.error = "One or more genre ids not found"
+            elif item.isbn is not None and item.isbn in existing_isbns:
+                outcome.error = "isbn already exists"
+            elif item.isbn is not None and item.isbn in seen_isbns:
+                outcome.error = "isbn is duplicated in the batch"
+            if outcome.error is None and item.isbn is not None:
+                seen_isbns.add(item.isbn)
+
+        if mode == "all_or_nothing" and any(o.error for o in outcomes):
+            return outcomes
+
+        while True:
+            todo = [(item, o) for item, o in zip(items, outcomes) if o.error is None]
+            if not todo:
+                return outcomes
+            # isbn могла занять параллельная транзакция уже после проверки выше:
+            # вставка — в SAVEPOINT, чтобы после нарушения unique транзакция осталась рабочей
+            try:
+                async with self.session.begin_nested():
+                    await self._insert(todo, author_names_by_id, genre_names_by_id)
+                return outcomes
+            except IntegrityError as exc:
+                if violated_constraint(exc) != ISBN_KEY:
+                    raise
+                taken = await self._existing_isbns([item for item, _ in todo])
+                if not taken:
+                    raise
+            for item, outcome in todo:
+                outcome.book = None
+                if item.isbn in taken:
+                    outcome.error = "isbn already exists"
+            if mode == "all_or_nothing":
+                return outcomes
+
+    async def _insert(
+        self,
+        todo: Sequence[tuple[BookCreateRequest, BatchItemOutcome]],
+        author_names_by_id: dict[int, str],
+        genre_names_by_id: dict[int, str],
+    ) -> None:
+        # имена -> id одним проходом на всю пачку
+        authors = await self.catalog.upsert_authors(
+            [n for item, _ in todo if not _ids(item.authors) for n in item.authors]
+        )
+        genres = await self.catalog.upsert_genres(
+            [n for item, _ in todo if not _ids(item.genres) for n in item.genres]
+        )
+        author_ids = {a.name: a.id for a in authors}
+        genre_ids = {g.name: g.id for g in genres}
+
+        # порядок RETURNING гарантированно совпадает с порядком параметров
+        res = await self.session.execute(
+            insert(Book).returning(Book.id, sort_by_parameter_order=True),
+            [
+                {"title": item.title, "description": item.description, "year": item.year, "isbn": item.isbn}
+                for item, _ in todo
+            ],
+        )
+        book_ids = list(res.scalars().all())
+
+        author_links: list[dict] = []
+        genre_links: list[dict] = []
+        for (item, outcome), book_id in zip(todo, book_ids):
+            a_ids, a_names = _resolve(item.authors, author_ids, author_names_by_id)
+            g_ids, g_names = _resolve(item.genres, genre_ids, genre_names_by_id)
+            author_links.extend({"book_id": book_id, "author_id": i} for i in a_ids)
+            genre_links.extend({"book_id": book_id, "genre_id": i} for i in g_ids)
+            outcome.book = BookDetailResponse(
+                id=book_id,
+                title=item.title,
+                description=item.description,
+                year=item.year,
+                isbn=item.isbn,
+                authors=a_names,
+                genres=g_names,
+            )
+
+        await self.session.execute(insert(book_authors), author_links)
+        await self.session.execute(insert(book_genres), genre_links)
+
+    @staticmethod
+    async def _names_by_id(fetch, lists: Sequence[list[int] | list[str]]) -> dict[int, str]:
+        ids = sorted({i for values in lists if _ids(values) for i in values})
+        if not ids:
+            return {}
+        return {row.id: row.name for row in await fetch(ids)}
+
+    async def _existing_isbns(self, items: Sequence[BookCreateRequest]) -> set[str]:
+        isbns = sorted({item.isbn for item in items if item.isbn is not None})
+        if not isbns:
+            return set()
+        res = await self.session.execute(select(Book.isbn).where(Book.isbn.in_(isbns)))
+        return set(res.scalars().all())
+
+
+def _ids(values: list[int] | list[str]) -> bool:
+    # BookCreateRequest уже нормализовал список: либо все int, либо все str
+    return bool(values) and isinstance(values[0], int)
+
+
+def _resolve(
+    values: list[int] | list[str],
+    ids_by_name: dict[str, int],
+    names_by_id: dict[int, str],
+) -> tuple[list[int], list[str]]:
+    if _ids(values):
+        return list(values), [names_by_id[i] for i in values]
+    return [ids_by_name[n] for n in values], list(values)
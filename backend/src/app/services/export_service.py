@@ -2,50 +2,92 @@ from __future__ import annotations
 
 import csv
 import io
+import time
 from typing import AsyncIterator
 
-from sqlalchemy import select
+from loguru import logger
+from sqlalchemy import ColumnElement, Table, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.models.associations import book_authors, book_genres
+from app.models.author import Author
 from app.models.book import Book
+from app.models.genre import Genre
+from app.repositories.books_repo import names_array
+
+# размер куска, отдаваемого в ответ (до сжатия), в символах CSV
+CHUNK_SIZE = 64 * 1024
+# сколько строк asyncpg забирает с серверного курсора за раз
+YIELD_PER = 2_000
+
+
+def _joined_names(
+    link: Table,
+    link_fk: ColumnElement[int],
+    entity: type[Author] | type[Genre],
+) -> ColumnElement[str]:
+    # "A;B;C" — тот же подзапрос, что у списков каталога (BooksRepository.LIST_COLUMNS)
+    return func.array_to_string(names_array(link, link_fk, entity), literal_column("';'"))
 
 
 class ExportService:
     async def stream_books_csv(self, session: AsyncSession) -> AsyncIterator[bytes]:
         """
-        Генерирует CSV построчно (UTF-8).
+        Генерирует CSV (UTF-8) с серверного курсора: память не растёт с размером каталога.
+        Строки копятся в буфере; как только в нём CHUNK_SIZE символов, он отдаётся куском
+        (~64 KB, для кириллицы в UTF-8 — до ~2x). В памяти — одна партиция курсора (YIELD_PER
+        строк) и один кусок. Сжатие — в CompressionMiddleware.
         """
         buf = io.StringIO()
         writer = csv.writer(buf)
 
+        def take_chunk() -> bytes:
+            data = buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+            return data
+
         # header
         writer.writerow(["id", "title", "year", "isbn", "authors", "genres"])
-        yield buf.getvalue().encode("utf-8")
-        buf.seek(0)
-        buf.truncate(0)
 
         stmt = (
-            select(Book)
-            .options(selectinload(Book.authors), selectinload(Book.genres))
+            select(
+                Book.id,
+                Book.title,
+                Book.year,
+                Book.isbn,
+                _joined_names(book_authors, book_authors.c.author_id, Author),
+                _joined_names(book_genres, book_genres.c.genre_id, Genre),
+            )
             .order_by(Book.id)
+            .execution_options(yield_per=YIELD_PER)
+        )
+
+        started = time.perf_counter()
+        rows = 0
+        sent = 0
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            for book_id, title, year, isbn, authors, genres in partition:
+                writer.writerow([book_id, title, year, isbn or "", authors or "", genres or ""])
+                rows += 1
+                # проверка на каждой строке: кусок не больше CHUNK_SIZE + одна строка,
+                # независимо от YIELD_PER
+                if buf.tell() >= CHUNK_SIZE:
+                    chunk = take_chunk()
+                    sent += len(chunk)
+                    yield chunk
+
+        tail = take_chunk()
+        if tail:
+            sent += len(tail)
+            yield tail
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "CSV export finished: rows={} bytes={} elapsed={:.2f}s rate={:.0f} rows/s",
+            rows,
+            sent,
+            elapsed,
+            rows / elapsed if elapsed > 0 else 0.0,
         )
-        result = await session.execute(stmt)
-
-        for book in result.scalars().unique():
-            authors = ";".join(a.name for a in (book.authors or []))
-            genres = ";".join(g.name for g in (book.genres or []))
-
-            writer.writerow(
-                [
-                    book.id,
-                    book.title,
-                    book.year,
-                    book.isbn or "",
-                    authors,
-                    genres,
-                ]
-            )
-            yield buf.getvalue().encode("utf-8")
-            buf.seek(0)
-            buf.truncate(0)
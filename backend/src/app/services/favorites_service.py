@@ -1,42 +1,85 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from app.core.db import violated_constraint
 from app.repositories.books_repo import BooksRepository
 from app.repositories.favorites_repo import FavoritesRepository
 
+# PostgreSQL: foreign_key_violation
+FK_VIOLATION = "23503"
+# имя FK favorites.book_id по умолчанию Postgres (<таблица>_<колонка>_fkey)
+BOOK_FK = "favorites_book_id_fkey"
+
+
+@dataclass
+class FavoritesChange:
+    added: list[int] = field(default_factory=list)
+    removed: list[int] = field(default_factory=list)
+    not_found: list[int] = field(default_factory=list)
+
 
 class FavoritesService:
     def __init__(self, session: AsyncSession) -> None:
+        self.session = session
         self.books = BooksRepository(session)
         self.favorites = FavoritesRepository(session)
 
     async def add_favorite(self, *, user_id: int, book_id: int) -> str:
         """
+        Один INSERT: отсутствие книги определяется по нарушению FK, дубль — по ON CONFLICT.
         returns: "created" | "exists" | "book_not_found"
         """
-        book = await self.books.get_by_id(book_id)
-        if book is None:
-            return "book_not_found"
-
-        if await self.favorites.exists(user_id=user_id, book_id=book_id):
-            return "exists"
-
         try:
-            await self.favorites.add(user_id=user_id, book_id=book_id)
-            return "created"
-        except IntegrityError:
-            return "exists"
+            created = await self.favorites.add(user_id=user_id, book_id=book_id)
+        except IntegrityError as exc:
+            # FK на users тоже может сработать (пользователя удалили, а principal ещё в кэше) —
+            # это не "книга не найдена"
+            if getattr(exc.orig, "sqlstate", None) == FK_VIOLATION and violated_constraint(exc) == BOOK_FK:
+                return "book_not_found"
+            raise
+        return "created" if created else "exists"
 
     async def remove_favorite(self, *, user_id: int, book_id: int) -> str:
         """
-        Идемпотентное удаление:
+        Идемпотентное удаление: DELETE ... RETURNING, а проверка книги —
+        только если удалять было нечего.
         returns: "deleted" | "missing" | "book_not_found"
         """
-        book = await self.books.get_by_id(book_id)
-        if book is None:
+        if await self.favorites.delete(user_id=user_id, book_id=book_id):
+            return "deleted"
+        if not await self.books.exists(book_id):
             return "book_not_found"
+        return "missing"
+
+    async def apply_changes(self, *, user_id: int, add: list[int], remove: list[int]) -> FavoritesChange:
+        """
+        PATCH: добавить/убрать списки книг в одной транзакции, по одному запросу на список.
+        Отсутствующие в каталоге книги из `add` пропускаются и попадают в not_found.
+        """
+        change = FavoritesChange()
+        change.removed = await self.favorites.remove_many(user_id=user_id, book_ids=remove)
+        change.added = await self.favorites.add_many(user_id=user_id, book_ids=add)
+        change.not_found = await self._not_found(add, change.added)
+        await self.session.commit()
+        return change
+
+    async def replace(self, *, user_id: int, book_ids: list[int]) -> FavoritesChange:
+        """PUT: сделать избранное равным `book_ids`; возвращает фактический diff."""
+        change = FavoritesChange()
+        change.removed = await self.favorites.remove_all_except(user_id=user_id, keep_book_ids=book_ids)
+        change.added = await self.favorites.add_many(user_id=user_id, book_ids=book_ids)
+        change.not_found = await self._not_found(book_ids, change.added)
+        await self.session.commit()
+        return change
 
-        deleted = await self.favorites.delete(user_id=user_id, book_id=book_id)
-        return "deleted" if deleted > 0 else "missing"
+    async def _not_found(self, requested: list[int], added: list[int]) -> list[int]:
+        # не добавленные = уже были в избранном или нет такой книги; проверяем только их
+        rest = sorted(set(requested) - set(added))
+        if not rest:
+            return []
+        existing = await self.books.existing_ids(rest)
+        return [book_id for book_id in rest if book_id not in existing]
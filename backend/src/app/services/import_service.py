@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import catalog_cache
+from app.core.cache_events import notify_catalog_changed
+
+# строк CSV на один COPY (и на один шаг разбора в потоке)
+BATCH_SIZE = 5_000
+# сколько ошибок отдавать в отчёте; общее число — в errors_total
+MAX_REPORTED_ERRORS = 1_000
+
+REQUIRED_COLUMNS = ("title", "year", "authors", "genres")
+
+STAGING_TABLE = "import_books_staging"
+STAGING_COLUMNS = ["line", "title", "description", "year", "isbn", "authors", "genres"]
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole can't be imported (bad header, not UTF-8, not CSV)."""
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool
+    rows_total: int = 0
+    inserted: int = 0
+    errors_total: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, line: int, error: str) -> None:
+        self.errors_total += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line=line, error=error))
+
+
+def _split_names(raw: str | None, max_len: int) -> list[str] | None:
+    names: list[str] = []
+    for part in (raw or "").split(";"):
+        name = part.strip()
+        if not name:
+            continue
+        if len(name) > max_len:
+            return None
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def _parse_row(row: dict[str, str | None]) -> tuple[tuple | None, str | None]:
+    """CSV row -> (staging tuple without line, None) or (None, error)."""
+    title = (row.get("title") or "").strip()
+    if not title:
+        return None, "title must not be empty"
+    if len(title) > 255:
+        return None, "title is too long (max 255)"
+
+    try:
+        year = int((row.get("year") or "").strip())
+    except ValueError:
+        return None, "year must be an integer"
+    if not 0 <= year <= 2100:
+        return None, "year must be between 0 and 2100"
+
+    isbn = (row.get("isbn") or "").strip() or None
+    if isbn is not None and len(isbn) > 32:
+        return None, "isbn is too long (max 32)"
+
+    description = (row.get("description") or "").strip() or None
+
+    authors = _split_names(row.get("authors"), 255)
+    if authors is None:
+        return None, "author name is too long (max 255)"
+    if not authors:
+        return None, "authors must not be empty"
+
+    genres = _split_names(row.get("genres"), 120)
+    if genres is None:
+        return None, "genre name is too long (max 120)"
+    if not genres:
+        return None, "genres must not be empty"
+
+    return (title, description, year, isbn, authors, genres), None
+
+
+class ImportService:
+    """
+    Массовый импорт каталога в формате export.csv (id, title, year, isbn, authors, genres;
+    опционально description). Колонка id игнорируется — книги создаются новыми.
+
+    Валидные строки уходят COPY во временную staging-таблицу, дальше авторы, жанры,
+    книги и связи сливаются несколькими set-based INSERT ... SELECT.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def import_books_csv(self, lines: Iterable[str], *, dry_run: bool = False) -> ImportReport:
+        report = ImportReport(dry_run=dry_run)
+        started = time.perf_counter()
+
+        reader = csv.DictReader(lines)
+        try:
+            header = await asyncio.to_thread(lambda: reader.fieldnames)
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ImportFormatError(f"Cannot read CSV header: {exc}") from exc
+        missing = [c for c in REQUIRED_COLUMNS if c not in (header or [])]
+        if missing:
+            raise ImportFormatError(f"Missing required columns: {', '.join(missing)}")
+
+        try:
+            await self._create_staging()
+            rows = iter(reader)
+            while True:
+                # разбор CSV — синхронный; уносим его из event loop порциями
+                try:
+                    batch = await asyncio.to_thread(self._read_batch, rows, reader, report)
+                except (UnicodeDecodeError, csv.Error) as exc:
+                    raise ImportFormatError(f"Cannot read CSV: {exc}") from exc
+                if batch is None:
+                    break
+                if batch:
+                    await self._copy_batch(batch)
+
+            await self._reject_isbn_conflicts(report)
+            report.inserted = await self._merge()
+        except BaseException:
+            await self.session.rollback()
+            raise
+
+        if dry_run:
+            await self.session.rollback()
+        else:
+            if report.inserted:
+                # новые id могут попасть на любую из последних страниц — проще сбросить каталог.
+                # Импорт из CLI идёт в другом процессе: воркеры API сбросят свой кэш по NOTIFY
+                await notify_catalog_changed(self.session)
+            await self.session.commit()
+            if report.inserted:
+                catalog_cache.clear()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Books import finished: rows={} inserted={} errors={} dry_run={} elapsed={:.2f}s rate={:.0f} rows/s",
+            report.rows_total,
+            report.inserted,
+            report.errors_total,
+            dry_run,
+            elapsed,
+            report.rows_total / elapsed if elapsed > 0 else 0.0,
+        )
+        return report
+
+    @staticmethod
+    def _read_batch(rows: Iterator[dict], reader: csv.DictReader, report: ImportReport) -> list[tuple] | None:
+        batch: list[tuple] = []
+        for row in rows:
+            report.rows_total += 1
+            # line_num — физическая строка файла (с учётом заголовка и многострочных полей)
+            line = reader.line_num
+            parsed, error = _parse_row(row)
+            if error is not None:
+                report.add_error(line, error)
+            else:
+                batch.append((line, *parsed))
+            if len(batch) >= BATCH_SIZE:
+                return batch
+        return batch or None
+
+    async def _create_staging(self) -> None:
+        await self.session.execute(
+            text(
+                f"""
+                CREATE TEMP TABLE {STAGING_TABLE} (
+                    line integer PRIMARY KEY,
+                    title text NOT NULL,
+                    description text,
+                    year integer NOT NULL,
+                    isbn text,
+                    authors text[] NOT NULL,
+                    genres text[] NOT NULL,
+                    book_id integer
+                ) ON COMMIT DROP
+                """
+            )
+        )
+
+    async def _copy_batch(self, batch: list[tuple]) -> None:
+        conn = await self.session.connection()
+        raw = await conn.get_raw_connection()
+        # asyncpg: бинарный COPY FROM STDIN
+        await raw.driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=batch,
+            columns=STAGING_COLUMNS,
+        )
+
+    async def _reject_isbn_conflicts(self, report: ImportReport) -> None:
+        dup_in_file = await self.session.execute(
+            text(
+                f"""
+                DELETE FROM {STAGING_TABLE} s
+                USING {STAGING_TABLE} kept
+                WHERE s.isbn = kept.isbn AND s.line > kept.line
+                RETURNING s.line
+                """
+            )
+        )
+        for (line,) in dup_in_file:
+            report.add_error(line, "isbn is duplicated in the file")
+
+        dup_in_db = await self.session.execute(
+            text(
+                f"""
+                DELETE FROM {STAGING_TABLE} s
+                USING books b
+                WHERE b.isbn = s.isbn
+                RETURNING s.line
+                """
+            )
+        )
+        for (line,) in dup_in_db:
+            report.add_error(line, "isbn already exists")
+
+    async def _merge(self) -> int:
+        # авторы и жанры — get-or-create по уникальному name одним запросом на таблицу
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO authors (name)
+                SELECT DISTINCT n.name
+                FROM {STAGING_TABLE} s
+                CROSS JOIN LATERAL unnest(s.authors) AS n(name)
+                ORDER BY n.name
+                ON CONFLICT (name) DO NOTHING
+                """
+            )
+        )
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO genres (name)
+                SELECT DISTINCT n.name
+                FROM {STAGING_TABLE} s
+                CROSS JOIN LATERAL unnest(s.genres) AS n(name)
+                ORDER BY n.name
+                ON CONFLICT (name) DO NOTHING
+                """
+            )
+        )
+
+        # id книг выдаём заранее: так связи строятся без сопоставления RETURNING со строками файла
+        await self.session.execute(
+            text(f"UPDATE {STAGING_TABLE} SET book_id = nextval(pg_get_serial_sequence('books', 'id'))")
+        )
+        res = await self.session.execute(
+            text(
+                f"""
+                INSERT INTO books (id, title, description, year, isbn)
+                SELECT book_id, title, description, year, isbn
+                FROM {STAGING_TABLE}
+                ORDER BY line
+                """
+            )
+        )
+        inserted = int(res.rowcount or 0)
+
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO book_authors (book_id, author_id)
+                SELECT s.book_id, a.id
+                FROM {STAGING_TABLE} s
+                CROSS JOIN LATERAL unnest(s.authors) AS n(name)
+                JOIN authors a ON a.name = n.name
+                """
+            )
+        )
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO book_genres (book_id, genre_id)
+                SELECT s.book_id, g.id
+                FROM {STAGING_TABLE} s
+                CROSS JOIN LATERAL unnest(s.genres) AS n(name)
+                JOIN genres g ON g.name = n.name
+                """
+            )
+        )
+        return inserted
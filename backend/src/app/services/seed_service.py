@@ -0,0 +1,432 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Iterator, Sequence
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.passwords import password_hasher
+
+# Все синтетические даты отсчитываются от фиксированного момента — иначе
+# один и тот же seed давал бы разные данные в разные дни
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+LATEST_YEAR = 2024
+
+DEFAULT_PASSWORD = "seed-password"
+EMAIL_TEMPLATE = "seed-user-{}@example.com"
+
+FAVORITES_STAGING_TABLE = "seed_favorites_staging"
+
+GENRE_NAMES = (
+    "Fiction", "Fantasy", "Science Fiction", "Mystery", "Thriller", "Romance",
+    "Historical Fiction", "Horror", "Poetry", "Drama", "Biography", "Memoir",
+    "History", "Science", "Philosophy", "Psychology", "Economics", "Politics",
+    "Travel", "Cooking", "Art", "Music", "Religion", "Self-Help", "Business",
+    "Children", "Young Adult", "Comics", "Humor", "Adventure", "Classics",
+    "Crime", "Essays", "Mathematics", "Programming", "Medicine", "Nature",
+    "Sports", "Education", "Reference",
+)
+FIRST_NAMES = (
+    "Anna", "Boris", "Clara", "Daniel", "Elena", "Felix", "Greta", "Hugo",
+    "Irina", "Jonas", "Katya", "Leon", "Maria", "Nikolai", "Olga", "Pavel",
+    "Quinn", "Rosa", "Sergei", "Tatiana", "Umberto", "Vera", "Walter", "Xenia",
+    "Yuri", "Zoe",
+)
+SYLLABLES = (
+    "ka", "lo", "mi", "ne", "ra", "to", "vi", "sha", "dor", "len", "mar", "tin",
+    "ber", "gov", "ski", "ova", "ich", "ran", "sel", "wen", "dal", "fer", "hol", "kin",
+)
+
+# (значение, вес): авторов и жанров у книги, у большинства книг — один
+AUTHORS_PER_BOOK = ((1, 85), (2, 12), (3, 3))
+GENRES_PER_BOOK = ((1, 60), (2, 30), (3, 10))
+
+VOCABULARY_SIZE = 20_000
+# доля книг без описания / без ISBN
+NO_DESCRIPTION_SHARE = 0.15
+NO_ISBN_SHARE = 0.10
+
+
+@dataclass(frozen=True)
+class SeedPlan:
+    books: int = 10_000
+    authors: int = 2_000
+    genres: int = 40
+    users: int = 1_000
+    favorites: int = 20_000
+    random_seed: int = 42
+    workers: int = 4
+    chunk_size: int = 10_000
+    # показатель Zipf для популярности книг/авторов/жанров и частоты слов
+    zipf_s: float = 1.1
+    password: str = DEFAULT_PASSWORD
+
+
+@dataclass
+class SeedReport:
+    genres: int = 0
+    authors: int = 0
+    books: int = 0
+    users: int = 0
+    favorites: int = 0
+    elapsed_s: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+
+
+def zipf_cum_weights(n: int, s: float) -> list[float]:
+    """Cumulative Zipf weights for ranks 1..n (for random.choices)."""
+    return list(itertools.accumulate(1.0 / k ** s for k in range(1, n + 1)))
+
+
+def isbn13(book_id: int) -> str:
+    """Deterministic valid ISBN-13 in the 979 range, unique per book id."""
+    body = f"979{book_id % 10**9:09d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body))
+    return body + str((10 - total % 10) % 10)
+
+
+def _word(n: int) -> str:
+    # биекция число -> слово из слогов: разные n дают разные слова
+    parts = []
+    while True:
+        n, r = divmod(n, len(SYLLABLES))
+        parts.append(SYLLABLES[r])
+        if n == 0:
+            return "".join(parts)
+        n -= 1
+
+
+def author_name(author_id: int) -> str:
+    """Unique by construction: first name + surname derived from the id."""
+    idx = author_id - 1
+    return f"{FIRST_NAMES[idx % len(FIRST_NAMES)]} {_word(idx // len(FIRST_NAMES)).capitalize()}"
+
+
+def genre_names(n: int) -> list[str]:
+    base = list(GENRE_NAMES[:n])
+    return base + [f"{GENRE_NAMES[i % len(GENRE_NAMES)]} {i // len(GENRE_NAMES) + 1}" for i in range(len(base), n)]
+
+
+def _chunks(first_id: int, count: int, size: int) -> Iterator[tuple[int, int, int]]:
+    """(chunk number, first id, last id exclusive)."""
+    for no, lo in enumerate(range(0, count, size)):
+        yield no, first_id + lo, first_id + min(lo + size, count)
+
+
+class _Text:
+    """Pseudo-words with Zipf frequencies and log-normal lengths."""
+
+    def __init__(self, s: float) -> None:
+        self.words = [_word(i) for i in range(VOCABULARY_SIZE)]
+        self.cum = zipf_cum_weights(VOCABULARY_SIZE, s)
+
+    def words_of(self, rnd: random.Random, k: int) -> list[str]:
+        return rnd.choices(self.words, cum_weights=self.cum, k=k)
+
+    def title(self, rnd: random.Random) -> str:
+        # медиана ~3 слова, изредка длинные заголовки
+        k = min(12, 1 + int(rnd.lognormvariate(0.8, 0.6)))
+        return " ".join(self.words_of(rnd, k)).capitalize()[:255]
+
+    def description(self, rnd: random.Random) -> str | None:
+        if rnd.random() < NO_DESCRIPTION_SHARE:
+            return None
+        # медиана ~75 слов, длинный хвост до 600
+        k = max(5, min(600, int(rnd.lognormvariate(4.3, 0.7))))
+        words = self.words_of(rnd, k)
+        sentences = []
+        i = 0
+        while i < k:
+            n = rnd.randint(6, 16)
+            sentences.append(" ".join(words[i:i + n]).capitalize() + ".")
+            i += n
+        return " ".join(sentences)
+
+
+class _Ranked:
+    """Ids in random popularity order; sample() picks them with Zipf weights."""
+
+    def __init__(self, ids: Sequence[int], s: float, rnd: random.Random) -> None:
+        self.ids = list(ids)
+        rnd.shuffle(self.ids)
+        self.cum = zipf_cum_weights(len(self.ids), s)
+
+    def sample(self, rnd: random.Random, k: int) -> list[int]:
+        return rnd.choices(self.ids, cum_weights=self.cum, k=k)
+
+    def distinct(self, rnd: random.Random, k: int) -> list[int]:
+        picked: list[int] = []
+        for _ in range(k * 4):
+            (x,) = self.sample(rnd, 1)
+            if x not in picked:
+                picked.append(x)
+                if len(picked) == k:
+                    break
+        return picked
+
+
+def _pick_count(rnd: random.Random, table: tuple[tuple[int, int], ...]) -> int:
+    values, weights = zip(*table)
+    return rnd.choices(values, weights=weights)[0]
+
+
+def _past(rnd: random.Random, days: float) -> datetime:
+    return BASE_TIME - timedelta(seconds=rnd.uniform(0, days * 86_400))
+
+
+class SeedService:
+    """
+    Синтетический каталог для нагрузочных тестов и проверки планов запросов.
+
+    Данные воспроизводимы: каждый чанк генерируется своим Random(seed, таблица, номер),
+    так что результат не зависит от числа воркеров и порядка их работы (на пустой БД
+    совпадают и id). Грузится бинарным COPY в `workers` соединений параллельно.
+
+    Триггеры не отключаются: search_vector и favorites_count заполняются ими же.
+    Чанк книг — одна транзакция (books + book_authors + book_genres), чанки не
+    пересекаются по книгам. Избранное сначала грузится в UNLOGGED staging-таблицу,
+    потом переносится одним INSERT ... SELECT: триггер счётчиков срабатывает один раз,
+    и параллельные чанки не блокируют друг друга на строках books.
+
+    Все пользователи получают один заранее посчитанный bcrypt-хэш пароля plan.password.
+    Упавший посередине сид оставляет уже закоммиченные чанки — рассчитан на
+    отдельную БД для нагрузки, а не на продовую.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    async def seed(self, plan: SeedPlan) -> SeedReport:
+        report = SeedReport()
+        started = time.perf_counter()
+
+        async def phase(name: str, fn: Callable[[], Awaitable[int]]) -> int:
+            t0 = time.perf_counter()
+            n = await fn()
+            report.phases[name] = round(time.perf_counter() - t0, 3)
+            logger.info("seed: {} rows={} elapsed={:.2f}s", name, n, report.phases[name])
+            return n
+
+        text_gen = _Text(plan.zipf_s)
+        genre_ids = await self._insert_genres(genre_names(plan.genres))
+        report.genres = len(genre_ids)
+
+        author_first = await self._reserve_ids("authors", plan.authors)
+        book_first = await self._reserve_ids("books", plan.books)
+        user_first = await self._reserve_ids("users", plan.users)
+
+        report.authors = await phase(
+            "authors", lambda: self._load_authors(plan, author_first)
+        )
+
+        authors = _Ranked(range(author_first, author_first + plan.authors), plan.zipf_s, self._rnd(plan, "rank:authors"))
+        genres = _Ranked(genre_ids, plan.zipf_s, self._rnd(plan, "rank:genres"))
+        report.books = await phase(
+            "books", lambda: self._load_books(plan, book_first, text_gen, authors, genres)
+        )
+
+        password_hash = await password_hasher.hash(plan.password)
+        report.users = await phase(
+            "users", lambda: self._load_users(plan, user_first, password_hash)
+        )
+
+        if plan.favorites and plan.books and plan.users:
+            books = _Ranked(range(book_first, book_first + plan.books), plan.zipf_s, self._rnd(plan, "rank:books"))
+            report.favorites = await phase(
+                "favorites", lambda: self._load_favorites(plan, user_first, books)
+            )
+
+        await phase("analyze", self._analyze)
+        report.elapsed_s = round(time.perf_counter() - started, 3)
+        return report
+
+    @staticmethod
+    def _rnd(plan: SeedPlan, *key: Any) -> random.Random:
+        return random.Random(":".join(str(k) for k in (plan.random_seed, *key)))
+
+    async def _insert_genres(self, names: list[str]) -> list[int]:
+        if not names:
+            return []
+        # жанров мало и они осмысленные — переиспользуем уже существующие
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text("INSERT INTO genres (name) SELECT unnest(CAST(:names AS text[])) ON CONFLICT (name) DO NOTHING"),
+                {"names": names},
+            )
+            res = await conn.execute(
+                text("SELECT id FROM genres WHERE name = ANY(CAST(:names AS text[])) ORDER BY id"),
+                {"names": names},
+            )
+            return list(res.scalars())
+
+    async def _reserve_ids(self, table: str, count: int) -> int:
+        """Move the table's id sequence forward by `count`; returns the first reserved id."""
+        if count <= 0:
+            return 0
+        async with self.engine.begin() as conn:
+            last = (await conn.execute(
+                text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), nextval(pg_get_serial_sequence('{table}', 'id')) + :n - 1)"),
+                {"n": count},
+            )).scalar_one()
+        return int(last) - count + 1
+
+    async def _run_parallel(self, plan: SeedPlan, jobs: Iterator[Callable[[Any], Awaitable[int]]]) -> int:
+        """Run COPY jobs on `plan.workers` connections, one transaction per job."""
+        total = 0
+
+        async def worker() -> None:
+            nonlocal total
+            async with self.engine.connect() as conn:
+                for job in jobs:
+                    async with conn.begin():
+                        # большой чанк с триггерами может идти дольше DB_STATEMENT_TIMEOUT_MS
+                        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+                        raw = await conn.get_raw_connection()
+                        total += await job(raw.driver_connection)
+
+        # общий итератор: каждый воркер берёт следующий чанк, когда освободится
+        await asyncio.gather(*(worker() for _ in range(max(1, plan.workers))))
+        return total
+
+    async def _load_authors(self, plan: SeedPlan, first_id: int) -> int:
+        def job(lo: int, hi: int) -> Callable[[Any], Awaitable[int]]:
+            async def run(driver: Any) -> int:
+                records = [(i, author_name(i)) for i in range(lo, hi)]
+                await driver.copy_records_to_table("authors", records=records, columns=["id", "name"])
+                return len(records)
+            return run
+
+        return await self._run_parallel(
+            plan, (job(lo, hi) for _, lo, hi in _chunks(first_id, plan.authors, plan.chunk_size))
+        )
+
+    async def _load_books(
+        self,
+        plan: SeedPlan,
+        first_id: int,
+        text_gen: _Text,
+        authors: _Ranked,
+        genres: _Ranked,
+    ) -> int:
+        def generate(no: int, lo: int, hi: int) -> tuple[list[tuple], list[tuple], list[tuple]]:
+            rnd = self._rnd(plan, "books", no)
+            books, book_authors, book_genres = [], [], []
+            for book_id in range(lo, hi):
+                books.append((
+                    book_id,
+                    text_gen.title(rnd),
+                    text_gen.description(rnd),
+                    max(1800, LATEST_YEAR - int(rnd.expovariate(1 / 20))),
+                    None if rnd.random() < NO_ISBN_SHARE else isbn13(book_id),
+                    _past(rnd, 3 * 365),
+                ))
+                if authors.ids:
+                    for author_id in authors.distinct(rnd, _pick_count(rnd, AUTHORS_PER_BOOK)):
+                        book_authors.append((book_id, author_id))
+                if genres.ids:
+                    for genre_id in genres.distinct(rnd, _pick_count(rnd, GENRES_PER_BOOK)):
+                        book_genres.append((book_id, genre_id))
+            return books, book_authors, book_genres
+
+        def job(no: int, lo: int, hi: int) -> Callable[[Any], Awaitable[int]]:
+            async def run(driver: Any) -> int:
+                # генерация — CPU; в потоке, чтобы COPY соседних воркеров не простаивал
+                books, book_authors, book_genres = await asyncio.to_thread(generate, no, lo, hi)
+                await driver.copy_records_to_table(
+                    "books",
+                    records=books,
+                    columns=["id", "title", "description", "year", "isbn", "created_at"],
+                )
+                # statement-level триггер пересчитает search_vector книг чанка один раз
+                await driver.copy_records_to_table("book_authors", records=book_authors, columns=["book_id", "author_id"])
+                await driver.copy_records_to_table("book_genres", records=book_genres, columns=["book_id", "genre_id"])
+                return len(books)
+            return run
+
+        return await self._run_parallel(
+            plan, (job(*chunk) for chunk in _chunks(first_id, plan.books, plan.chunk_size))
+        )
+
+    async def _load_users(self, plan: SeedPlan, first_id: int, password_hash: str) -> int:
+        def job(no: int, lo: int, hi: int) -> Callable[[Any], Awaitable[int]]:
+            async def run(driver: Any) -> int:
+                rnd = self._rnd(plan, "users", no)
+                records = [
+                    (i, EMAIL_TEMPLATE.format(i), password_hash, "client", _past(rnd, 3 * 365))
+                    for i in range(lo, hi)
+                ]
+                await driver.copy_records_to_table(
+                    "users",
+                    records=records,
+                    columns=["id", "email", "password_hash", "role", "created_at"],
+                )
+                return len(records)
+            return run
+
+        return await self._run_parallel(
+            plan, (job(*chunk) for chunk in _chunks(first_id, plan.users, plan.chunk_size))
+        )
+
+    async def _load_favorites(self, plan: SeedPlan, first_user_id: int, books: _Ranked) -> int:
+        def generate(no: int, lo: int, hi: int) -> list[tuple]:
+            rnd = self._rnd(plan, "favorites", no)
+            offset = lo - first_user_id
+            # точная доля общего числа избранного на пользователей чанка
+            target = plan.favorites * (offset + hi - lo) // plan.users - plan.favorites * offset // plan.users
+            target = min(target, (hi - lo) * len(books.ids))
+            # активность пользователей тоже неравномерная, но мягче популярности книг
+            users = _Ranked(range(lo, hi), 0.8, rnd)
+            pairs: set[tuple[int, int]] = set()
+            for _ in range(10):
+                missing = target - len(pairs)
+                if missing <= 0:
+                    break
+                pairs.update(zip(users.sample(rnd, missing), books.sample(rnd, missing)))
+            return [(u, b, _past(rnd, 365)) for u, b in sorted(pairs)[:target]]
+
+        def job(no: int, lo: int, hi: int) -> Callable[[Any], Awaitable[int]]:
+            async def run(driver: Any) -> int:
+                records = await asyncio.to_thread(generate, no, lo, hi)
+                await driver.copy_records_to_table(
+                    FAVORITES_STAGING_TABLE,
+                    records=records,
+                    columns=["user_id", "book_id", "created_at"],
+                )
+                return len(records)
+            return run
+
+        async with self.engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {FAVORITES_STAGING_TABLE}"))
+            await conn.execute(text(
+                f"CREATE UNLOGGED TABLE {FAVORITES_STAGING_TABLE} "
+                "(user_id integer NOT NULL, book_id integer NOT NULL, created_at timestamptz NOT NULL)"
+            ))
+        try:
+            await self._run_parallel(
+                plan, (job(*chunk) for chunk in _chunks(first_user_id, plan.users, plan.chunk_size))
+            )
+            async with self.engine.begin() as conn:
+                await conn.execute(text("SET LOCAL statement_timeout = 0"))
+                res = await conn.execute(text(
+                    f"INSERT INTO favorites (user_id, book_id, created_at) "
+                    f"SELECT user_id, book_id, created_at FROM {FAVORITES_STAGING_TABLE}"
+                ))
+                return int(res.rowcount or 0)
+        finally:
+            async with self.engine.begin() as conn:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {FAVORITES_STAGING_TABLE}"))
+
+    async def _analyze(self) -> int:
+        # свежая статистика планировщика: ради этого сид обычно и запускают
+        tables = ("authors", "genres", "books", "book_authors", "book_genres", "users", "favorites")
+        async with self.engine.begin() as conn:
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+            await conn.execute(text(f"ANALYZE {', '.join(tables)}"))
+        return len(tables)
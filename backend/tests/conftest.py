@@ -3,8 +3,9 @@ from __future__ import annotations
 import asyncio
 import os
 import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import AsyncIterator, Callable
+from typing import AsyncIterator, Callable, ContextManager, Iterator
 
 import pytest
 import pytest_asyncio
@@ -89,12 +90,38 @@ async def clean_db(db_engine: AsyncEngine) -> AsyncIterator[None]:
         if tables:
             quoted = ", ".join(f'"{t}"' for t in tables)
             await conn.execute(text(f"TRUNCATE TABLE {quoted} RESTART IDENTITY CASCADE;"))
+
+    # in-process кэши переживают тест (app — session-scope), а БД — нет
+    from app.core.cache import catalog_cache, principal_cache
+    catalog_cache.clear()
+    principal_cache.clear()
     yield
 
     # ✅ гарантированно закрываем все ресурсы до закрытия event loop
     await db_engine.dispose()
 
 
+@pytest.fixture(scope="function")
+def max_queries(db_engine: AsyncEngine) -> Callable[[int], ContextManager]:
+    """
+    Верхняя граница числа SQL-запросов в блоке (по всем запросам к тестовой БД):
+
+        with max_queries(3) as stats:
+            r = await client.get("/api/v1/books")
+    """
+    from app.core.sql_stats import capture_sql, instrument_engine
+
+    instrument_engine(db_engine)
+
+    @contextmanager
+    def _max_queries(limit: int) -> Iterator:
+        with capture_sql() as stats:
+            yield stats
+        assert stats.count <= limit, f"{stats.count} queries (max {limit}):\n" + "\n".join(stats.statements)
+
+    return _max_queries
+
+
 @pytest.fixture(scope="function")
 def async_session_maker(db_engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
     return async_sessionmaker(db_engine, expire_on_commit=False)
@@ -3,6 +3,8 @@ from httpx import AsyncClient
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.export_service import CHUNK_SIZE, YIELD_PER, ExportService
+
 
 @pytest.mark.asyncio
 async def test_admin_export_forbidden_for_client(client: AsyncClient, get_token):
@@ -61,3 +63,89 @@ async def test_admin_export_csv_ok(
     assert "Book 1" in body
     assert "Author 1" in body
     assert "Genre 1" in body
+
+
+async def _make_admin_headers(create_user, login_user, async_session: AsyncSession, email: str) -> dict:
+    user = await create_user(email=email)
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": user["id"]})
+    await async_session.commit()
+    return await login_user(email=email, password="strong_password_123")
+
+
+@pytest.mark.asyncio
+async def test_admin_export_streams_large_catalog_in_chunks(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _make_admin_headers(create_user, login_user, async_session, "admin-big@example.com")
+    await async_session.execute(
+        text(
+            "INSERT INTO books (title, year) "
+            "SELECT 'Bulk book ' || g, 2000 + g % 20 FROM generate_series(1, 3000) AS g;"
+        )
+    )
+    await async_session.commit()
+
+    r = await client.get(
+        "/api/v1/admin/books/export.csv",
+        headers={**headers, "Accept-Encoding": "identity"},
+    )
+    assert r.status_code == 200, r.text
+    assert "content-encoding" not in r.headers
+
+    lines = r.text.strip().splitlines()
+    assert lines[0] == "id,title,year,isbn,authors,genres"
+    assert len(lines) == 3001
+    assert lines[1].startswith("1,Bulk book 1,")
+    assert lines[-1].startswith("3000,Bulk book 3000,")
+
+
+@pytest.mark.asyncio
+async def test_export_chunks_bounded_inside_cursor_partition(async_session: AsyncSession):
+    # одна партиция курсора (YIELD_PER строк) даёт несколько CHUNK_SIZE CSV
+    await async_session.execute(
+        text(
+            "INSERT INTO books (title, year) "
+            "SELECT 'Chunked book with a rather long title number ' || g || repeat('x', 60), 2000 "
+            "FROM generate_series(1, :n) AS g;"
+        ),
+        {"n": YIELD_PER},
+    )
+    await async_session.commit()
+
+    chunks = [c async for c in ExportService().stream_books_csv(async_session)]
+
+    assert len(chunks) >= 3
+    # кусок — не больше CHUNK_SIZE плюс одна строка CSV
+    assert max(len(c) for c in chunks) < CHUNK_SIZE + 200
+    assert b"".join(chunks).count(b"\n") == YIELD_PER + 1
+
+
+@pytest.mark.asyncio
+async def test_admin_export_gzip_negotiated(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _make_admin_headers(create_user, login_user, async_session, "admin-gz@example.com")
+    await async_session.execute(text("INSERT INTO books (title, year) VALUES ('Gzip Book', 2020);"))
+    # больше COMPRESSION_MIN_SIZE — иначе ответ уходит несжатым
+    await async_session.execute(
+        text("INSERT INTO books (title, year) SELECT 'Filler ' || g, 2000 FROM generate_series(1, 200) AS g;")
+    )
+    await async_session.commit()
+
+    r = await client.get(
+        "/api/v1/admin/books/export.csv",
+        headers={**headers, "Accept-Encoding": "gzip"},
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in r.headers.get("vary", "").lower()
+    # потоковый ответ: длина заранее неизвестна
+    assert "content-length" not in r.headers
+    # httpx распаковывает gzip прозрачно
+    assert "Gzip Book" in r.text
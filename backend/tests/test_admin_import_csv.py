@@ -0,0 +1,145 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _admin_headers(create_user, login_user, async_session: AsyncSession) -> dict:
+    user = await create_user(email="admin@example.com")
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": user["id"]})
+    await async_session.commit()
+    return await login_user(email="admin@example.com", password="strong_password_123")
+
+
+def _upload(body: str) -> dict:
+    return {"file": ("books.csv", body.encode("utf-8"), "text/csv")}
+
+
+@pytest.mark.asyncio
+async def test_admin_import_forbidden_for_client(client: AsyncClient, get_token):
+    headers = await get_token(email="client@example.com")
+    r = await client.post(
+        "/api/v1/admin/books/import",
+        headers=headers,
+        files=_upload("id,title,year,isbn,authors,genres\n"),
+    )
+    assert r.status_code == 403, r.text
+
+
+@pytest.mark.asyncio
+async def test_admin_import_csv_ok_with_row_errors(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    # существующие автор и isbn: автор переиспользуется, книга с этим isbn отклоняется
+    await async_session.execute(text("INSERT INTO authors (name) VALUES ('Author 1')"))
+    await async_session.execute(text("INSERT INTO books (title, year, isbn) VALUES ('Old', 2000, 'ISBN-OLD')"))
+    await async_session.commit()
+
+    body = (
+        "id,title,year,isbn,authors,genres,description\n"
+        "1,Book 1,2020,ISBN1,Author 1;Author 2,Genre 1,First\n"   # line 2 ok
+        ",,2020,,Author 1,Genre 1,\n"                             # line 3 пустой title
+        "3,Book 3,year,,Author 1,Genre 1,\n"                      # line 4 плохой year
+        "4,Book 4,2021,ISBN1,Author 2,Genre 2,\n"                 # line 5 isbn дублирует line 2
+        "5,Book 5,2021,ISBN-OLD,Author 2,Genre 2,\n"              # line 6 isbn уже в БД
+        "6,Book 6,2022,,Author 3,Genre 1;Genre 2,Sixth\n"         # line 7 ok
+    )
+    r = await client.post("/api/v1/admin/books/import", headers=headers, files=_upload(body))
+    assert r.status_code == 200, r.text
+    data = r.json()
+
+    assert data["dry_run"] is False
+    assert data["rows_total"] == 6
+    assert data["inserted"] == 2
+    assert data["errors_total"] == 4
+    assert {e["line"] for e in data["errors"]} == {3, 4, 5, 6}
+
+    authors = (await async_session.execute(text("SELECT name FROM authors ORDER BY name"))).scalars().all()
+    assert authors == ["Author 1", "Author 2", "Author 3"]
+
+    r = await client.get("/api/v1/books", params={"limit": 10})
+    assert r.status_code == 200, r.text
+    items = {b["title"]: b for b in r.json()["items"]}
+    assert set(items) == {"Old", "Book 1", "Book 6"}
+    assert sorted(items["Book 1"]["authors"]) == ["Author 1", "Author 2"]
+    assert sorted(items["Book 6"]["genres"]) == ["Genre 1", "Genre 2"]
+
+    # триггер поиска видит авторов, вставленных set-based
+    r = await client.get("/api/v1/books/search", params={"q": "Author 3"})
+    assert r.status_code == 200, r.text
+    assert [b["title"] for b in r.json()["items"]] == ["Book 6"]
+
+
+@pytest.mark.asyncio
+async def test_admin_import_csv_dry_run_rolls_back(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    body = "title,year,isbn,authors,genres\nBook 1,2020,ISBN1,Author 1,Genre 1\n"
+    r = await client.post(
+        "/api/v1/admin/books/import",
+        headers=headers,
+        params={"dry_run": "true"},
+        files=_upload(body),
+    )
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["dry_run"] is True
+    assert data["inserted"] == 1
+    assert data["errors_total"] == 0
+
+    for table in ("books", "authors", "genres", "book_authors"):
+        count = (await async_session.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+        assert count == 0, table
+
+
+@pytest.mark.asyncio
+async def test_admin_import_csv_missing_columns(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    r = await client.post(
+        "/api/v1/admin/books/import",
+        headers=headers,
+        files=_upload("title,year\nBook 1,2020\n"),
+    )
+    assert r.status_code == 422, r.text
+    assert "authors" in r.text
+
+
+@pytest.mark.asyncio
+async def test_admin_import_csv_roundtrip_with_export(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    rows = "".join(f"{i},Bulk book {i},2001,BULK-{i},Author {i % 7},Genre {i % 3}\n" for i in range(1, 1201))
+    r = await client.post(
+        "/api/v1/admin/books/import",
+        headers=headers,
+        files=_upload("id,title,year,isbn,authors,genres\n" + rows),
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["inserted"] == 1200
+
+    exported = await client.get("/api/v1/admin/books/export.csv", headers=headers)
+    assert exported.status_code == 200, exported.text
+    lines = exported.text.strip().splitlines()
+    assert len(lines) == 1 + 1200
+    assert "Bulk book 1,2001,BULK-1,Author 1,Genre 1" in lines[1]
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / "bench"
+if str(BENCH_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCH_DIR))
+
+import api_bench  # noqa: E402
+
+
+def _result(**endpoints: dict) -> dict:
+    return {"endpoints": endpoints}
+
+
+def _summary(p50: float, p95: float, p99: float, rps: float) -> dict:
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "rps": rps}
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    baseline = _result(
+        **{
+            "GET /books/{id}": _summary(2.0, 5.0, 10.0, 800.0),
+            "POST /auth/login": _summary(60.0, 90.0, 120.0, 40.0),
+        }
+    )
+    current = _result(
+        **{
+            "GET /books/{id}": _summary(2.1, 6.0, 10.0, 700.0),
+            "POST /auth/login": _summary(50.0, 80.0, 100.0, 45.0),
+            "GET /new-endpoint": _summary(1.0, 1.0, 1.0, 1.0),
+        }
+    )
+
+    rows = api_bench.compare(baseline, current, threshold=0.10)
+    regressions = {(r["endpoint"], r["metric"]) for r in rows if r["regression"]}
+    # p50 +5% — в пределах порога; p95 +20% и RPS -12.5% — регрессии
+    assert regressions == {("GET /books/{id}", "p95_ms"), ("GET /books/{id}", "rps")}
+    # эндпоинта нет в baseline — сравнивать не с чем
+    assert all(r["endpoint"] != "GET /new-endpoint" for r in rows)
+
+
+def test_parse_mix():
+    assert api_bench.parse_mix("browse=3,detail=1,export=0") == {"browse": 3.0, "detail": 1.0}
+    with pytest.raises(SystemExit):
+        api_bench.parse_mix("browse=1,unknown=2")
+
+
+def test_summary_percentiles():
+    samples = [i / 1000 for i in range(1, 101)]  # 1..100 мс
+    summary = api_bench.summarize(samples, errors=2, duration=10.0)
+    assert summary["count"] == 100
+    assert summary["errors"] == 2
+    assert summary["rps"] == 10.0
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50.0, 95.0, 99.0)
@@ -0,0 +1,197 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.cache import principal_cache
+from app.core.config import settings
+from app.services.books_service import BooksService
+from tests.test_loading_profiles import _count_statements
+
+
+async def _admin_headers(create_user, login_user, async_session: AsyncSession) -> dict:
+    user = await create_user(email="admin@example.com")
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": user["id"]})
+    await async_session.commit()
+    return await login_user(email="admin@example.com", password="strong_password_123")
+
+
+def _item(i: int, **overrides) -> dict:
+    item = {
+        "title": f"Batch {i}",
+        "year": 2000 + i % 20,
+        "isbn": f"B-{i}",
+        "authors": [f"Author {i % 5}", f"Co-author {i % 3}"],
+        "genres": [f"Genre {i % 4}"],
+    }
+    item.update(overrides)
+    return item
+
+
+@pytest.mark.asyncio
+async def test_batch_forbidden_for_client(client: AsyncClient, get_token):
+    headers = await get_token(email="client@example.com")
+    r = await client.post("/api/v1/books:batch", headers=headers, json={"items": [_item(1)]})
+    assert r.status_code == 403, r.text
+
+
+@pytest.mark.asyncio
+async def test_batch_creates_books_in_constant_queries(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+    db_engine: AsyncEngine,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    principal_cache.clear()
+    with _count_statements(db_engine) as small:
+        r = await client.post("/api/v1/books:batch", headers=headers, json={"items": [_item(0)]})
+    assert r.status_code == 200, r.text
+
+    items = [_item(i) for i in range(1, 301)]
+    principal_cache.clear()
+    with _count_statements(db_engine) as large:
+        r = await client.post("/api/v1/books:batch", headers=headers, json={"items": items})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["created"] == 300
+    assert data["failed"] == 0
+    assert [it["index"] for it in data["items"]] == list(range(300))
+    # id из RETURNING сопоставлены с элементами по порядку
+    assert [it["book"]["title"] for it in data["items"]] == [f"Batch {i}" for i in range(1, 301)]
+
+    # insertmanyvalues может разбить executemany на несколько пачек — но не на строку за строкой
+    assert len(large) <= len(small) + 6, large
+
+    book_id = data["items"][41]["book"]["id"]
+    r = await client.get(f"/api/v1/books/{book_id}")
+    assert r.status_code == 200, r.text
+    assert r.json()["title"] == "Batch 42"
+    assert sorted(r.json()["authors"]) == ["Author 2", "Co-author 0"]
+
+    links = (await async_session.execute(text("SELECT count(*) FROM book_authors"))).scalar_one()
+    assert links == 2 * 301
+
+
+@pytest.mark.asyncio
+async def test_batch_all_or_nothing_rolls_back_on_error(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    items = [_item(1), _item(2, authors=[999_999]), _item(3, isbn="B-1")]
+    r = await client.post("/api/v1/books:batch", headers=headers, json={"items": items})
+    assert r.status_code == 422, r.text
+    details = r.json()["details"]
+    assert [d["index"] for d in details] == [1, 2]
+
+    for table in ("books", "authors", "genres"):
+        count = (await async_session.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+        assert count == 0, table
+
+
+@pytest.mark.asyncio
+async def test_batch_best_effort_skips_failed_items(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    genre_id = (await async_session.execute(
+        text("INSERT INTO genres (name) VALUES ('Existing genre') RETURNING id;")
+    )).scalar_one()
+    await async_session.execute(text("INSERT INTO books (title, year, isbn) VALUES ('Old', 1999, 'B-OLD')"))
+    await async_session.commit()
+
+    items = [
+        _item(1, genres=[genre_id]),
+        _item(2, isbn="B-OLD"),
+        _item(3, genres=[999_999]),
+        _item(4),
+    ]
+    r = await client.post(
+        "/api/v1/books:batch",
+        headers=headers,
+        json={"mode": "best_effort", "items": items},
+    )
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    statuses = [(it["index"], it["status"]) for it in data["items"]]
+    assert statuses == [(0, "created"), (1, "failed"), (2, "failed"), (3, "created")]
+    assert data["items"][0]["book"]["genres"] == ["Existing genre"]
+    assert data["items"][1]["error"] == "isbn already exists"
+    assert data["items"][2]["error"] == "One or more genre ids not found"
+
+    titles = (await async_session.execute(text("SELECT title FROM books ORDER BY id"))).scalars().all()
+    assert titles == ["Old", "Batch 1", "Batch 4"]
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_too_many_items(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+    monkeypatch,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+    monkeypatch.setattr(settings, "books_batch_max_items", 2)
+
+    r = await client.post(
+        "/api/v1/books:batch",
+        headers=headers,
+        json={"items": [_item(i) for i in range(3)]},
+    )
+    assert r.status_code == 413, r.text
+    assert r.json()["details"] == "Too many items (max 2)"
+
+
+@pytest.mark.parametrize("mode", ["best_effort", "all_or_nothing"])
+@pytest.mark.asyncio
+async def test_batch_isbn_taken_concurrently_is_item_error(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+    monkeypatch,
+    mode: str,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+    await async_session.execute(text("INSERT INTO books (title, year, isbn) VALUES ('Rival', 1999, 'B-2')"))
+    await async_session.commit()
+
+    # первая проверка isbn "не видит" книгу — как если бы её вставили сразу после SELECT
+    original = BooksService._existing_isbns
+    calls = []
+
+    async def racing_existing_isbns(self, items):
+        calls.append(len(items))
+        return set() if len(calls) == 1 else await original(self, items)
+
+    monkeypatch.setattr(BooksService, "_existing_isbns", racing_existing_isbns)
+
+    items = [_item(1), _item(2), _item(3)]
+    r = await client.post("/api/v1/books:batch", headers=headers, json={"mode": mode, "items": items})
+
+    if mode == "all_or_nothing":
+        assert r.status_code == 422, r.text
+        assert r.json()["details"] == [{"index": 1, "error": "isbn already exists"}]
+        expected = ["Rival"]
+    else:
+        assert r.status_code == 200, r.text
+        data = r.json()
+        assert (data["created"], data["failed"]) == (2, 1)
+        assert data["items"][1] == {"index": 1, "status": "failed", "book": None, "error": "isbn already exists"}
+        expected = ["Rival", "Batch 1", "Batch 3"]
+
+    titles = (await async_session.execute(text("SELECT title FROM books ORDER BY id"))).scalars().all()
+    assert titles == expected
@@ -0,0 +1,124 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _seed(async_session: AsyncSession) -> dict[str, int]:
+    """8 книг: жанр Prose у чётных, Poetry у нечётных; автор Ann у первых трёх; годы 2000..2007."""
+    ids = {}
+    ids["prose"] = (await async_session.execute(
+        text("INSERT INTO genres (name) VALUES ('Prose') RETURNING id")
+    )).scalar_one()
+    ids["poetry"] = (await async_session.execute(
+        text("INSERT INTO genres (name) VALUES ('Poetry') RETURNING id")
+    )).scalar_one()
+    ids["ann"] = (await async_session.execute(
+        text("INSERT INTO authors (name) VALUES ('Ann') RETURNING id")
+    )).scalar_one()
+    ids["bob"] = (await async_session.execute(
+        text("INSERT INTO authors (name) VALUES ('Bob') RETURNING id")
+    )).scalar_one()
+    for i in range(8):
+        book_id = (await async_session.execute(
+            text("INSERT INTO books (title, year) VALUES (:t, :y) RETURNING id"),
+            {"t": f"Filtered {i}", "y": 2000 + i},
+        )).scalar_one()
+        await async_session.execute(
+            text("INSERT INTO book_genres (book_id, genre_id) VALUES (:b, :g)"),
+            {"b": book_id, "g": ids["prose"] if i % 2 == 0 else ids["poetry"]},
+        )
+        await async_session.execute(
+            text("INSERT INTO book_authors (book_id, author_id) VALUES (:b, :a)"),
+            {"b": book_id, "a": ids["ann"] if i < 3 else ids["bob"]},
+        )
+    await async_session.commit()
+    return ids
+
+
+async def _titles(client: AsyncClient, params: dict) -> list[str]:
+    titles: list[str] = []
+    cursor = None
+    while True:
+        r = await client.get("/api/v1/books", params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        page = r.json()
+        titles += [i["title"] for i in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return titles
+
+
+@pytest.mark.asyncio
+async def test_filters_combine_and_paginate(client: AsyncClient, async_session: AsyncSession):
+    ids = await _seed(async_session)
+
+    assert await _titles(client, {"genre_id": ids["prose"]}) == [f"Filtered {i}" for i in (0, 2, 4, 6)]
+    assert await _titles(client, {"author_id": ids["ann"], "genre_id": ids["poetry"]}) == ["Filtered 1"]
+    assert await _titles(client, {"year_from": 2003, "year_to": 2005}) == [f"Filtered {i}" for i in (3, 4, 5)]
+    assert await _titles(client, {"genre_id": ids["poetry"], "sort": "popular", "year_from": 2004}) == [
+        "Filtered 5",
+        "Filtered 7",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalid_year_range_is_rejected(client: AsyncClient):
+    r = await client.get("/api/v1/books", params={"year_from": 2010, "year_to": 2000})
+    assert r.status_code == 422
+    r = await client.get("/api/v1/books/facets", params={"year_from": 2010, "year_to": 2000})
+    assert r.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_facets_exclude_own_dimension(client: AsyncClient, async_session: AsyncSession, max_queries):
+    ids = await _seed(async_session)
+
+    with max_queries(1):
+        r = await client.get("/api/v1/books/facets", params={"genre_id": ids["prose"], "year_to": 2003})
+    assert r.status_code == 200, r.text
+    facets = r.json()
+
+    # Prose ∩ year<=2003: книги 0 и 2
+    assert facets["total"] == 2
+    # жанры без фильтра по жанру: годы 2000..2003 — по два каждого жанра
+    assert facets["genres"] == [
+        {"id": ids["poetry"], "name": "Poetry", "count": 2},
+        {"id": ids["prose"], "name": "Prose", "count": 2},
+    ]
+    assert facets["authors"] == [{"id": ids["ann"], "name": "Ann", "count": 2}]
+    # годы без фильтра по году: все Prose
+    assert facets["years"] == [{"year": y, "count": 1} for y in (2000, 2002, 2004, 2006)]
+
+    # повтор — из кэша по сигнатуре фильтра
+    with max_queries(0):
+        again = await client.get("/api/v1/books/facets", params={"year_to": 2003, "genre_id": ids["prose"]})
+    assert again.json() == facets
+
+
+@pytest.mark.asyncio
+async def test_filtered_cache_dropped_on_catalog_write(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    ids = await _seed(async_session)
+    admin = await create_user(email="filters-admin@example.com")
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": admin["id"]})
+    await async_session.commit()
+    headers = await login_user(email="filters-admin@example.com")
+
+    params = {"genre_id": ids["prose"]}
+    assert len((await client.get("/api/v1/books", params=params)).json()["items"]) == 4
+    assert (await client.get("/api/v1/books/facets", params=params)).json()["total"] == 4
+
+    r = await client.post(
+        "/api/v1/books",
+        json={"title": "Filtered new", "year": 2010, "authors": [ids["bob"]], "genres": [ids["prose"]]},
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+
+    assert len((await client.get("/api/v1/books", params=params)).json()["items"]) == 5
+    assert (await client.get("/api/v1/books/facets", params=params)).json()["total"] == 5
@@ -54,8 +54,8 @@ async def test_guest_can_get_books_list_and_detail(
     r_list = await client.get(books_base)
     assert r_list.status_code == 200, r_list.text
     data = r_list.json()
-    assert isinstance(data, list)
-    assert any(item.get("id") == book_id for item in data)
+    assert isinstance(data["items"], list)
+    assert any(item.get("id") == book_id for item in data["items"])
 
     # guest detail
     r_detail = await client.get(f"{books_base}/{book_id}")
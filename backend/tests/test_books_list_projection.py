@@ -0,0 +1,63 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.books_repo import BooksRepository
+
+
+async def _seed(async_session: AsyncSession) -> tuple[int, int]:
+    linked = (await async_session.execute(
+        text("INSERT INTO books (title, year, description) VALUES ('Projection', 2001, 'long text') RETURNING id")
+    )).scalar_one()
+    bare = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES ('Projection bare', 2002) RETURNING id")
+    )).scalar_one()
+    await async_session.execute(text("INSERT INTO authors (name) VALUES ('Zed'), ('Adam')"))
+    await async_session.execute(text("INSERT INTO genres (name) VALUES ('Poetry')"))
+    await async_session.execute(
+        text("INSERT INTO book_authors (book_id, author_id) SELECT :b, id FROM authors"), {"b": linked}
+    )
+    await async_session.execute(
+        text("INSERT INTO book_genres (book_id, genre_id) SELECT :b, id FROM genres"), {"b": linked}
+    )
+    await async_session.commit()
+    return linked, bare
+
+
+@pytest.mark.asyncio
+async def test_list_rows_aggregate_names_without_orm(async_session: AsyncSession):
+    linked, bare = await _seed(async_session)
+
+    rows = await BooksRepository(async_session).list_after(after_id=None, limit=10)
+
+    assert [tuple(r) for r in rows] == [
+        (linked, "Projection", 2001, ["Adam", "Zed"], ["Poetry"], 0),
+        (bare, "Projection bare", 2002, [], [], 0),
+    ]
+    # строки, а не сущности: identity map пуст, description не выбирался
+    assert len(async_session.identity_map) == 0
+    assert "description" not in rows[0]._fields
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints_share_projection(client: AsyncClient, async_session: AsyncSession, max_queries):
+    linked, _ = await _seed(async_session)
+
+    with max_queries(1):
+        r = await client.get("/api/v1/books", params={"sort": "popular"})
+    assert r.status_code == 200, r.text
+    item = next(i for i in r.json()["items"] if i["id"] == linked)
+    assert item == {
+        "id": linked,
+        "title": "Projection",
+        "year": 2001,
+        "authors": ["Adam", "Zed"],
+        "genres": ["Poetry"],
+        "favorites_count": 0,
+    }
+
+    with max_queries(1):
+        r = await client.get("/api/v1/books/search", params={"q": "zed"})
+    assert r.status_code == 200, r.text
+    assert [i["authors"] for i in r.json()["items"]] == [["Adam", "Zed"]]
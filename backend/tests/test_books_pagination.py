@@ -0,0 +1,64 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _seed_books(async_session: AsyncSession, count: int) -> list[int]:
+    ids = []
+    for i in range(count):
+        book_id = (await async_session.execute(
+            text("INSERT INTO books (title, year) VALUES (:t, 2000) RETURNING id;"),
+            {"t": f"Book {i}"},
+        )).scalar_one()
+        ids.append(book_id)
+    await async_session.commit()
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_books_keyset_pages_cover_catalog_once(client: AsyncClient, async_session: AsyncSession):
+    ids = await _seed_books(async_session, 5)
+
+    seen: list[int] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/api/v1/books", params=params)
+        assert r.status_code == 200, r.text
+        data = r.json()
+        assert len(data["items"]) <= 2
+        seen.extend(item["id"] for item in data["items"])
+        pages += 1
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ids
+    assert pages == 3
+
+
+@pytest.mark.asyncio
+async def test_books_cursor_stable_after_delete(client: AsyncClient, async_session: AsyncSession):
+    ids = await _seed_books(async_session, 4)
+
+    r1 = await client.get("/api/v1/books", params={"limit": 2})
+    cursor = r1.json()["next_cursor"]
+
+    # удаляем последнюю книгу первой страницы — следующая страница не должна "съехать"
+    await async_session.execute(text("DELETE FROM books WHERE id=:id"), {"id": ids[1]})
+    await async_session.commit()
+
+    r2 = await client.get("/api/v1/books", params={"limit": 2, "cursor": cursor})
+    assert r2.status_code == 200, r2.text
+    assert [item["id"] for item in r2.json()["items"]] == ids[2:]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"cursor": "not-a-cursor"}, {"limit": 0}, {"limit": 100000}])
+async def test_books_pagination_validation_422(client: AsyncClient, params: dict):
+    r = await client.get("/api/v1/books", params=params)
+    assert r.status_code == 422, r.text
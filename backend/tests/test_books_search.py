@@ -0,0 +1,66 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _seed_book(async_session: AsyncSession, title: str, description: str | None, author: str) -> int:
+    author_id = (await async_session.execute(
+        text("INSERT INTO authors (name) VALUES (:n) RETURNING id;"), {"n": author}
+    )).scalar_one()
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, description, year) VALUES (:t, :d, 2010) RETURNING id;"),
+        {"t": title, "d": description},
+    )).scalar_one()
+    await async_session.execute(
+        text("INSERT INTO book_authors (book_id, author_id) VALUES (:b, :a);"),
+        {"b": book_id, "a": author_id},
+    )
+    await async_session.commit()
+    return book_id
+
+
+@pytest.mark.asyncio
+async def test_search_matches_title_author_and_description(client: AsyncClient, async_session: AsyncSession):
+    by_title = await _seed_book(async_session, "Dragon Saga", None, "Anna Petrova")
+    by_author = await _seed_book(async_session, "Winter Tales", None, "Ivan Dragon")
+    by_desc = await _seed_book(async_session, "Sea Stories", "A story about a dragon", "Oleg Sidorov")
+    await _seed_book(async_session, "Unrelated", "Nothing here", "Somebody Else")
+
+    r = await client.get("/api/v1/books/search", params={"q": "dragon"})
+    assert r.status_code == 200, r.text
+    ids = [item["id"] for item in r.json()["items"]]
+
+    assert set(ids) == {by_title, by_author, by_desc}
+    # вес title (A) > автор (B) > description (C)
+    assert ids == [by_title, by_author, by_desc]
+
+
+@pytest.mark.asyncio
+async def test_search_keyset_pagination(client: AsyncClient, async_session: AsyncSession):
+    for i in range(5):
+        await _seed_book(async_session, f"Magic book {i}", None, f"Author {i}")
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"q": "magic", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/api/v1/books/search", params=params)
+        assert r.status_code == 200, r.text
+        data = r.json()
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"q": ""}, {"q": "   "}, {"q": "x", "cursor": "broken"}])
+async def test_search_validation_422(client: AsyncClient, params: dict):
+    r = await client.get("/api/v1/books/search", params=params)
+    assert r.status_code == 422, r.text
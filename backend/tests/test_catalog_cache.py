@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import AsyncTTLCache, catalog_cache
+
+
+def _cache(**kwargs) -> AsyncTTLCache:
+    params = {"name": "test", "maxsize": 2, "ttl": 60.0, "negative_ttl": 60.0}
+    params.update(kwargs)
+    return AsyncTTLCache(**params)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = _cache()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(cache.get_or_load("k", load) for _ in range(10)))
+    assert results == ["value"] * 10
+    assert calls == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_load_to_waiters():
+    cache = _cache()
+    started = asyncio.Event()
+    calls: list[str] = []
+
+    def loader(name: str):
+        async def load():
+            calls.append(name)
+            started.set()
+            await asyncio.sleep(0.01)
+            return name
+
+        return load
+
+    leader = asyncio.ensure_future(cache.get_or_load("k", loader("leader")))
+    await started.wait()
+    waiters = [asyncio.ensure_future(cache.get_or_load("k", loader(f"w{i}"))) for i in range(3)]
+    await asyncio.sleep(0)
+
+    # клиент лидера отключился: остальные не получают CancelledError, один из них грузит заново
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await asyncio.gather(*waiters) == ["w0"] * 3
+    assert calls == ["leader", "w0"]
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_negative_entries():
+    cache = _cache(maxsize=2)
+
+    async def none():
+        return None
+
+    assert await cache.get_or_load("missing", none) is None
+    assert await cache.get_or_load("missing", none) is None
+    assert cache.stats()["hits"] == 1
+
+    for key in ("a", "b"):
+        await cache.get_or_load(key, lambda key=key: asyncio.sleep(0, result=key))
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_not_stored():
+    cache = _cache()
+
+    async def load():
+        cache.invalidate("k")
+        return "stale"
+
+    assert await cache.get_or_load("k", load) == "stale"
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_keyed_invalidation_keeps_other_loads():
+    cache = _cache(maxsize=10)
+    gate = asyncio.Event()
+
+    async def load(value):
+        await gate.wait()
+        return value
+
+    other = asyncio.ensure_future(cache.get_or_load(("book", 1), lambda: load("detail")))
+    page = asyncio.ensure_future(cache.get_or_load(("books_popular", None, 20), lambda: load("stale page")))
+    await asyncio.sleep(0)
+
+    cache.invalidate_keys(lambda key, value: key[0] == "books_popular")
+    gate.set()
+    assert await asyncio.gather(other, page) == ["detail", "stale page"]
+
+    # карточка сохранилась, страница, сброшенная во время загрузки, — нет
+    assert cache.stats()["size"] == 1
+    assert await cache.get_or_load(("book", 1), lambda: load("reloaded")) == "detail"
+
+
+@pytest.mark.asyncio
+async def test_book_detail_cached_and_invalidated_on_delete(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    admin = await create_user(email="cache-admin@example.com")
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": admin["id"]})
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES ('Cached', 2020) RETURNING id;")
+    )).scalar_one()
+    await async_session.commit()
+    headers = await login_user(email="cache-admin@example.com")
+
+    assert (await client.get(f"/api/v1/books/{book_id}")).status_code == 200
+    assert (await client.get("/api/v1/books")).status_code == 200
+    hits_before = catalog_cache.stats()["hits"]
+    assert (await client.get(f"/api/v1/books/{book_id}")).status_code == 200
+    assert catalog_cache.stats()["hits"] == hits_before + 1
+
+    r = await client.delete(f"/api/v1/books/{book_id}", headers=headers)
+    assert r.status_code == 204, r.text
+
+    assert (await client.get(f"/api/v1/books/{book_id}")).status_code == 404
+    assert (await client.get("/api/v1/books")).json()["items"] == []
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.cache import principal_cache
+from app.repositories.catalog_repo import CatalogRepository
+from tests.test_loading_profiles import _count_statements
+
+
+async def _admin_headers(create_user, login_user, async_session: AsyncSession) -> dict:
+    user = await create_user(email="admin@example.com")
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": user["id"]})
+    await async_session.commit()
+    return await login_user(email="admin@example.com", password="strong_password_123")
+
+
+def _payload(title: str, authors: list[str]) -> dict:
+    return {"title": title, "year": 2020, "authors": authors, "genres": ["Genre U"]}
+
+
+@pytest.mark.asyncio
+async def test_create_book_query_count_does_not_depend_on_new_authors(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+    db_engine: AsyncEngine,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    # жанр уже есть в обоих замерах (иначе добавится SELECT существующих)
+    r = await client.post("/api/v1/books", headers=headers, json=_payload("Warm-up", ["Warm-up author"]))
+    assert r.status_code == 201, r.text
+
+    # оба замера — с холодным кэшем аутентификации
+    principal_cache.clear()
+    with _count_statements(db_engine) as one_author:
+        r = await client.post("/api/v1/books", headers=headers, json=_payload("One", ["Solo"]))
+    assert r.status_code == 201, r.text
+
+    authors = [f"New author {i}" for i in range(10)]
+    principal_cache.clear()
+    with _count_statements(db_engine) as ten_authors:
+        r = await client.post("/api/v1/books", headers=headers, json=_payload("Ten", authors))
+    assert r.status_code == 201, r.text
+    assert r.json()["authors"] == authors
+
+    assert len(ten_authors) == len(one_author), ten_authors
+
+
+@pytest.mark.asyncio
+async def test_upsert_keeps_order_and_reuses_existing(async_session: AsyncSession):
+    existing_id = (await async_session.execute(
+        text("INSERT INTO authors (name) VALUES ('B') RETURNING id;")
+    )).scalar_one()
+
+    repo = CatalogRepository(async_session)
+    authors = await repo.upsert_authors(["C", "B", "A", "C"])
+    await async_session.commit()
+
+    assert [a.name for a in authors] == ["C", "B", "A"]
+    assert authors[1].id == existing_id
+    count = (await async_session.execute(text("SELECT count(*) FROM authors"))).scalar_one()
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creates_do_not_duplicate_authors(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    headers = await _admin_headers(create_user, login_user, async_session)
+
+    shared = ["Shared author 1", "Shared author 2"]
+    responses = await asyncio.gather(
+        *(client.post("/api/v1/books", headers=headers, json=_payload(f"Book {i}", shared)) for i in range(5))
+    )
+    assert all(r.status_code == 201 for r in responses), [r.text for r in responses]
+
+    rows = (await async_session.execute(
+        text("SELECT name, count(*) FROM authors GROUP BY name ORDER BY name")
+    )).all()
+    assert [tuple(r) for r in rows] == [("Shared author 1", 1), ("Shared author 2", 1)]
@@ -0,0 +1,129 @@
+import gzip
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import compression
+from app.core.cache import catalog_cache
+from app.core.compression import CompressionMiddleware, accepts_encoding, negotiate_encoding
+from app.core.config import settings
+
+
+async def _call(app, accept_encoding: str | None) -> list[dict]:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": headers}
+    sent: list[dict] = []
+
+    async def send(message):
+        sent.append(message)
+
+    await CompressionMiddleware(app)(scope, None, send)
+    return sent
+
+
+def _json_app(body: bytes, *extra_headers: tuple[bytes, bytes]):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *extra_headers]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def test_accepts_encoding_honours_q_values():
+    assert accepts_encoding("gzip, deflate", "gzip")
+    assert not accepts_encoding("gzip;q=0", "gzip")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding("*, gzip;q=0", "gzip")
+    assert not accepts_encoding(None, "gzip")
+
+
+def test_brotli_preferred_only_when_installed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate_encoding("br, gzip") == "gzip"
+    assert negotiate_encoding("br") is None
+    monkeypatch.setattr(settings, "compression_enabled", False)
+    assert negotiate_encoding("gzip") is None
+
+
+@pytest.mark.asyncio
+async def test_large_body_compressed_small_left_alone():
+    big = b'{"items":[' + b",".join(b'{"id":%d}' % i for i in range(500)) + b"]}"
+    start, body = await _call(_json_app(big, (b"etag", b'"abc"')), "gzip")
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"content-length"] == str(len(body["body"])).encode()
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert headers[b"etag"] == b'W/"abc"'
+    assert gzip.decompress(body["body"]) == big
+
+    start, body = await _call(_json_app(b'{"ok":true}'), "gzip")
+    assert b"content-encoding" not in dict(start["headers"])
+    assert body["body"] == b'{"ok":true}'
+
+
+@pytest.mark.asyncio
+async def test_already_encoded_and_binary_responses_pass_through():
+    big = b"x" * 5000
+    start, body = await _call(_json_app(big, (b"content-encoding", b"br")), "gzip")
+    assert dict(start["headers"])[b"content-encoding"] == b"br"
+    assert body["body"] == big
+
+    async def image(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"image/png")]})
+        await send({"type": "http.response.body", "body": big})
+
+    start, body = await _call(image, "gzip")
+    assert b"content-encoding" not in dict(start["headers"])
+
+
+@pytest.mark.asyncio
+async def test_streaming_body_compressed_incrementally():
+    chunks = [(b"line %d\n" % i) * 200 for i in range(5)]
+
+    async def stream(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/csv")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = await _call(stream, "gzip")
+    start, *bodies = sent
+    assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+    # каждый кусок уходит сразу (sync flush), а не одним блоком в конце
+    assert len(bodies) == len(chunks) + 1
+    assert all(b["body"] for b in bodies[:-1])
+    assert gzip.decompress(b"".join(b["body"] for b in bodies)) == b"".join(chunks)
+
+
+@pytest.mark.asyncio
+async def test_catalog_page_served_precompressed_from_cache(client: AsyncClient, async_session: AsyncSession):
+    await async_session.execute(
+        text("INSERT INTO books (title, year) SELECT 'Compressed book ' || g, 2000 FROM generate_series(1, 100) AS g")
+    )
+    await async_session.commit()
+
+    r1 = await client.get("/api/v1/books", params={"limit": 100}, headers={"Accept-Encoding": "gzip"})
+    assert r1.status_code == 200, r1.text
+    assert r1.headers["content-encoding"] == "gzip"
+    assert r1.headers["etag"].startswith('W/"')
+
+    (payload,) = [v for k, (_, v) in catalog_cache._data.items() if k[0] == "books"]
+    cached = payload.encoded("gzip")
+
+    r2 = await client.get("/api/v1/books", params={"limit": 100}, headers={"Accept-Encoding": "gzip"})
+    assert r2.json() == r1.json()
+    # тот же объект байтов из кэша — повторно не сжимали
+    assert payload.encoded("gzip") is cached
+
+    r3 = await client.get(
+        "/api/v1/books",
+        params={"limit": 100},
+        headers={"Accept-Encoding": "gzip", "If-None-Match": r1.headers["etag"]},
+    )
+    assert r3.status_code == 304
+
+    plain = await client.get("/api/v1/books", params={"limit": 100}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == r1.json()
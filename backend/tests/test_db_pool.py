@@ -0,0 +1,78 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.cache import principal_cache
+from app.core.config import Settings
+from app.core.db import engine_options, pool_stats
+from tests.conftest import TEST_DATABASE_URL
+
+
+def test_engine_options_from_settings():
+    cfg = Settings(
+        DB_POOL_SIZE=3,
+        DB_MAX_OVERFLOW=2,
+        DB_STATEMENT_CACHE_SIZE=50,
+        DB_STATEMENT_TIMEOUT_MS=1500,
+        DB_APPLICATION_NAME="library-test",
+    )
+    options = engine_options(cfg)
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 2
+    assert options["connect_args"]["statement_cache_size"] == 50
+    assert options["connect_args"]["server_settings"] == {
+        "application_name": "library-test",
+        "statement_timeout": "1500",
+    }
+
+
+def test_engine_options_pgbouncer_mode():
+    options = engine_options(Settings(DB_PGBOUNCER=True, DB_STATEMENT_TIMEOUT_MS=1500))
+    connect_args = options["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+    assert "statement_timeout" not in connect_args["server_settings"]
+
+
+@pytest.mark.asyncio
+async def test_pool_settings_applied_to_connections():
+    cfg = Settings(DB_POOL_SIZE=2, DB_MAX_OVERFLOW=1, DB_STATEMENT_TIMEOUT_MS=1500)
+    engine = create_async_engine(TEST_DATABASE_URL, **engine_options(cfg))
+    try:
+        async with engine.connect() as conn:
+            timeout = (await conn.execute(text("SHOW statement_timeout"))).scalar_one()
+            app_name = (await conn.execute(text("SHOW application_name"))).scalar_one()
+            stats = pool_stats(engine)
+            assert stats["checkedout"] == 1
+        assert timeout == "1500ms"
+        assert app_name == cfg.app_name
+
+        stats = pool_stats(engine)
+        assert stats["size"] == 2
+        assert stats["checkedout"] == 0
+        assert stats["checkedin"] == 1
+        assert stats["overflow"] == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_admin_only(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    await create_user(email="client@example.com")
+    headers = await login_user(email="client@example.com")
+    r = await client.get("/api/v1/admin/db/pool/stats", headers=headers)
+    assert r.status_code == 403, r.text
+
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE email='client@example.com'"))
+    await async_session.commit()
+    principal_cache.clear()
+    r = await client.get("/api/v1/admin/db/pool/stats", headers=headers)
+    assert r.status_code == 200, r.text
+    assert {"pool", "size", "checkedout"} <= r.json().keys()
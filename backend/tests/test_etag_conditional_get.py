@@ -0,0 +1,144 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _seed_book(async_session: AsyncSession, title: str = "Etag Book") -> int:
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES (:t, 2015) RETURNING id;"), {"t": title}
+    )).scalar_one()
+    await async_session.commit()
+    return book_id
+
+
+@pytest.mark.asyncio
+async def test_catalog_etag_304_and_cache_control(client: AsyncClient, async_session: AsyncSession):
+    book_id = await _seed_book(async_session)
+
+    for url in ("/api/v1/books", f"/api/v1/books/{book_id}"):
+        r1 = await client.get(url)
+        assert r1.status_code == 200, r1.text
+        etag = r1.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+        assert r1.headers["cache-control"].startswith("public")
+
+        r2 = await client.get(url, headers={"If-None-Match": etag})
+        assert r2.status_code == 304, r2.text
+        assert r2.content == b""
+        assert r2.headers["etag"] == etag
+
+        r3 = await client.get(url, headers={"If-None-Match": '"something-else"'})
+        assert r3.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_catalog_etag_changes_after_write(
+    client: AsyncClient,
+    create_user,
+    login_user,
+    async_session: AsyncSession,
+):
+    admin = await create_user(email="etag-admin@example.com")
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": admin["id"]})
+    await async_session.commit()
+    book_id = await _seed_book(async_session)
+    headers = await login_user(email="etag-admin@example.com")
+
+    etag = (await client.get("/api/v1/books")).headers["etag"]
+    r_del = await client.delete(f"/api/v1/books/{book_id}", headers=headers)
+    assert r_del.status_code == 204, r_del.text
+
+    r = await client.get("/api/v1/books", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_favorites_etag_tracks_user_version(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="etag-fav@example.com")
+    book_id = await _seed_book(async_session)
+
+    r1 = await client.get("/api/v1/users/me/favorites", headers=headers)
+    assert r1.status_code == 200, r1.text
+    etag = r1.headers["etag"]
+    assert r1.headers["cache-control"].startswith("private")
+
+    r2 = await client.get("/api/v1/users/me/favorites", headers={**headers, "If-None-Match": etag})
+    assert r2.status_code == 304
+
+    assert (await client.post(f"/api/v1/users/me/favorites/{book_id}", headers=headers)).status_code == 204
+
+    r3 = await client.get("/api/v1/users/me/favorites", headers={**headers, "If-None-Match": etag})
+    assert r3.status_code == 200
+    assert [item["id"] for item in r3.json()["items"]] == [book_id]
+
+
+@pytest.mark.asyncio
+async def test_favorites_etag_is_scoped_to_the_page(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="etag-page@example.com")
+    b1, b2, b3, b4 = [await _seed_book(async_session, f"Page {i}") for i in range(4)]
+    for book_id in (b1, b2, b3):
+        assert (await client.post(f"/api/v1/users/me/favorites/{book_id}", headers=headers)).status_code == 204
+
+    # новые сверху: вторая страница по одной — b2
+    url = "/api/v1/users/me/favorites"
+    first = await client.get(url, headers=headers, params={"limit": 1})
+    params = {"limit": 1, "cursor": first.json()["next_cursor"]}
+    second = await client.get(url, headers=headers, params=params)
+    assert [i["id"] for i in second.json()["items"]] == [b2]
+
+    # добавление на первую страницу вторую не меняет
+    assert (await client.post(f"/api/v1/users/me/favorites/{b4}", headers=headers)).status_code == 204
+    r = await client.get(url, headers={**headers, "If-None-Match": second.headers["etag"]}, params=params)
+    assert r.status_code == 304
+    r = await client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]}, params={"limit": 1})
+    assert r.status_code == 200
+    assert [i["id"] for i in r.json()["items"]] == [b4]
+
+    # удаление с этой страницы — меняет
+    assert (await client.delete(f"/api/v1/users/me/favorites/{b2}", headers=headers)).status_code == 204
+    r = await client.get(url, headers={**headers, "If-None-Match": second.headers["etag"]}, params=params)
+    assert r.status_code == 200
+    assert [i["id"] for i in r.json()["items"]] == [b1]
+
+
+@pytest.mark.asyncio
+async def test_favorites_etag_tracks_counters_and_same_sum_swaps(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    alice = await get_token(email="etag-alice@example.com")
+    bob = await get_token(email="etag-bob@example.com")
+    b1, b2, b3, b4 = [await _seed_book(async_session, f"Etag {i}") for i in range(4)]
+
+    # {b1, b4} -> {b2, b3}: та же сумма id
+    r = await client.put("/api/v1/users/me/favorites", headers=alice, json={"book_ids": [b1, b4]})
+    assert r.status_code == 200, r.text
+    etag = (await client.get("/api/v1/users/me/favorites", headers=alice)).headers["etag"]
+    r = await client.put("/api/v1/users/me/favorites", headers=alice, json={"book_ids": [b2, b3]})
+    assert r.status_code == 200, r.text
+    r = await client.get("/api/v1/users/me/favorites", headers={**alice, "If-None-Match": etag})
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+
+    # чужое добавление меняет favorites_count на странице Alice
+    assert (await client.post(f"/api/v1/users/me/favorites/{b2}", headers=bob)).status_code == 204
+    r = await client.get("/api/v1/users/me/favorites", headers={**alice, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert {i["id"]: i["favorites_count"] for i in r.json()["items"]} == {b2: 2, b3: 1}
+
+    # список id от счётчиков не зависит
+    ids = await client.get("/api/v1/users/me/favorites/ids", headers=alice)
+    assert (await client.post(f"/api/v1/users/me/favorites/{b3}", headers=bob)).status_code == 204
+    r = await client.get("/api/v1/users/me/favorites/ids", headers={**alice, "If-None-Match": ids.headers["etag"]})
+    assert r.status_code == 304
@@ -1,7 +1,12 @@
 import pytest
 from httpx import AsyncClient
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.db import violated_constraint
+from app.services.favorites_service import BOOK_FK, FavoritesService
+from tests.test_loading_profiles import _count_statements
 
 
 @pytest.mark.asyncio
@@ -9,6 +14,38 @@ async def test_add_favorite_404_if_book_not_found(client: AsyncClient, get_token
     headers = await get_token(email="u1@example.com")
     r = await client.post("/api/v1/users/me/favorites/999999", headers=headers)
     assert r.status_code == 404, r.text
+    assert r.json()["details"] == "Book not found"
+
+
+def test_violated_constraint_read_from_driver_error():
+    class DriverError(Exception):
+        constraint_name = BOOK_FK
+
+    # SQLAlchemy 2.0: только raise ... from; 2.1: ещё и атрибут .orig
+    for with_orig in (False, True):
+        try:
+            try:
+                raise DriverError()
+            except DriverError as driver:
+                wrapped = Exception("insert or update violates foreign key constraint")
+                if with_orig:
+                    wrapped.orig = driver
+                raise wrapped from driver
+        except Exception as dbapi_error:
+            exc = IntegrityError("INSERT INTO favorites ...", {}, dbapi_error)
+        assert violated_constraint(exc) == BOOK_FK
+
+
+@pytest.mark.asyncio
+async def test_add_favorite_missing_user_is_not_book_not_found(async_session: AsyncSession):
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES ('Orphan fav', 2020) RETURNING id")
+    )).scalar_one()
+    await async_session.commit()
+
+    # пользователя удалили, а его principal ещё в кэше: нарушен FK на users, не на books
+    with pytest.raises(IntegrityError):
+        await FavoritesService(async_session).add_favorite(user_id=999_999, book_id=book_id)
 
 
 @pytest.mark.asyncio
@@ -41,3 +78,41 @@ async def test_add_and_delete_favorite_idempotent(
     # delete again -> 204 (идемпотентно)
     r4 = await client.delete(f"/api/v1/users/me/favorites/{book_id}", headers=headers)
     assert r4.status_code == 204, r4.text
+
+
+@pytest.mark.asyncio
+async def test_favorite_toggle_is_single_statement(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+    db_engine: AsyncEngine,
+):
+    headers = await get_token(email="u3@example.com")
+    # прогреваем кэш аутентификации: считаем только запросы избранного
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES ('Toggle Book', 2024) RETURNING id;")
+    )).scalar_one()
+    await async_session.commit()
+
+    with _count_statements(db_engine) as statements:
+        r = await client.post(f"/api/v1/users/me/favorites/{book_id}", headers=headers)
+    assert r.status_code == 204, r.text
+    assert len(statements) == 1, statements
+
+    with _count_statements(db_engine) as statements:
+        r = await client.delete(f"/api/v1/users/me/favorites/{book_id}", headers=headers)
+    assert r.status_code == 204, r.text
+    assert len(statements) == 1, statements
+
+    # нечего удалять -> DELETE + проверка книги
+    with _count_statements(db_engine) as statements:
+        r = await client.delete(f"/api/v1/users/me/favorites/{book_id}", headers=headers)
+    assert r.status_code == 204, r.text
+    assert len(statements) == 2, statements
+
+    with _count_statements(db_engine) as statements:
+        r = await client.delete("/api/v1/users/me/favorites/999999", headers=headers)
+    assert r.status_code == 404, r.text
+    assert len(statements) == 2, statements
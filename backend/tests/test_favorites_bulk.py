@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from tests.test_loading_profiles import _count_statements
+
+
+async def _seed_books(async_session: AsyncSession, count: int) -> list[int]:
+    ids = (await async_session.execute(
+        text("INSERT INTO books (title, year) SELECT 'Bulk ' || g, 2020 FROM generate_series(1, :n) g RETURNING id"),
+        {"n": count},
+    )).scalars().all()
+    await async_session.commit()
+    return sorted(ids)
+
+
+async def _favorite_ids(client: AsyncClient, headers: dict) -> list[int]:
+    r = await client.get("/api/v1/users/me/favorites/ids", headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.mark.asyncio
+async def test_patch_favorites_adds_and_removes(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="bulk1@example.com")
+    b1, b2, b3 = await _seed_books(async_session, 3)
+
+    r = await client.patch(
+        "/api/v1/users/me/favorites",
+        headers=headers,
+        json={"add": [b1, b2, 999_999]},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json() == {"added": [b1, b2], "removed": [], "not_found": [999_999]}
+
+    # b1 уже в избранном: не считается ни добавленным, ни ненайденным
+    r = await client.patch(
+        "/api/v1/users/me/favorites",
+        headers=headers,
+        json={"add": [b1, b3], "remove": [b2]},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json() == {"added": [b3], "removed": [b2], "not_found": []}
+
+    assert await _favorite_ids(client, headers) == [b1, b3]
+
+
+@pytest.mark.asyncio
+async def test_patch_favorites_rejects_overlap(client: AsyncClient, get_token):
+    headers = await get_token(email="bulk2@example.com")
+    r = await client.patch(
+        "/api/v1/users/me/favorites",
+        headers=headers,
+        json={"add": [1, 2], "remove": [2]},
+    )
+    assert r.status_code == 422, r.text
+
+
+@pytest.mark.asyncio
+async def test_put_favorites_replaces_set(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="bulk3@example.com")
+    b1, b2, b3, b4 = await _seed_books(async_session, 4)
+
+    r = await client.put("/api/v1/users/me/favorites", headers=headers, json={"book_ids": [b1, b2]})
+    assert r.status_code == 200, r.text
+    assert r.json() == {"added": [b1, b2], "removed": [], "not_found": []}
+
+    r = await client.put("/api/v1/users/me/favorites", headers=headers, json={"book_ids": [b2, b3, b4, b4]})
+    assert r.status_code == 200, r.text
+    assert r.json() == {"added": [b3, b4], "removed": [b1], "not_found": []}
+    assert await _favorite_ids(client, headers) == [b2, b3, b4]
+
+    r = await client.put("/api/v1/users/me/favorites", headers=headers, json={"book_ids": []})
+    assert r.status_code == 200, r.text
+    assert r.json()["removed"] == [b2, b3, b4]
+    assert await _favorite_ids(client, headers) == []
+
+
+@pytest.mark.asyncio
+async def test_put_favorites_is_set_based(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+    db_engine: AsyncEngine,
+):
+    headers = await get_token(email="bulk4@example.com")
+    # прогреваем кэш аутентификации: считаем только запросы избранного
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+    book_ids = await _seed_books(async_session, 300)
+
+    # DELETE + INSERT ... SELECT, все книги существуют -> без дополнительной проверки
+    with _count_statements(db_engine) as statements:
+        r = await client.put("/api/v1/users/me/favorites", headers=headers, json={"book_ids": book_ids})
+    assert r.status_code == 200, r.text
+    assert len(r.json()["added"]) == 300
+    assert len(statements) == 2, statements
+
+
+@pytest.mark.asyncio
+async def test_bulk_favorites_isolated_per_user(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    alice = await get_token(email="alice-bulk@example.com")
+    bob = await get_token(email="bob-bulk@example.com")
+    b1, b2 = await _seed_books(async_session, 2)
+
+    assert (await client.put("/api/v1/users/me/favorites", headers=alice, json={"book_ids": [b1, b2]})).status_code == 200
+    r = await client.put("/api/v1/users/me/favorites", headers=bob, json={"book_ids": [b2]})
+    assert r.status_code == 200, r.text
+    assert r.json() == {"added": [b2], "removed": [], "not_found": []}
+
+    assert await _favorite_ids(client, alice) == [b1, b2]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_bulk_writes_on_shared_books(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    # триггер счётчиков блокирует книги по возрастанию id: пересекающиеся
+    # массовые записи ждут друг друга, а не падают с deadlock
+    users = [await get_token(email=f"bulk-race{i}@example.com") for i in range(4)]
+    book_ids = await _seed_books(async_session, 200)
+
+    async def churn(headers: dict, n: int) -> None:
+        ids = book_ids if n % 2 else list(reversed(book_ids))
+        for _ in range(5):
+            r = await client.put("/api/v1/users/me/favorites", headers=headers, json={"book_ids": ids})
+            assert r.status_code == 200, r.text
+            r = await client.patch("/api/v1/users/me/favorites", headers=headers, json={"remove": ids[::2]})
+            assert r.status_code == 200, r.text
+
+    await asyncio.gather(*(churn(h, n) for n, h in enumerate(users)))
+
+    drift = (await async_session.execute(text(
+        "SELECT count(*) FROM books b "
+        "WHERE b.favorites_count <> (SELECT count(*) FROM favorites f WHERE f.book_id = b.id)"
+    ))).scalar_one()
+    assert drift == 0
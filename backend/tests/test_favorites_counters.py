@@ -0,0 +1,124 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import catalog_cache
+from app.services.counters_service import FavoritesCountersService
+
+
+async def _seed_books(async_session: AsyncSession, count: int) -> list[int]:
+    ids = (await async_session.execute(
+        text("INSERT INTO books (title, year) SELECT 'Pop ' || g, 2020 FROM generate_series(1, :n) g RETURNING id"),
+        {"n": count},
+    )).scalars().all()
+    await async_session.commit()
+    return sorted(ids)
+
+
+async def _counts(client: AsyncClient) -> dict[int, int]:
+    r = await client.get("/api/v1/books", params={"limit": 100})
+    assert r.status_code == 200, r.text
+    return {b["id"]: b["favorites_count"] for b in r.json()["items"]}
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_favorite_writes(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    alice = await get_token(email="alice-cnt@example.com")
+    bob = await get_token(email="bob-cnt@example.com")
+    b1, b2, b3 = await _seed_books(async_session, 3)
+    # страницы каталога в кэше: записи в избранное через API должны их сбросить
+    assert await _counts(client) == {b1: 0, b2: 0, b3: 0}
+    popular = await client.get("/api/v1/books", params={"sort": "popular"})
+    assert [b["id"] for b in popular.json()["items"]] == [b1, b2, b3]
+
+    assert (await client.post(f"/api/v1/users/me/favorites/{b3}", headers=alice)).status_code == 204
+    popular = await client.get("/api/v1/books", params={"sort": "popular"})
+    assert [b["id"] for b in popular.json()["items"]] == [b3, b1, b2]
+    assert (await client.delete(f"/api/v1/users/me/favorites/{b3}", headers=alice)).status_code == 204
+
+    assert (await client.post(f"/api/v1/users/me/favorites/{b1}", headers=alice)).status_code == 204
+    assert (await client.post(f"/api/v1/users/me/favorites/{b1}", headers=alice)).status_code == 204  # дубль
+    assert (await client.post(f"/api/v1/users/me/favorites/{b1}", headers=bob)).status_code == 204
+    r = await client.put("/api/v1/users/me/favorites", headers=bob, json={"book_ids": [b1, b2, b3]})
+    assert r.status_code == 200, r.text
+
+    assert await _counts(client) == {b1: 2, b2: 1, b3: 1}
+    assert (await client.get("/api/v1/auth/me", headers=alice)).json()["favorites_count"] == 1
+    assert (await client.get("/api/v1/auth/me", headers=bob)).json()["favorites_count"] == 3
+
+    assert (await client.delete(f"/api/v1/users/me/favorites/{b1}", headers=alice)).status_code == 204
+    assert (await client.get("/api/v1/auth/me", headers=alice)).json()["favorites_count"] == 0
+    assert await _counts(client) == {b1: 1, b2: 1, b3: 1}
+
+    # каскадное удаление favorites вместе с книгой тоже уменьшает счётчик пользователя
+    await async_session.execute(text("DELETE FROM books WHERE id = :id"), {"id": b2})
+    await async_session.commit()
+    catalog_cache.clear()  # удаление мимо API кэш не видит
+    assert (await client.get("/api/v1/auth/me", headers=bob)).json()["favorites_count"] == 2
+    assert await _counts(client) == {b1: 1, b3: 1}
+
+
+@pytest.mark.asyncio
+async def test_books_sort_popular_keyset(
+    client: AsyncClient,
+    async_session: AsyncSession,
+):
+    book_ids = await _seed_books(async_session, 6)
+    popularity = {book_ids[0]: 1, book_ids[2]: 3, book_ids[3]: 3, book_ids[5]: 2}
+    await async_session.execute(
+        text("UPDATE books SET favorites_count = :n WHERE id = :id"),
+        [{"id": book_id, "n": n} for book_id, n in popularity.items()],
+    )
+    await async_session.commit()
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"sort": "popular", "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/api/v1/books", params=params)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        seen.extend(b["id"] for b in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = [book_ids[2], book_ids[3], book_ids[5], book_ids[0], book_ids[1], book_ids[4]]
+    assert seen == expected
+
+    # курсор сортировки по id не подходит к sort=popular
+    r = await client.get("/api/v1/books", params={"limit": 1})
+    id_cursor = r.json()["next_cursor"]
+    r = await client.get("/api/v1/books", params={"sort": "popular", "cursor": id_cursor})
+    assert r.status_code == 422, r.text
+
+
+@pytest.mark.asyncio
+async def test_reconcile_fixes_drifted_counters(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="drift@example.com")
+    b1, b2 = await _seed_books(async_session, 2)
+    assert (await client.post(f"/api/v1/users/me/favorites/{b1}", headers=headers)).status_code == 204
+
+    await async_session.execute(text("UPDATE books SET favorites_count = 42"))
+    await async_session.execute(text("UPDATE users SET favorites_count = 7"))
+    await async_session.commit()
+
+    fixed = await FavoritesCountersService(async_session).reconcile(batch_size=1)
+    assert fixed == {"books": 2, "users": 1}
+
+    assert await _counts(client) == {b1: 1, b2: 0}
+    assert (await client.get("/api/v1/auth/me", headers=headers)).json()["favorites_count"] == 1
+
+    # повторный прогон ничего не меняет
+    assert await FavoritesCountersService(async_session).reconcile(batch_size=1) == {"books": 0, "users": 0}
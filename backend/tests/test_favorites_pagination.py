@@ -0,0 +1,88 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _seed_favorites(async_session: AsyncSession, user_id: int, count: int) -> list[int]:
+    book_ids = sorted((await async_session.execute(
+        text("INSERT INTO books (title, year) SELECT 'Fav ' || g, 2020 FROM generate_series(1, :n) g RETURNING id"),
+        {"n": count},
+    )).scalars().all())
+    # разные created_at + пара с одинаковым временем, чтобы проверить tie-break по book_id
+    await async_session.execute(
+        text(
+            "INSERT INTO favorites (user_id, book_id, created_at) "
+            "VALUES (:u, :b, timestamptz '2026-01-01 00:00:00+00' + make_interval(secs => :s))"
+        ),
+        [{"u": user_id, "b": book_id, "s": min(i, count - 2)} for i, book_id in enumerate(book_ids)],
+    )
+    await async_session.commit()
+    return book_ids
+
+
+@pytest.mark.asyncio
+async def test_favorites_keyset_pages_newest_first(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="fav-pages@example.com")
+    me = (await client.get("/api/v1/auth/me", headers=headers)).json()
+    book_ids = await _seed_favorites(async_session, me["id"], 7)
+
+    seen: list[int] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/api/v1/users/me/favorites", headers=headers, params=params)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert len(page["items"]) <= 3
+        seen.extend(b["id"] for b in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    # новые сначала; у двух последних одинаковый created_at -> больший book_id первым
+    assert seen == list(reversed(book_ids))
+
+
+@pytest.mark.asyncio
+async def test_favorites_invalid_cursor(client: AsyncClient, get_token):
+    headers = await get_token(email="fav-cursor@example.com")
+    r = await client.get("/api/v1/users/me/favorites", headers=headers, params={"cursor": "garbage"})
+    assert r.status_code == 422, r.text
+
+
+@pytest.mark.asyncio
+async def test_favorite_ids_endpoint(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="fav-ids@example.com")
+    me = (await client.get("/api/v1/auth/me", headers=headers)).json()
+
+    r = await client.get("/api/v1/users/me/favorites/ids", headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == []
+
+    book_ids = await _seed_favorites(async_session, me["id"], 4)
+    r = await client.get("/api/v1/users/me/favorites/ids", headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == book_ids
+    assert r.headers["cache-control"].startswith("private")
+
+    r2 = await client.get(
+        "/api/v1/users/me/favorites/ids",
+        headers={**headers, "If-None-Match": r.headers["etag"]},
+    )
+    assert r2.status_code == 304
+
+    assert (await client.get("/api/v1/users/me/favorites/ids")).status_code == 401
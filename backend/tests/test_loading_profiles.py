@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.cache import principal_cache
+from app.repositories.books_repo import BooksRepository
+from app.repositories.users_repo import UsersRepository
+
+
+@contextmanager
+def _count_statements(engine: AsyncEngine) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+async def _seed_book_with_favorite(async_session: AsyncSession, user_id: int) -> int:
+    author_id = (await async_session.execute(
+        text("INSERT INTO authors (name) VALUES ('Author LP') RETURNING id;")
+    )).scalar_one()
+    genre_id = (await async_session.execute(
+        text("INSERT INTO genres (name) VALUES ('Genre LP') RETURNING id;")
+    )).scalar_one()
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES ('Book LP', 2001) RETURNING id;")
+    )).scalar_one()
+    await async_session.execute(
+        text("INSERT INTO book_authors (book_id, author_id) VALUES (:b, :a);"),
+        {"b": book_id, "a": author_id},
+    )
+    await async_session.execute(
+        text("INSERT INTO book_genres (book_id, genre_id) VALUES (:b, :g);"),
+        {"b": book_id, "g": genre_id},
+    )
+    await async_session.execute(
+        text("INSERT INTO favorites (user_id, book_id) VALUES (:u, :b);"),
+        {"u": user_id, "b": book_id},
+    )
+    await async_session.commit()
+    return book_id
+
+
+@pytest.mark.asyncio
+async def test_query_counts_per_endpoint_are_constant(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+    db_engine: AsyncEngine,
+):
+    headers = await get_token(email="profiles@example.com")
+    me = (await client.get("/api/v1/auth/me", headers=headers)).json()
+    book_id = await _seed_book_with_favorite(async_session, me["id"])
+
+    # список — одна проекция: имена авторов и жанров агрегируются в том же SELECT
+    with _count_statements(db_engine) as statements:
+        r = await client.get("/api/v1/books")
+    assert r.status_code == 200, r.text
+    assert len(statements) == 1, statements
+    assert r.json()["items"][0]["authors"] == ["Author LP"]
+
+    # карточка: books + selectin authors + selectin genres
+
+    with _count_statements(db_engine) as statements:
+        r = await client.get(f"/api/v1/books/{book_id}")
+    assert r.status_code == 200, r.text
+    assert len(statements) == 3, statements
+
+    # избранное: страница одной проекцией, ETag — от её тела
+    with _count_statements(db_engine) as statements:
+        r = await client.get("/api/v1/users/me/favorites", headers=headers)
+    assert r.status_code == 200, r.text
+    assert len(statements) == 1, statements
+    assert r.json()["items"][0]["genres"] == ["Genre LP"]
+
+    # SELECT users для principal + свежий favorites_count — избранное пользователя не тянется
+    principal_cache.clear()
+    with _count_statements(db_engine) as statements:
+        r = await client.get("/api/v1/auth/me", headers=headers)
+    assert r.status_code == 200, r.text
+    assert len(statements) == 2, statements
+
+
+@pytest.mark.asyncio
+async def test_unplanned_relationship_load_raises(
+    get_token,
+    client: AsyncClient,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="raise@example.com")
+    me = (await client.get("/api/v1/auth/me", headers=headers)).json()
+    book_id = await _seed_book_with_favorite(async_session, me["id"])
+
+    user = await UsersRepository(async_session).get_by_id(me["id"])
+    assert user is not None
+    with pytest.raises(InvalidRequestError):
+        _ = user.favorites
+
+    book = await BooksRepository(async_session).get_by_id(book_id, profile="book_detail")
+    assert book is not None
+    assert [a.name for a in book.authors] == ["Author LP"]
+    with pytest.raises(InvalidRequestError):
+        _ = book.favorites
+    with pytest.raises(InvalidRequestError):
+        _ = book.authors[0].books
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.passwords import PasswordHasher, PasswordHasherBusy, password_hasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_off_event_loop():
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    loop_thread = threading.get_ident()
+    seen_threads: list[int] = []
+
+    original = hasher.context.hash
+
+    def tracking_hash(password: str) -> str:
+        seen_threads.append(threading.get_ident())
+        return original(password)
+
+    hasher.context.hash = tracking_hash  # type: ignore[method-assign]
+    try:
+        password_hash = await hasher.hash("strong_password_123")
+        assert await hasher.verify("strong_password_123", password_hash)
+        assert not await hasher.verify("wrong_password_123", password_hash)
+    finally:
+        hasher.shutdown()
+
+    assert seen_threads and loop_thread not in seen_threads
+    stats = hasher.stats()
+    assert stats["calls"] == 3
+    assert stats["hash_time_sum_s"] > 0
+
+
+@pytest.mark.asyncio
+async def test_queue_limit_fails_fast():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    try:
+        first = asyncio.ensure_future(hasher.hash("strong_password_123"))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash("strong_password_123")
+        await first
+    finally:
+        hasher.shutdown()
+    assert hasher.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_slot_until_job_finishes():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    release = threading.Event()
+    try:
+        # первая задача занимает поток, вторая ждёт в очереди пула
+        running = asyncio.ensure_future(hasher._run(release.wait))
+        queued = asyncio.ensure_future(hasher._run(release.wait))
+        await asyncio.sleep(0.05)
+
+        # клиенты отключились: запущенная задача продолжает держать слот, из очереди — снимается
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        assert hasher.stats()["pending"] == 1
+        extra = asyncio.ensure_future(hasher._run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher._run(release.wait)
+
+        release.set()
+        assert await extra is True
+        for _ in range(100):
+            if hasher.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert hasher.stats()["pending"] == 0
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_login_returns_503_when_hasher_saturated(client: AsyncClient, create_user, monkeypatch):
+    await create_user(email="busy@example.com")
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    r = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "busy@example.com", "password": "strong_password_123"},
+    )
+    assert r.status_code == 503, r.text
+    assert r.headers.get("retry-after") == "1"
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.cache import catalog_cache, invalidate_principals
+from app.core.cache_events import listen_cache_events, notify_catalog_changed, notify_principal_changed
+
+
+@pytest.mark.asyncio
+async def test_authenticated_requests_skip_user_lookup(
+    client: AsyncClient,
+    get_token,
+    db_engine: AsyncEngine,
+):
+    headers = await get_token(email="principal@example.com")
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+
+    statements: list[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # /auth/me сам читает users.favorites_count — проверяем на эндпоинте без обращения к users
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        r = await client.get("/api/v1/users/me/favorites", headers=headers)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+    assert r.status_code == 200, r.text
+    assert not any("FROM users" in s for s in statements), statements
+
+
+@pytest.mark.asyncio
+async def test_role_change_visible_after_invalidation(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+):
+    headers = await get_token(email="promoted@example.com")
+    me = (await client.get("/api/v1/auth/me", headers=headers)).json()
+    assert me["role"] == "client"
+    assert (await client.get("/api/v1/admin/books/export.csv", headers=headers)).status_code == 403
+
+    await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": me["id"]})
+    await async_session.commit()
+    invalidate_principals(me["id"])
+
+    r = await client.get("/api/v1/admin/books/export.csv", headers=headers)
+    assert r.status_code == 200, r.text
+
+
+async def _wait_until(probe, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await probe():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_changes_from_other_process_reach_worker(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+    db_engine: AsyncEngine,
+):
+    headers = await get_token(email="notified@example.com")
+    me = (await client.get("/api/v1/auth/me", headers=headers)).json()
+    assert (await client.get("/api/v1/admin/books/export.csv", headers=headers)).status_code == 403
+
+    listener = asyncio.create_task(listen_cache_events(db_engine, interval=30))
+    try:
+        async def listening() -> bool:
+            res = await async_session.execute(
+                text("SELECT count(*) FROM pg_stat_activity WHERE query LIKE 'LISTEN %'")
+            )
+            return res.scalar_one() > 0
+
+        await _wait_until(listening)
+        # principal снова в кэше (слушатель сбросил кэш при подключении) со старой ролью
+        assert (await client.get("/api/v1/admin/books/export.csv", headers=headers)).status_code == 403
+
+        # как cmd_set_role: UPDATE + NOTIFY в одной транзакции, кэш процесса не трогаем
+        await async_session.execute(text("UPDATE users SET role='admin' WHERE id=:id"), {"id": me["id"]})
+        await notify_principal_changed(async_session, me["id"])
+        await async_session.commit()
+
+        async def promoted() -> bool:
+            r = await client.get("/api/v1/admin/books/export.csv", headers=headers)
+            return r.status_code == 200
+
+        await _wait_until(promoted)
+
+        # импорт из CLI: каталог сбрасывается тем же слушателем
+        assert (await client.get("/api/v1/books")).status_code == 200
+        assert catalog_cache.stats()["size"] > 0
+        await notify_catalog_changed(async_session)
+        await async_session.commit()
+
+        async def catalog_cleared() -> bool:
+            return catalog_cache.stats()["size"] == 0
+
+        await _wait_until(catalog_cleared)
+    finally:
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_still_rejected(client: AsyncClient):
+    r = await client.get("/api/v1/auth/me", headers={"Authorization": "Bearer not-a-jwt"})
+    assert r.status_code == 401, r.text
@@ -0,0 +1,151 @@
+from typing import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from fastapi import Request
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.core.db as db
+from app.core.cache import catalog_cache
+from app.core.replicas import CATALOG_KEY, PrimaryStickiness, ReplicaSet, client_key
+from tests.conftest import TEST_DATABASE_URL
+from tests.test_loading_profiles import _count_statements
+
+
+@pytest_asyncio.fixture
+async def replica_engine(monkeypatch) -> AsyncIterator[AsyncEngine]:
+    # "реплика" смотрит в ту же тестовую БД: проверяем маршрутизацию, а не репликацию
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    monkeypatch.setattr(db, "replicas", ReplicaSet([engine], max_lag=10.0, timeout=2.0))
+    db.primary_stickiness.clear()
+    yield engine
+    db.primary_stickiness.clear()
+    await engine.dispose()
+
+
+async def _open_read_session(session: AsyncSession, headers: list[tuple[bytes, bytes]]):
+    gen = db.get_read_session(Request({"type": "http", "headers": headers}), session)
+    return gen, await gen.__anext__()
+
+
+def test_replica_set_round_robin_skips_unhealthy():
+    a = create_async_engine("postgresql+asyncpg://u:p@replica-a/db")
+    b = create_async_engine("postgresql+asyncpg://u:p@replica-b/db")
+    replicas = ReplicaSet([a, b], max_lag=1.0, timeout=1.0)
+    assert [replicas.pick() for _ in range(3)] == [a, b, a]
+
+    replicas.mark_down(a)
+    assert [replicas.pick() for _ in range(2)] == [b, b]
+    replicas.mark_down(b)
+    assert replicas.pick() is None
+    assert [r["healthy"] for r in replicas.stats()] == [False, False]
+    assert "p@" not in replicas.stats()[0]["url"]
+
+
+def test_primary_stickiness_window(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.replicas.time.monotonic", lambda: now[0])
+    sticky = PrimaryStickiness(window=5.0, maxsize=2)
+
+    key = client_key([(b"authorization", b"Bearer abc")])
+    assert key == client_key([(b"authorization", b"bearer abc")])
+    assert not sticky.active(key)
+    sticky.touch(key)
+    assert sticky.active(key)
+    now[0] += 5.0
+    assert not sticky.active(key)
+
+    sticky.touch("a")
+    sticky.touch("b")
+    sticky.touch("c")
+    assert not sticky.active("a")  # вытеснен по maxsize
+    assert client_key([]) is None
+
+
+@pytest.mark.asyncio
+async def test_read_session_is_read_only(async_session: AsyncSession, replica_engine: AsyncEngine):
+    gen, read_session = await _open_read_session(async_session, [])
+    try:
+        assert read_session.bind.sync_engine.url == replica_engine.url
+        assert (await read_session.execute(text("SHOW transaction_read_only"))).scalar_one() == "on"
+        with pytest.raises(DBAPIError):
+            await read_session.execute(text("INSERT INTO genres (name) VALUES ('nope')"))
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary_when_replica_down(async_session: AsyncSession, replica_engine):
+    db.replicas.mark_down(replica_engine)
+    gen, read_session = await _open_read_session(async_session, [])
+    try:
+        # primary — тот же engine, что и у session из get_session, но тоже READ ONLY
+        assert read_session.bind.sync_engine.pool is async_session.bind.sync_engine.pool
+        assert (await read_session.execute(text("SHOW transaction_read_only"))).scalar_one() == "on"
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.asyncio
+async def test_health_check_takes_unreachable_replica_out():
+    engine = create_async_engine("postgresql+asyncpg://u:p@127.0.0.1:1/db", poolclass=NullPool)
+    replicas = ReplicaSet([engine], max_lag=1.0, timeout=1.0)
+    await replicas.check()
+    assert replicas.pick() is None
+    assert replicas.stats()[0]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_reads_own_writes_from_primary(
+    client: AsyncClient,
+    get_token,
+    async_session: AsyncSession,
+    replica_engine: AsyncEngine,
+):
+    alice = await get_token(email="alice-ryw@example.com")
+    bob = await get_token(email="bob-ryw@example.com")
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES ('Replica', 2020) RETURNING id")
+    )).scalar_one()
+    await async_session.commit()
+    db.primary_stickiness.clear()
+
+    assert (await client.post(f"/api/v1/users/me/favorites/{book_id}", headers=alice)).status_code == 204
+
+    # alice только что писала -> её чтения идут на primary
+    with _count_statements(replica_engine) as on_replica:
+        r = await client.get("/api/v1/users/me/favorites", headers=alice)
+    assert r.status_code == 200, r.text
+    assert [b["id"] for b in r.json()["items"]] == [book_id]
+    assert on_replica == []
+
+    # bob ничего не писал -> его чтения обслуживает реплика
+    with _count_statements(replica_engine) as on_replica:
+        r = await client.get("/api/v1/users/me/favorites", headers=bob)
+    assert r.status_code == 200, r.text
+    assert on_replica
+
+    # но счётчики в списках каталога изменились для всех: списки — с primary
+    catalog_cache.clear()
+    with _count_statements(replica_engine) as on_replica:
+        r = await client.get("/api/v1/books", params={"sort": "popular"})
+    assert r.status_code == 200, r.text
+    assert r.json()["items"][0]["favorites_count"] == 1
+    assert on_replica == []
+
+    # запись в каталог закрепляет на primary и чтения каталога для всех
+    db.primary_stickiness.clear()
+    with _count_statements(replica_engine) as on_replica:
+        r = await client.get("/api/v1/books/search", params={"q": "Replica"})
+    assert r.status_code == 200, r.text
+    assert on_replica
+
+    db.primary_stickiness.touch(CATALOG_KEY)
+    with _count_statements(replica_engine) as on_replica:
+        r = await client.get("/api/v1/books/search", params={"q": "Replica"})
+    assert r.status_code == 200, r.text
+    assert on_replica == []
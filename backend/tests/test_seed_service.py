@@ -0,0 +1,90 @@
+import random
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.seed_service import SeedPlan, SeedService, _Ranked, author_name, isbn13
+
+PLAN = SeedPlan(
+    books=300,
+    authors=50,
+    genres=12,
+    users=40,
+    favorites=600,
+    workers=3,
+    chunk_size=64,
+)
+
+
+async def _snapshot(engine: AsyncEngine) -> tuple[list, list]:
+    async with engine.connect() as conn:
+        books = (await conn.execute(text("SELECT id, title, year, isbn FROM books ORDER BY id"))).all()
+        favorites = (await conn.execute(text("SELECT user_id, book_id FROM favorites ORDER BY 1, 2"))).all()
+    return books, favorites
+
+
+def test_isbn_and_author_names_are_unique_and_valid():
+    isbns = {isbn13(i) for i in range(1, 20_001)}
+    assert len(isbns) == 20_000
+    for isbn in list(isbns)[:100]:
+        digits = [int(d) for d in isbn]
+        assert sum(d * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10 == 0
+
+    assert len({author_name(i) for i in range(1, 100_001)}) == 100_000
+
+
+def test_zipf_popularity_is_skewed():
+    ranked = _Ranked(range(1, 10_001), 1.1, random.Random(1))
+    sample = ranked.sample(random.Random(2), 50_000)
+    top = {x for x in ranked.ids[:100]}
+    # у 1% самых популярных книг — заметно больше 1% выборки
+    assert sum(x in top for x in sample) / len(sample) > 0.3
+
+
+@pytest.mark.asyncio
+async def test_seed_loads_consistent_catalog(client: AsyncClient, db_engine: AsyncEngine):
+    report = await SeedService(db_engine).seed(PLAN)
+
+    assert (report.books, report.authors, report.genres, report.users) == (300, 50, 12, 40)
+    assert report.favorites == 600
+
+    async with db_engine.connect() as conn:
+        counts = (await conn.execute(text(
+            "SELECT (SELECT count(*) FROM books), (SELECT count(*) FROM users), "
+            "(SELECT count(*) FROM books WHERE NOT EXISTS "
+            "  (SELECT 1 FROM book_authors ba WHERE ba.book_id = books.id)), "
+            "(SELECT count(*) FROM books WHERE search_vector IS NULL)"
+        ))).one()
+        assert counts == (300, 40, 0, 0)
+
+        # счётчики заполнены триггером при переносе из staging
+        drift = (await conn.execute(text(
+            "SELECT count(*) FROM books b "
+            "WHERE b.favorites_count <> (SELECT count(*) FROM favorites f WHERE f.book_id = b.id)"
+        ))).scalar_one()
+        assert drift == 0
+        staging = (await conn.execute(text("SELECT to_regclass('seed_favorites_staging')"))).scalar_one()
+        assert staging is None
+
+    # общий хэш пароля рабочий: синтетический пользователь логинится
+    r = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "seed-user-1@example.com", "password": PLAN.password},
+    )
+    assert r.status_code == 200, r.text
+
+
+@pytest.mark.asyncio
+async def test_seed_is_reproducible_regardless_of_workers(db_engine: AsyncEngine):
+    await SeedService(db_engine).seed(PLAN)
+    first = await _snapshot(db_engine)
+
+    async with db_engine.begin() as conn:
+        await conn.execute(text(
+            "TRUNCATE books, authors, genres, users, favorites, book_authors, book_genres RESTART IDENTITY CASCADE"
+        ))
+    await SeedService(db_engine).seed(SeedPlan(**{**PLAN.__dict__, "workers": 1}))
+
+    assert await _snapshot(db_engine) == first
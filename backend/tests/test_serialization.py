@@ -0,0 +1,34 @@
+from collections import namedtuple
+
+from app.api.v1.books import as_list_items
+from app.core import serialization
+from app.schemas.book import BookListItemResponse, BookPageResponse
+
+# та же форма, что у строк BooksRepository (LIST_COLUMNS)
+ListRow = namedtuple("ListRow", "id title year authors genres favorites_count")
+
+
+def _rows() -> list[ListRow]:
+    return [
+        ListRow(7, 'Война и мир "том 1"', 1869, ["Лев Толстой"], ["Classics", "Drama"], 3),
+        ListRow(8, "No links", 2000, [], [], 0),
+    ]
+
+
+def test_fast_path_matches_response_model_json():
+    page = {"items": as_list_items(_rows()), "next_cursor": "abc"}
+    expected = BookPageResponse(
+        items=[BookListItemResponse.model_validate(item) for item in page["items"]],
+        next_cursor="abc",
+    ).model_dump_json().encode("utf-8")
+
+    assert serialization.dumps(page) == expected
+    assert BookPageResponse.model_validate_json(serialization.dumps(page)).items[0].authors == ["Лев Толстой"]
+
+
+def test_stdlib_fallback_renders_same_bytes(monkeypatch):
+    page = {"items": as_list_items(_rows()), "next_cursor": None}
+    fast = serialization.dumps(page)
+
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps(page) == fast
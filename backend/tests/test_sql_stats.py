@@ -0,0 +1,112 @@
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.sql_stats import SqlStatsMiddleware, capture_sql
+
+
+@pytest.fixture
+def log_messages():
+    messages: list[str] = []
+    sink_id = logger.add(lambda m: messages.append(m.record["message"]), level="DEBUG")
+    yield messages
+    logger.remove(sink_id)
+
+
+async def _seed_book(async_session: AsyncSession) -> int:
+    book_id = (await async_session.execute(
+        text("INSERT INTO books (title, year) VALUES ('Timing', 2020) RETURNING id")
+    )).scalar_one()
+    await async_session.commit()
+    return book_id
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_db_work(
+    client: AsyncClient,
+    async_session: AsyncSession,
+    max_queries,
+):
+    book_id = await _seed_book(async_session)
+
+    # книга + selectin авторов + selectin жанров
+    with max_queries(3) as stats:
+        r = await client.get(f"/api/v1/books/{book_id}")
+    assert r.status_code == 200, r.text
+    assert r.headers["Server-Timing"].startswith("db;dur=")
+    assert r.headers["Server-Timing"].endswith(f'desc="{stats.count} queries"')
+
+    # из кэша каталога — в БД не ходили, заголовка нет
+    with max_queries(0):
+        r = await client.get(f"/api/v1/books/{book_id}")
+    assert r.status_code == 200, r.text
+    assert "Server-Timing" not in r.headers
+
+
+@pytest.mark.asyncio
+async def test_max_queries_fails_when_exceeded(client: AsyncClient, max_queries):
+    with pytest.raises(AssertionError, match="queries \\(max 0\\)"):
+        with max_queries(0):
+            await client.get("/api/v1/books")
+
+
+@pytest.mark.asyncio
+async def test_repeated_statements_flagged_as_n_plus_one(
+    async_session: AsyncSession,
+    max_queries,
+    log_messages,
+):
+    async def endpoint(scope, receive, send):
+        # классический N+1: по запросу на каждую книгу
+        for book_id in range(settings.sql_n_plus_one_threshold + 1):
+            await async_session.execute(text("SELECT id FROM books WHERE id = :id"), {"id": book_id})
+        await async_session.execute(text("SELECT count(*) FROM books"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent: list[dict] = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/n-plus-one", "headers": []}
+    with max_queries(10) as stats:
+        await SqlStatsMiddleware(endpoint)(scope, None, send)
+
+    assert stats.repeated(settings.sql_n_plus_one_threshold) == [
+        ("SELECT id FROM books WHERE id = $1", settings.sql_n_plus_one_threshold + 1)
+    ]
+    assert (b"server-timing", stats.server_timing().encode()) in sent[0]["headers"]
+    warnings = [m for m in log_messages if m.startswith("Possible N+1")]
+    assert len(warnings) == 1, log_messages
+    assert "SELECT id FROM books" in warnings[0]
+
+
+@pytest.mark.asyncio
+async def test_slow_query_logged_without_parameter_values(
+    async_session: AsyncSession,
+    max_queries,
+    log_messages,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, "sql_slow_query_ms", 0.0)
+    with max_queries(1):
+        await async_session.execute(text("SELECT :secret::text"), {"secret": "hunter2-password"})
+
+    slow = [m for m in log_messages if m.startswith("Slow query")]
+    assert slow, log_messages
+    assert "hunter2-password" not in slow[0]
+    assert "(str)" in slow[0]
+
+
+def test_nested_capture_sees_inner_statements():
+    with capture_sql() as outer:
+        with capture_sql() as inner:
+            inner.record("SELECT 1", 0.002)
+        outer.record("SELECT 2", 0.001)
+    assert inner.count == 1
+    assert outer.count == 2
+    assert outer.time_s == pytest.approx(0.003)
@@ -4,6 +4,7 @@ import base64
 import json
 import logging
 import re
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, List, Optional
 
@@ -64,6 +65,9 @@ class LibraryApiClient:
             timeout=httpx.Timeout(timeout_s),
             headers={"Accept": "application/json"},
         )
+        # (path, params) -> (ETag, json): публичный каталог перезапрашиваем с If-None-Match
+        self._etag_cache: OrderedDict[str, tuple[str, Any]] = OrderedDict()
+        self._etag_cache_max = 256
 
     async def aclose(self) -> None:
         await self._client.aclose()
@@ -95,6 +99,7 @@ class LibraryApiClient:
         *,
         headers: Optional[dict[str, str]] = None,
         json_body: Any = None,
+        params: Optional[dict[str, Any]] = None,
     ) -> httpx.Response:
         # чистый URL для лога без двойных слешей
         base = str(self._client.base_url).rstrip("/")
@@ -102,11 +107,34 @@ class LibraryApiClient:
         log.info("%s %s", method.upper(), url)
 
         try:
-            return await self._client.request(method, path, headers=headers, json=json_body)
+            return await self._client.request(method, path, headers=headers, json=json_body, params=params)
         except httpx.RequestError as e:
             log.exception("Request error: %s", e)
             raise ApiError(status_code=0, message="API недоступно") from e
 
+    async def _get_json_cached(self, path: str, action: str, params: Optional[dict[str, Any]] = None) -> Any:
+        """
+        GET публичного ресурса с ревалидацией по ETag: на 304 берём прошлый JSON из памяти.
+        """
+        key = f"{path}?{sorted((params or {}).items())}"
+        cached = self._etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        resp = await self._request("GET", path, headers=headers, params=params)
+        if resp.status_code == 304 and cached:
+            self._etag_cache.move_to_end(key)
+            return cached[1]
+        self._raise_for_bad_response(resp, action)
+
+        data = resp.json()
+        etag = resp.headers.get("etag")
+        if etag:
+            self._etag_cache[key] = (etag, data)
+            self._etag_cache.move_to_end(key)
+            while len(self._etag_cache) > self._etag_cache_max:
+                self._etag_cache.popitem(last=False)
+        return data
+
     # --- Auth ---
     async def register(self, email: str, password: str) -> Any:
         resp = await self._request("POST", "/auth/register", json_body={"email": email, "password": password})
@@ -133,11 +161,9 @@ class LibraryApiClient:
             return _jwt_get_claim(token, "role")
 
     # --- Books (public) ---
-    async def get_books(self) -> List[BookDTO]:
-        resp = await self._request("GET", "/books")
-        self._raise_for_bad_response(resp, "получении списка книг")
-
-        data = resp.json()
+    async def get_books(self, limit: int = 20) -> List[BookDTO]:
+        # backend отдаёт каталог постранично (items + next_cursor) — берём первую страницу
+        data = await self._get_json_cached("/books", "получении списка книг", params={"limit": limit})
         if isinstance(data, list):
             items = data
         elif isinstance(data, dict) and isinstance(data.get("items"), list):
@@ -150,26 +176,26 @@ class LibraryApiClient:
         return [BookDTO.model_validate(x) for x in items]
 
     async def get_book(self, book_id: int) -> BookDTO:
-        resp = await self._request("GET", f"/books/{book_id}")
-        self._raise_for_bad_response(resp, "получении карточки книги")
-        return BookDTO.model_validate(resp.json())
+        data = await self._get_json_cached(f"/books/{book_id}", "получении карточки книги")
+        return BookDTO.model_validate(data)
 
     # --- Favorites (auth) ---
-    async def get_favorites(self, token: str) -> List[BookDTO]:
-        resp = await self._request("GET", "/users/me/favorites", headers=self._auth_headers(token))
+    async def get_favorites(self, token: str, limit: int = 30) -> tuple[List[BookDTO], Optional[str]]:
+        # избранное отдаётся постранично (новые сверху) — берём первую страницу и курсор следующей
+        resp = await self._request(
+            "GET",
+            "/users/me/favorites",
+            headers=self._auth_headers(token),
+            params={"limit": limit},
+        )
         self._raise_for_bad_response(resp, "получении избранного")
 
         data = resp.json()
         if isinstance(data, list):
-            items = data
-        elif isinstance(data, dict) and isinstance(data.get("items"), list):
-            items = data["items"]
-        elif isinstance(data, dict) and isinstance(data.get("data"), list):
-            items = data["data"]
-        else:
-            raise ApiError(status_code=500, message="Неожиданный формат ответа favorites", payload=data)
-
-        return [BookDTO.model_validate(x) for x in items]
+            return [BookDTO.model_validate(x) for x in data], None
+        if isinstance(data, dict) and isinstance(data.get("items"), list):
+            return [BookDTO.model_validate(x) for x in data["items"]], data.get("next_cursor")
+        raise ApiError(status_code=500, message="Неожиданный формат ответа favorites", payload=data)
 
     async def add_favorite(self, token: str, book_id: int) -> None:
         resp = await self._request("POST", f"/users/me/favorites/{book_id}", headers=self._auth_headers(token))
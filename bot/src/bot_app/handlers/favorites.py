@@ -7,6 +7,9 @@ from bot_app.storage.session_store import InMemorySessionStore
 
 router = Router()
 
+# сколько последних добавленных книг показывать в чате
+FAVORITES_SHOWN = 30
+
 
 @router.message(F.text == "⭐ Избранное")
 async def favorites_list(
@@ -20,7 +23,7 @@ async def favorites_list(
         return
 
     try:
-        favs = await api_client.get_favorites(token)
+        favs, next_cursor = await api_client.get_favorites(token, limit=FAVORITES_SHOWN)
     except ApiError as e:
         if e.status_code == 404:
             await message.answer(
@@ -41,10 +44,10 @@ async def favorites_list(
         return
 
     lines = ["⭐ Ваше избранное:"]
-    for b in favs[:30]:
+    for b in favs:
         lines.append(f"• {b.title} — id={b.id}")
-    if len(favs) > 30:
-        lines.append(f"\n…и ещё {len(favs) - 30} книг.")
+    if next_cursor:
+        lines.append("\n…и ещё книги (показаны последние добавленные).")
 
     lines.append("\nЧтобы удалить: откройте книгу по ID и нажмите «➖ Удалить».")
     await message.answer("\n".join(lines))
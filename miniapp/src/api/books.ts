@@ -1,8 +1,9 @@
 import { apiFetch } from "./client";
-import type { BookCreateRequest, BookDetail, BookListItem } from "../types/book";
+import type { BookCreateRequest, BookDetail, BookPage } from "../types/book";
 
-export function listBooksApi(): Promise<BookListItem[]> {
-  return apiFetch<BookListItem[]>("/books", { method: "GET" });
+export function listBooksApi(cursor?: string | null): Promise<BookPage> {
+  const qs = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  return apiFetch<BookPage>(`/books${qs}`, { method: "GET" });
 }
 
 export function getBookApi(id: number): Promise<BookDetail> {
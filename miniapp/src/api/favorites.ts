@@ -1,8 +1,13 @@
 import { apiFetch } from "./client";
-import type { BookListItem } from "../types/book";
+import type { BookPage } from "../types/book";
 
-export function listFavoritesApi(token: string): Promise<BookListItem[]> {
-  return apiFetch<BookListItem[]>("/users/me/favorites", { method: "GET", token });
+export function listFavoritesApi(token: string, cursor?: string | null): Promise<BookPage> {
+  const qs = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  return apiFetch<BookPage>(`/users/me/favorites${qs}`, { method: "GET", token });
+}
+
+export function listFavoriteIdsApi(token: string): Promise<number[]> {
+  return apiFetch<number[]>("/users/me/favorites/ids", { method: "GET", token });
 }
 
 export function addFavoriteApi(token: string, bookId: number): Promise<void> {
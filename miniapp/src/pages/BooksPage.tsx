@@ -18,6 +18,7 @@ export function BooksPage() {
   const { token, isAuthed } = useAuth();
 
   const [items, setItems] = useState<BookListItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [query, setQuery] = useState("");
   const [err, setErr] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
@@ -26,8 +27,9 @@ export function BooksPage() {
     setErr(null);
     setLoading(true);
     try {
-      const data = await listBooksApi();
-      setItems(data);
+      const page = await listBooksApi();
+      setItems(page.items);
+      setNextCursor(page.next_cursor);
     } catch (e: any) {
       setErr(e?.message ?? "Failed to load books");
     } finally {
@@ -35,6 +37,17 @@ export function BooksPage() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      const page = await listBooksApi(nextCursor);
+      setItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (e: any) {
+      toast.error(e?.message ?? "Failed to load books");
+    }
+  };
+
   useEffect(() => {
     void load();
   }, []);
@@ -133,6 +146,14 @@ export function BooksPage() {
                 </Card>
               ))}
             </div>
+
+            {!loading && nextCursor && (
+              <div className={styles.actions}>
+                <Button variant="ghost" onClick={loadMore} size="sm">
+                  Load more
+                </Button>
+              </div>
+            )}
           </div>
         </CardPad>
       </Card>
@@ -16,6 +16,7 @@ export function FavoritesPage() {
   const toast = useToast();
 
   const [items, setItems] = useState<BookListItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [err, setErr] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
 
@@ -24,8 +25,9 @@ export function FavoritesPage() {
     setErr(null);
     setLoading(true);
     try {
-      const data = await listFavoritesApi(token);
-      setItems(data);
+      const page = await listFavoritesApi(token);
+      setItems(page.items);
+      setNextCursor(page.next_cursor);
     } catch (e: any) {
       setErr(e?.message ?? "Failed");
     } finally {
@@ -33,6 +35,17 @@ export function FavoritesPage() {
     }
   };
 
+  const loadMore = async () => {
+    if (!token || !nextCursor) return;
+    try {
+      const page = await listFavoritesApi(token, nextCursor);
+      setItems((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (e: any) {
+      toast.error(e?.message ?? "Failed");
+    }
+  };
+
   useEffect(() => {
     void load();
   }, [token]);
@@ -42,7 +55,8 @@ export function FavoritesPage() {
     try {
       await removeFavoriteApi(token, id);
       toast.info("Удалено из избранного");
-      await load();
+      // курсор указывает на последнюю загруженную запись — удаление выше него страницы не сдвигает
+      setItems((prev) => prev.filter((b) => b.id !== id));
     } catch (e: any) {
       toast.error(e?.message ?? "Failed");
     }
@@ -95,6 +109,14 @@ export function FavoritesPage() {
               </Card>
             ))}
           </div>
+
+          {!loading && nextCursor && (
+            <div className={styles.actions}>
+              <Button variant="ghost" onClick={loadMore} size="sm">
+                Load more
+              </Button>
+            </div>
+          )}
         </CardPad>
       </Card>
     </div>
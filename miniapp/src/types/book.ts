@@ -4,6 +4,12 @@ export type BookListItem = {
   year: number;
   authors: string[];
   genres: string[];
+  favorites_count: number;
+};
+
+export type BookPage = {
+  items: BookListItem[];
+  next_cursor: string | null;
 };
 
 export type BookDetail = {